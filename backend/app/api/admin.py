@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.admission import AdmissionController
+from app.core.config import get_settings
+from app.core.executors import ExecutorPool, ExecutorRegistry
+from app.core.profiling import ProcessSampler
+from app.services.prefetch_service import PrefetchCache
+from app.services.session_service import SessionStore
+from app.utils.dependencies import (
+    get_admission_controller,
+    get_executor_registry,
+    get_io_pool,
+    get_prefetch_cache,
+    get_process_sampler,
+    get_session_store,
+)
+
+router = APIRouter(prefix='/admin', tags=['admin'])
+settings = get_settings()
+
+
+@router.get('/admission')
+async def admission_stats(admission: AdmissionController = Depends(get_admission_controller)) -> dict:
+    return admission.stats()
+
+
+@router.get('/executors')
+async def executor_stats(executors: ExecutorRegistry = Depends(get_executor_registry)) -> dict:
+    return executors.stats()
+
+
+@router.get('/sessions')
+async def session_stats(sessions: SessionStore = Depends(get_session_store)) -> dict:
+    return sessions.stats()
+
+
+@router.get('/prefetch')
+async def prefetch_stats(prefetch: PrefetchCache = Depends(get_prefetch_cache)) -> dict:
+    return prefetch.stats()
+
+
+@router.post('/profile')
+async def capture_process_profile(
+    seconds: float = Query(default=10.0, gt=0),
+    interval_ms: float = Query(default=10.0, ge=1.0, le=1000.0),
+    sampler: ProcessSampler = Depends(get_process_sampler),
+    io_pool: ExecutorPool = Depends(get_io_pool),
+) -> dict:
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail='Profiling is disabled')
+    if seconds > settings.profiling_max_seconds:
+        raise HTTPException(status_code=400, detail=f'seconds must be <= {settings.profiling_max_seconds:g}')
+    if sampler.busy:
+        raise HTTPException(status_code=409, detail='A process profile is already being captured')
+    try:
+        return await io_pool.run(sampler.capture, seconds, interval_ms / 1000.0)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
@@ -5,14 +5,31 @@ import logging
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
-from starlette.concurrency import run_in_threadpool
+from starlette.background import BackgroundTask
 
+from app.core.admission import AdmissionRejected
 from app.core.config import get_settings
-from app.models.request_models import ChatRequest
-from app.models.response_models import ChatResponse, SourceChunk
-from app.services.pipeline_service import PipelineService
+from app.core.executors import ExecutorPool
+from app.core.metrics import ERRORS
+from app.models.request_models import ChatRequest, ChatSessionRequest, PrefetchRequest
+from app.models.response_models import (
+    ChatResponse,
+    ChatSessionResponse,
+    GenericResponse,
+    PrefetchResponse,
+    SourceChunk,
+)
+from app.services.milvus_service import MilvusService
+from app.services.prefetch_service import PrefetchCache
 from app.services.rag_service import RagService
-from app.utils.dependencies import get_pipeline_service, get_rag_service
+from app.services.session_service import ChatSession, SessionStore
+from app.utils.dependencies import (
+    get_io_pool,
+    get_milvus_service,
+    get_prefetch_cache,
+    get_rag_service,
+    get_session_store,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix='/chat', tags=['chat'])
@@ -25,28 +42,120 @@ def _error_detail(default_message: str, exc: Exception) -> str:
     return default_message
 
 
+def _session_and_collection(
+    payload: ChatRequest | PrefetchRequest,
+    milvus_service: MilvusService,
+    sessions: SessionStore,
+) -> tuple[ChatSession | None, str]:
+    if payload.session_id is None:
+        return None, milvus_service.resolve_collection_name(payload.video_id, payload.collection_name)
+    session = sessions.get(payload.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail='Chat session not found or expired')
+    return session, session.collection_name
+
+
+@router.post('/sessions', response_model=ChatSessionResponse, status_code=201)
+async def create_session(
+    payload: ChatSessionRequest,
+    milvus_service: MilvusService = Depends(get_milvus_service),
+    sessions: SessionStore = Depends(get_session_store),
+) -> ChatSessionResponse:
+    collection_name = milvus_service.resolve_collection_name(payload.video_id, payload.collection_name)
+    return ChatSessionResponse(**sessions.create(collection_name, payload.video_id).snapshot())
+
+
+@router.get('/sessions/{session_id}', response_model=ChatSessionResponse)
+async def get_session(session_id: str, sessions: SessionStore = Depends(get_session_store)) -> ChatSessionResponse:
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail='Chat session not found or expired')
+    return ChatSessionResponse(**session.snapshot())
+
+
+@router.delete('/sessions/{session_id}', response_model=GenericResponse)
+async def delete_session(session_id: str, sessions: SessionStore = Depends(get_session_store)) -> GenericResponse:
+    if not sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail='Chat session not found or expired')
+    return GenericResponse(message=f'Chat session {session_id} deleted')
+
+
+@router.post('/prefetch', response_model=PrefetchResponse)
+async def prefetch_question(
+    payload: PrefetchRequest,
+    milvus_service: MilvusService = Depends(get_milvus_service),
+    rag_service: RagService = Depends(get_rag_service),
+    sessions: SessionStore = Depends(get_session_store),
+    prefetch: PrefetchCache = Depends(get_prefetch_cache),
+    io_pool: ExecutorPool = Depends(get_io_pool),
+) -> PrefetchResponse:
+    """Speculatively retrieve for a partially typed question; a matching /chat call from this client reuses it."""
+
+    session, collection_name = _session_and_collection(payload, milvus_service, sessions)
+    video_id = session.video_id if session is not None else payload.video_id
+    status = await prefetch.prefetch(
+        payload.client_id,
+        payload.question,
+        collection_name,
+        payload.top_k,
+        lambda: io_pool.run(rag_service.retrieve_hits, payload.question, collection_name, payload.top_k, video_id),
+    )
+    return PrefetchResponse(status=status)
+
+
+async def _claim_prefetched(
+    payload: ChatRequest,
+    session: ChatSession | None,
+    collection_name: str,
+    prefetch: PrefetchCache,
+    rag_service: RagService,
+    io_pool: ExecutorPool,
+) -> list[dict] | None:
+    if payload.client_id is None:
+        return None
+    video_id = session.video_id if session is not None else payload.video_id
+    return await prefetch.claim(
+        payload.client_id,
+        payload.question,
+        collection_name,
+        payload.top_k,
+        lambda hits: io_pool.run(rag_service.prefetch_usable, payload.question, collection_name, hits, video_id),
+    )
+
+
 @router.post('', response_model=ChatResponse)
 async def ask_question(
     payload: ChatRequest,
-    pipeline_service: PipelineService = Depends(get_pipeline_service),
+    milvus_service: MilvusService = Depends(get_milvus_service),
     rag_service: RagService = Depends(get_rag_service),
+    sessions: SessionStore = Depends(get_session_store),
+    prefetch: PrefetchCache = Depends(get_prefetch_cache),
+    io_pool: ExecutorPool = Depends(get_io_pool),
 ) -> ChatResponse:
+    session, collection_name = _session_and_collection(payload, milvus_service, sessions)
     try:
-        collection_name = pipeline_service.resolve_collection_name(payload.video_id, payload.collection_name)
-        result = await run_in_threadpool(
+        result = await io_pool.run(
             rag_service.answer_question,
             payload.question,
             collection_name,
             payload.top_k,
+            session,
+            await _claim_prefetched(payload, session, collection_name, prefetch, rag_service, io_pool),
+            payload.video_id,
         )
         return ChatResponse(
             answer=result.answer,
             sources=[SourceChunk(**item) for item in result.sources],
             tokens_used=result.tokens_used,
+            session_id=payload.session_id,
         )
+    except AdmissionRejected as exc:
+        ERRORS.inc(component='chat', kind='rejected')
+        raise exc.to_http_exception() from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:  # noqa: BLE001
+        ERRORS.inc(component='chat', kind='internal')
         logger.exception('Chat failed: %s', str(exc))
         raise HTTPException(status_code=500, detail=_error_detail('Failed to answer question', exc)) from exc
 
@@ -54,29 +163,53 @@ async def ask_question(
 @router.post('/stream')
 async def stream_question(
     payload: ChatRequest,
-    pipeline_service: PipelineService = Depends(get_pipeline_service),
+    milvus_service: MilvusService = Depends(get_milvus_service),
     rag_service: RagService = Depends(get_rag_service),
+    sessions: SessionStore = Depends(get_session_store),
+    prefetch: PrefetchCache = Depends(get_prefetch_cache),
+    io_pool: ExecutorPool = Depends(get_io_pool),
 ) -> StreamingResponse:
+    session, collection_name = _session_and_collection(payload, milvus_service, sessions)
     try:
-        collection_name = pipeline_service.resolve_collection_name(payload.video_id, payload.collection_name)
-        stream, sources = await run_in_threadpool(
+        stream, sources = await io_pool.run(
             rag_service.stream_answer,
             payload.question,
             collection_name,
             payload.top_k,
+            session,
+            await _claim_prefetched(payload, session, collection_name, prefetch, rag_service, io_pool),
+            payload.video_id,
         )
 
-        def event_generator():
-            yield f"data: {json.dumps({'type': 'sources', 'data': sources})}\\n\\n"
-            for chunk in stream:
-                delta = chunk.choices[0].delta.content if chunk.choices else None
-                if delta:
-                    yield f"data: {json.dumps({'type': 'token', 'data': delta})}\\n\\n"
-            yield "data: {\"type\": \"done\"}\\n\\n"
+        async def event_generator():
+            try:
+                yield f"data: {json.dumps({'type': 'sources', 'data': sources})}\n\n"
+                iterator = iter(stream)
+                while True:
+                    # Each blocking read from the provider stream runs on the I/O pool, not the event loop.
+                    chunk = await io_pool.run(next, iterator, None)
+                    if chunk is None:
+                        break
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        yield f"data: {json.dumps({'type': 'token', 'data': delta})}\n\n"
+                yield "data: {\"type\": \"done\"}\n\n"
+            finally:
+                stream.close()
 
-        return StreamingResponse(event_generator(), media_type='text/event-stream')
+        # The background close covers a client that disconnects before the generator is first advanced; an
+        # unstarted generator never reaches its finally block, and the LLM slot would stay held.
+        return StreamingResponse(
+            event_generator(),
+            media_type='text/event-stream',
+            background=BackgroundTask(stream.close),
+        )
+    except AdmissionRejected as exc:
+        ERRORS.inc(component='chat_stream', kind='rejected')
+        raise exc.to_http_exception() from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:  # noqa: BLE001
+        ERRORS.inc(component='chat_stream', kind='internal')
         logger.exception('Streaming chat failed: %s', str(exc))
         raise HTTPException(status_code=500, detail=_error_detail('Failed to stream answer', exc)) from exc
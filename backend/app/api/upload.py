@@ -2,15 +2,32 @@ from __future__ import annotations
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException
-from starlette.concurrency import run_in_threadpool
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.requests import ClientDisconnect
 
-from app.models.request_models import DeleteCollectionRequest, RebuildCollectionRequest, UploadRequest
-from app.models.response_models import GenericResponse, UploadResponse
+from app.models.request_models import (
+    BatchUploadRequest,
+    DeleteCollectionRequest,
+    RebuildCollectionRequest,
+    UploadRequest,
+)
+from app.models.response_models import BatchStatusResponse, GenericResponse, UploadResponse
+from app.core.admission import AdmissionController, AdmissionRejected
 from app.core.config import get_settings
+from app.core.executors import ExecutorPool
+from app.core.metrics import ERRORS
+from app.services.batch_service import BatchIngestionService
+from app.services.media_upload_service import MediaUploadService, UploadTooLarge
 from app.services.milvus_service import MilvusService
 from app.services.pipeline_service import PipelineService
-from app.utils.dependencies import get_milvus_service, get_pipeline_service
+from app.utils.dependencies import (
+    get_admission_controller,
+    get_batch_ingestion_service,
+    get_io_pool,
+    get_media_upload_service,
+    get_milvus_service,
+    get_pipeline_service,
+)
 from yt_dlp.utils import DownloadError
 
 logger = logging.getLogger(__name__)
@@ -28,20 +45,36 @@ def _error_detail(default_message: str, exc: Exception) -> str:
 async def upload_video(
     payload: UploadRequest,
     pipeline_service: PipelineService = Depends(get_pipeline_service),
+    admission: AdmissionController = Depends(get_admission_controller),
+    io_pool: ExecutorPool = Depends(get_io_pool),
 ) -> UploadResponse:
     try:
-        result = await run_in_threadpool(
-            pipeline_service.process_youtube,
+        # Already-indexed videos are answered without queueing behind running ingestions.
+        cached = await io_pool.run(
+            pipeline_service.find_cached_result,
             str(payload.youtube_url),
             payload.collection_name,
-            False,
         )
+        if cached:
+            return UploadResponse(**cached)
+
+        async with admission.gate('ingestion').async_slot():
+            result = await io_pool.run(
+                pipeline_service.process_youtube,
+                str(payload.youtube_url),
+                payload.collection_name,
+                False,
+            )
         return UploadResponse(**result)
+    except AdmissionRejected as exc:
+        ERRORS.inc(component='upload', kind='rejected')
+        raise exc.to_http_exception() from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except DownloadError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:  # noqa: BLE001
+        ERRORS.inc(component='upload', kind='internal')
         logger.exception('Upload processing failed: %s', str(exc))
         raise HTTPException(
             status_code=500,
@@ -49,24 +82,75 @@ async def upload_video(
         ) from exc
 
 
+@router.post('/media', response_model=UploadResponse)
+async def upload_media(
+    request: Request,
+    pipeline_service: PipelineService = Depends(get_pipeline_service),
+    media_service: MediaUploadService = Depends(get_media_upload_service),
+    admission: AdmissionController = Depends(get_admission_controller),
+    io_pool: ExecutorPool = Depends(get_io_pool),
+) -> UploadResponse:
+    """Index a recording sent as multipart/form-data: a `file` part plus optional `title` and `collection_name`."""
+
+    content_length = request.headers.get('content-length', '')
+    if content_length.isdigit() and int(content_length) > media_service.max_bytes:
+        raise HTTPException(status_code=413, detail=f'Upload exceeds {media_service.max_bytes} bytes')
+    try:
+        # The body is read straight off the socket; FastAPI's UploadFile would spool it to a temp file first.
+        received = await media_service.receive(request.stream(), request.headers.get('content-type', ''), io_pool.run)
+        collection_name = received.fields.get('collection_name') or None
+        cached = await io_pool.run(pipeline_service.find_cached_video, received.video.video_id, collection_name)
+        if cached:
+            return UploadResponse(**cached)
+
+        async with admission.gate('ingestion').async_slot():
+            result = await io_pool.run(pipeline_service.process_media, received.video, collection_name)
+        return UploadResponse(**result)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except ClientDisconnect as exc:
+        ERRORS.inc(component='media_upload', kind='disconnected')
+        raise HTTPException(status_code=400, detail='Client disconnected during upload') from exc
+    except AdmissionRejected as exc:
+        ERRORS.inc(component='media_upload', kind='rejected')
+        raise exc.to_http_exception() from exc
+    except (ValueError, RuntimeError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:  # noqa: BLE001
+        ERRORS.inc(component='media_upload', kind='internal')
+        logger.exception('Media upload processing failed: %s', str(exc))
+        raise HTTPException(
+            status_code=500,
+            detail=_error_detail('Failed to process uploaded media', exc),
+        ) from exc
+
+
 @router.post('/rebuild', response_model=UploadResponse)
 async def rebuild_video_collection(
     payload: RebuildCollectionRequest,
     pipeline_service: PipelineService = Depends(get_pipeline_service),
+    admission: AdmissionController = Depends(get_admission_controller),
+    io_pool: ExecutorPool = Depends(get_io_pool),
 ) -> UploadResponse:
     try:
-        result = await run_in_threadpool(
-            pipeline_service.process_youtube,
-            str(payload.youtube_url),
-            payload.collection_name,
-            True,
-        )
+        async with admission.gate('ingestion').async_slot():
+            result = await io_pool.run(
+                pipeline_service.process_youtube,
+                str(payload.youtube_url),
+                payload.collection_name,
+                True,
+                payload.mode == 'incremental',
+            )
         return UploadResponse(**result)
+    except AdmissionRejected as exc:
+        ERRORS.inc(component='rebuild', kind='rejected')
+        raise exc.to_http_exception() from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except DownloadError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:  # noqa: BLE001
+        ERRORS.inc(component='rebuild', kind='internal')
         logger.exception('Rebuild processing failed: %s', str(exc))
         raise HTTPException(
             status_code=500,
@@ -74,14 +158,42 @@ async def rebuild_video_collection(
         ) from exc
 
 
+@router.post('/batch', response_model=BatchStatusResponse, status_code=202)
+async def upload_batch(
+    payload: BatchUploadRequest,
+    batch_service: BatchIngestionService = Depends(get_batch_ingestion_service),
+) -> BatchStatusResponse:
+    # Runs in the background through per-stage pools; poll GET /upload/batch/{batch_id} for progress.
+    try:
+        job = batch_service.submit([str(url) for url in payload.urls], payload.collection_name)
+    except AdmissionRejected as exc:
+        ERRORS.inc(component='batch', kind='rejected')
+        raise exc.to_http_exception() from exc
+    return BatchStatusResponse(**job.snapshot())
+
+
+@router.get('/batch/{batch_id}', response_model=BatchStatusResponse)
+async def get_batch(
+    batch_id: str,
+    include_items: bool = True,
+    batch_service: BatchIngestionService = Depends(get_batch_ingestion_service),
+) -> BatchStatusResponse:
+    job = batch_service.get(batch_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail='Batch not found')
+    return BatchStatusResponse(**job.snapshot(include_items=include_items))
+
+
 @router.delete('/collection', response_model=GenericResponse)
 async def delete_collection(
     payload: DeleteCollectionRequest,
     pipeline_service: PipelineService = Depends(get_pipeline_service),
     milvus_service: MilvusService = Depends(get_milvus_service),
+    io_pool: ExecutorPool = Depends(get_io_pool),
 ) -> GenericResponse:
     collection_name = pipeline_service.resolve_collection_name(payload.video_id, payload.collection_name)
-    deleted = await run_in_threadpool(milvus_service.drop_collection, collection_name)
+    deleted = await io_pool.run(milvus_service.drop_collection, collection_name)
+    await io_pool.run(pipeline_service.manifest_index.drop, collection_name)
     if not deleted:
         raise HTTPException(status_code=404, detail='Collection not found')
     return GenericResponse(message=f'Collection {collection_name} deleted successfully')
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator
+
+from fastapi import HTTPException
+
+from app.core.config import Settings
+
+
+class AdmissionRejected(Exception):
+    """Raised when a gate is saturated; maps to a fast 429/503 with Retry-After."""
+
+    def __init__(self, gate: str, status_code: int, retry_after: int, reason: str) -> None:
+        super().__init__(f'{gate} capacity exhausted: {reason}')
+        self.gate = gate
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    def to_http_exception(self) -> HTTPException:
+        return HTTPException(
+            status_code=self.status_code,
+            detail=str(self),
+            headers={'Retry-After': str(self.retry_after)},
+        )
+
+
+@dataclass
+class _Waiter:
+    event: threading.Event | None = None
+    future: asyncio.Future | None = None
+    loop: asyncio.AbstractEventLoop | None = None
+    granted: bool = False
+
+    def grant(self) -> None:
+        self.granted = True
+        if self.event is not None:
+            self.event.set()
+        elif self.future is not None and self.loop is not None:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if self.future is not None and not self.future.done():
+            self.future.set_result(None)
+
+
+class AdmissionGate:
+    """Concurrency limit with a bounded FIFO wait queue, usable from threads and coroutines."""
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout_s: float) -> None:
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout_s = queue_timeout_s
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters: deque[_Waiter] = deque()
+
+        self._admitted = 0
+        self._rejected_queue_full = 0
+        self._rejected_timeout = 0
+        self._wait_total_s = 0.0
+        self._wait_max_s = 0.0
+        self._hold_ewma_s = 0.0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        acquired_at = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(acquired_at)
+
+    @asynccontextmanager
+    async def async_slot(self) -> AsyncIterator[None]:
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        waiter = self._try_enter(loop)
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout_s)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+            self._finish_wait(waiter)
+        self._record_admit(time.perf_counter() - started)
+        acquired_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - acquired_at)
+
+    def acquire(self) -> float:
+        """Block until admitted; returns the acquire timestamp to hand back to `release`."""
+
+        started = time.perf_counter()
+        waiter = self._try_enter()
+        if waiter is not None:
+            waiter.event.wait(self.queue_timeout_s)
+            self._finish_wait(waiter)
+        self._record_admit(time.perf_counter() - started)
+        return time.perf_counter()
+
+    def release(self, acquired_at: float) -> None:
+        self._release(time.perf_counter() - acquired_at)
+
+    def stats(self) -> dict:
+        with self._lock:
+            admitted = self._admitted
+            return {
+                'name': self.name,
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'queue_depth': len(self._waiters),
+                'admitted': admitted,
+                'rejected_queue_full': self._rejected_queue_full,
+                'rejected_timeout': self._rejected_timeout,
+                'avg_wait_s': round(self._wait_total_s / admitted, 4) if admitted else 0.0,
+                'max_wait_s': round(self._wait_max_s, 4),
+                'avg_hold_s': round(self._hold_ewma_s, 4),
+            }
+
+    def _try_enter(self, loop: asyncio.AbstractEventLoop | None = None) -> _Waiter | None:
+        with self._lock:
+            if self._in_flight < self.max_concurrency and not self._waiters:
+                self._in_flight += 1
+                return None
+            if len(self._waiters) >= self.max_queue:
+                self._rejected_queue_full += 1
+                raise AdmissionRejected(self.name, 429, self._retry_after_locked(), 'wait queue is full')
+            if loop is None:
+                waiter = _Waiter(event=threading.Event())
+            else:
+                waiter = _Waiter(future=loop.create_future(), loop=loop)
+            self._waiters.append(waiter)
+            return waiter
+
+    def _finish_wait(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                return
+            self._waiters.remove(waiter)
+            self._rejected_timeout += 1
+            retry_after = self._retry_after_locked()
+        raise AdmissionRejected(
+            self.name,
+            503,
+            retry_after,
+            f'no slot freed within {self.queue_timeout_s:g}s',
+        )
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if not waiter.granted:
+                self._waiters.remove(waiter)
+                return
+        # The slot was handed over after cancellation; pass it on.
+        self._release(0.0, record=False)
+
+    def _record_admit(self, waited_s: float) -> None:
+        with self._lock:
+            self._admitted += 1
+            self._wait_total_s += waited_s
+            self._wait_max_s = max(self._wait_max_s, waited_s)
+
+    def _release(self, held_s: float, record: bool = True) -> None:
+        with self._lock:
+            if record:
+                self._hold_ewma_s = held_s if self._hold_ewma_s == 0.0 else 0.8 * self._hold_ewma_s + 0.2 * held_s
+            if self._waiters:
+                # Hand the slot straight to the next waiter; in-flight count is unchanged.
+                self._waiters.popleft().grant()
+            else:
+                self._in_flight -= 1
+
+    def _retry_after_locked(self) -> int:
+        hold = self._hold_ewma_s or 1.0
+        backlog = len(self._waiters) + 1
+        return max(1, math.ceil(hold * backlog / self.max_concurrency))
+
+
+class AdmissionController:
+    def __init__(self, gates: dict[str, AdmissionGate]) -> None:
+        self.gates = gates
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> 'AdmissionController':
+        return cls(
+            {
+                'ingestion': AdmissionGate(
+                    'ingestion',
+                    settings.ingest_max_concurrency,
+                    settings.ingest_max_queue,
+                    settings.ingest_queue_timeout_s,
+                ),
+                'embedding': AdmissionGate(
+                    'embedding',
+                    settings.embedding_max_concurrency,
+                    settings.embedding_max_queue,
+                    settings.embedding_queue_timeout_s,
+                ),
+                'llm': AdmissionGate(
+                    'llm',
+                    settings.llm_max_concurrency,
+                    settings.llm_max_queue,
+                    settings.llm_queue_timeout_s,
+                ),
+            }
+        )
+
+    def gate(self, name: str) -> AdmissionGate:
+        return self.gates[name]
+
+    def stats(self) -> dict[str, dict]:
+        return {name: gate.stats() for name, gate in self.gates.items()}
@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Literal
 
-from pydantic import Field
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -16,6 +16,7 @@ class Settings(BaseSettings):
     app_debug: bool = Field(default=False, alias='APP_DEBUG')
     api_prefix: str = Field(default='/api/v1', alias='API_PREFIX')
     cors_origins: str = Field(default='http://localhost:4200', alias='CORS_ORIGINS')
+    worker_role: Literal['chat', 'ingest', 'all'] = Field(default='all', alias='WORKER_ROLE')
 
     openai_api_key: str = Field(default='', alias='OPENAI_API_KEY')
     openai_base_url: str = Field(default='https://api.openai.com/v1', alias='OPENAI_BASE_URL')
@@ -23,14 +24,27 @@ class Settings(BaseSettings):
 
     embedding_model: str = Field(default='sentence-transformers/all-MiniLM-L6-v2', alias='EMBEDDING_MODEL')
     embedding_device: str = Field(default='cpu', alias='EMBEDDING_DEVICE')
+    embedding_backend: Literal['torch', 'onnx'] = Field(default='torch', alias='EMBEDDING_BACKEND')
+    embedding_onnx_dir: Path = Field(default=Path('./data/models/onnx'), alias='EMBEDDING_ONNX_DIR')
+    embedding_onnx_threads: int = Field(default=0, alias='EMBEDDING_ONNX_THREADS')
+    embedding_batch_tokens: int = Field(default=8192, alias='EMBEDDING_BATCH_TOKENS')
 
     milvus_uri: str = Field(default='./milvus.db', alias='APP_MILVUS_URI')
     milvus_default_collection: str = Field(default='video_chunks', alias='MILVUS_DEFAULT_COLLECTION')
     milvus_dimension: int = Field(default=384, alias='MILVUS_DIMENSION')
     milvus_top_k: int = Field(default=5, alias='MILVUS_TOP_K')
     milvus_create_collection_per_video: bool = Field(default=True, alias='MILVUS_CREATE_COLLECTION_PER_VIDEO')
+    # When set, workers talk to a single owner process (python -m app.services.milvus_ipc) instead of opening the DB.
+    milvus_owner_socket: str = Field(default='', alias='MILVUS_OWNER_SOCKET')
+    milvus_owner_authkey: str = Field(default='', alias='MILVUS_OWNER_AUTHKEY')
+    milvus_owner_max_batch: int = Field(default=32, alias='MILVUS_OWNER_MAX_BATCH')
+    milvus_owner_timeout_s: float = Field(default=30.0, alias='MILVUS_OWNER_TIMEOUT_S')
+    # Writes, loads and whole-video fetches; 0 waits for the owner's answer however long it takes.
+    milvus_owner_slow_timeout_s: float = Field(default=0.0, alias='MILVUS_OWNER_SLOW_TIMEOUT_S')
 
     upload_dir: Path = Field(default=Path('./data/uploads'), alias='UPLOAD_DIR')
+    media_upload_chunk_bytes: int = Field(default=1024 * 1024, alias='MEDIA_UPLOAD_CHUNK_BYTES')
+    media_upload_max_bytes: int = Field(default=20 * 1024**3, alias='MEDIA_UPLOAD_MAX_BYTES')
     audio_dir: Path = Field(default=Path('./data/audio'), alias='AUDIO_DIR')
     transcript_dir: Path = Field(default=Path('./data/transcripts'), alias='TRANSCRIPT_DIR')
 
@@ -39,17 +53,99 @@ class Settings(BaseSettings):
     whisper_device: str = Field(default='cpu', alias='WHISPER_DEVICE')
     whisper_beam_size: int = Field(default=1, alias='WHISPER_BEAM_SIZE')
     whisper_vad_filter: bool = Field(default=True, alias='WHISPER_VAD_FILTER')
+    # 0 keeps sequential decoding; >0 uses faster-whisper's BatchedInferencePipeline with that many windows per pass.
+    whisper_batch_size: int = Field(default=0, alias='WHISPER_BATCH_SIZE')
+    whisper_cpu_threads: int = Field(default=0, alias='WHISPER_CPU_THREADS')
+    whisper_num_workers: int = Field(default=1, alias='WHISPER_NUM_WORKERS')
 
     chunk_size: int = Field(default=1200, alias='CHUNK_SIZE')
     chunk_overlap: int = Field(default=200, alias='CHUNK_OVERLAP')
     max_context_chunks: int = Field(default=6, alias='MAX_CONTEXT_CHUNKS')
+    chat_sessions_max: int = Field(default=1000, alias='CHAT_SESSIONS_MAX')
+    chat_session_ttl_s: float = Field(default=1800.0, alias='CHAT_SESSION_TTL_S')
+    chat_session_max_turns: int = Field(default=6, alias='CHAT_SESSION_MAX_TURNS')
+    chat_session_max_chunks: int = Field(default=24, alias='CHAT_SESSION_MAX_CHUNKS')
+    prefetch_debounce_s: float = Field(default=0.25, alias='PREFETCH_DEBOUNCE_S')
+    prefetch_ttl_s: float = Field(default=30.0, alias='PREFETCH_TTL_S')
+    prefetch_min_similarity: float = Field(default=0.85, ge=0, le=1, alias='PREFETCH_MIN_SIMILARITY')
+    prefetch_max_clients: int = Field(default=10000, alias='PREFETCH_MAX_CLIENTS')
+    context_neighbor_window: int = Field(default=0, ge=0, alias='CONTEXT_NEIGHBOR_WINDOW')
+    chunk_dedup_enabled: bool = Field(default=False, alias='CHUNK_DEDUP_ENABLED')
+    chunk_dedup_threshold: float = Field(default=0.8, gt=0, le=1, alias='CHUNK_DEDUP_THRESHOLD')
+    chunk_dedup_num_perm: int = Field(default=64, alias='CHUNK_DEDUP_NUM_PERM')
+    chunk_dedup_shingle_words: int = Field(default=5, alias='CHUNK_DEDUP_SHINGLE_WORDS')
+    ingest_checkpoints_enabled: bool = Field(default=True, alias='INGEST_CHECKPOINTS_ENABLED')
+    ingest_insert_batch_size: int = Field(default=256, alias='INGEST_INSERT_BATCH_SIZE')
+    batch_download_concurrency: int = Field(default=2, alias='BATCH_DOWNLOAD_CONCURRENCY')
+    batch_audio_concurrency: int = Field(default=2, alias='BATCH_AUDIO_CONCURRENCY')
+    batch_transcription_concurrency: int = Field(default=1, alias='BATCH_TRANSCRIPTION_CONCURRENCY')
+    batch_indexing_concurrency: int = Field(default=1, alias='BATCH_INDEXING_CONCURRENCY')
+    batch_summarization_concurrency: int = Field(default=1, alias='BATCH_SUMMARIZATION_CONCURRENCY')
+    batch_max_in_flight: int = Field(default=4, alias='BATCH_MAX_IN_FLIGHT')
+    batch_max_items: int = Field(default=500, alias='BATCH_MAX_ITEMS')
+    batch_max_active: int = Field(default=2, alias='BATCH_MAX_ACTIVE')
+    summary_enabled: bool = Field(default=False, alias='SUMMARY_ENABLED')
+    summary_section_chars: int = Field(default=6000, alias='SUMMARY_SECTION_CHARS')
+    summary_fan_in: int = Field(default=8, alias='SUMMARY_FAN_IN')
+    summary_concurrency: int = Field(default=4, alias='SUMMARY_CONCURRENCY')
+
+    ingest_max_concurrency: int = Field(default=1, alias='INGEST_MAX_CONCURRENCY')
+    ingest_max_queue: int = Field(default=4, alias='INGEST_MAX_QUEUE')
+    ingest_queue_timeout_s: float = Field(default=600.0, alias='INGEST_QUEUE_TIMEOUT_S')
+    embedding_max_concurrency: int = Field(default=4, alias='EMBEDDING_MAX_CONCURRENCY')
+    embedding_max_queue: int = Field(default=32, alias='EMBEDDING_MAX_QUEUE')
+    embedding_queue_timeout_s: float = Field(default=5.0, alias='EMBEDDING_QUEUE_TIMEOUT_S')
+    llm_max_concurrency: int = Field(default=8, alias='LLM_MAX_CONCURRENCY')
+    llm_max_queue: int = Field(default=32, alias='LLM_MAX_QUEUE')
+    llm_queue_timeout_s: float = Field(default=15.0, alias='LLM_QUEUE_TIMEOUT_S')
+
+    # Process pools: 0 runs the stage inline in the API process.
+    transcription_process_workers: int = Field(default=1, alias='TRANSCRIPTION_PROCESS_WORKERS')
+    ingest_embedding_process_workers: int = Field(default=1, alias='INGEST_EMBEDDING_PROCESS_WORKERS')
+    query_embedding_threads: int = Field(default=2, alias='QUERY_EMBEDDING_THREADS')
+    io_pool_threads: int = Field(default=32, alias='IO_POOL_THREADS')
+
+    metrics_enabled: bool = Field(default=True, alias='METRICS_ENABLED')
+    tracing_enabled: bool = Field(default=False, alias='TRACING_ENABLED')
+    tracing_exporter: Literal['file', 'otlp'] = Field(default='file', alias='TRACING_EXPORTER')
+    tracing_file_path: Path = Field(default=Path('./data/traces/spans.jsonl'), alias='TRACING_FILE_PATH')
+    tracing_otlp_endpoint: str = Field(default='http://localhost:4318/v1/traces', alias='TRACING_OTLP_ENDPOINT')
+    profiling_enabled: bool = Field(default=False, alias='PROFILING_ENABLED')
+    profiling_sample_rate: float = Field(default=0.0, ge=0.0, le=1.0, alias='PROFILING_SAMPLE_RATE')
+    profiling_header: str = Field(default='X-Profile', alias='PROFILING_HEADER')
+    profiling_dir: Path = Field(default=Path('./data/profiles'), alias='PROFILING_DIR')
+    profiling_max_seconds: float = Field(default=60.0, alias='PROFILING_MAX_SECONDS')
+
+    warmup_on_startup: bool = Field(default=True, alias='WARMUP_ON_STARTUP')
+    warmup_collections: str = Field(default='', alias='WARMUP_COLLECTIONS')
+    warmup_retry_backoff_s: float = Field(default=1.0, alias='WARMUP_RETRY_BACKOFF_S')
+    warmup_retry_max_backoff_s: float = Field(default=30.0, alias='WARMUP_RETRY_MAX_BACKOFF_S')
 
     log_level: str = Field(default='INFO', alias='LOG_LEVEL')
 
+    @model_validator(mode='after')
+    def _check_whisper_batching(self) -> Settings:
+        # The batched pipeline decodes the VAD speech windows; without VAD it would batch fixed 30s slices instead.
+        if self.whisper_batch_size > 0 and not self.whisper_vad_filter:
+            raise ValueError('WHISPER_BATCH_SIZE > 0 requires WHISPER_VAD_FILTER=true')
+        return self
+
+    @property
+    def serves_chat(self) -> bool:
+        return self.worker_role in {'chat', 'all'}
+
+    @property
+    def serves_ingest(self) -> bool:
+        return self.worker_role in {'ingest', 'all'}
+
     @property
     def cors_origin_list(self) -> List[str]:
         return [item.strip() for item in self.cors_origins.split(',') if item.strip()]
 
+    @property
+    def warmup_collection_list(self) -> List[str]:
+        return [item.strip() for item in self.warmup_collections.split(',') if item.strip()]
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
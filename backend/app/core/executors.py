@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from app.core.profiling import current_request_profile
+
+
+def _worker_pid(hold_s: float) -> int:
+    # Held briefly so a worker that is already up cannot drain every probe before the others finish starting.
+    time.sleep(hold_s)
+    return os.getpid()
+
+
+class ExecutorPool:
+    """Named executor that tracks pending work and task latency so utilization can be reported."""
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        size: int,
+        executor: Executor,
+        factory: Callable[[], Executor] | None = None,
+    ) -> None:
+        self.name = name
+        self.kind = kind
+        self.size = size
+        self.executor = executor
+        # Rebuilds the executor after a worker process dies; None for pools that cannot break.
+        self._factory = factory
+
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._latency_total_s = 0.0
+        self._restarts = 0
+
+    @classmethod
+    def threads(cls, name: str, size: int) -> 'ExecutorPool':
+        return cls(name, 'thread', size, ThreadPoolExecutor(max_workers=size, thread_name_prefix=f'{name}-pool'))
+
+    @classmethod
+    def processes(
+        cls,
+        name: str,
+        size: int,
+        initializer: Callable[..., None] | None = None,
+        initargs: tuple = (),
+    ) -> 'ExecutorPool':
+        def factory() -> Executor:
+            # spawn avoids forking a parent that may already hold torch/OpenMP thread state.
+            return ProcessPoolExecutor(
+                max_workers=size,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=initializer,
+                initargs=initargs,
+            )
+
+        return cls(name, 'process', size, factory(), factory)
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        submitted_at = time.perf_counter()
+        executor = self.executor
+        try:
+            future = self._submit(executor, fn, *args, **kwargs)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM) and took the pool down; start fresh workers and try once more.
+            future = self._submit(self._restart(executor), fn, *args, **kwargs)
+        with self._lock:
+            self._submitted += 1
+        future.add_done_callback(lambda done: self._on_done(done, submitted_at))
+        return future
+
+    def _submit(self, executor: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        if self.kind == 'thread':
+            # Keep request-scoped context (tracing, profiling flags) visible inside the worker thread.
+            context = contextvars.copy_context()
+            profile = current_request_profile()
+            if profile is not None:
+                return executor.submit(context.run, profile.run, fn, *args, **kwargs)
+            return executor.submit(context.run, fn, *args, **kwargs)
+        return executor.submit(fn, *args, **kwargs)
+
+    def _restart(self, broken: Executor) -> Executor:
+        if self._factory is None:
+            raise BrokenProcessPool(f'{self.name} pool is broken and cannot be rebuilt')
+        with self._lock:
+            # Concurrent callers may all see the same broken executor; only the first replaces it.
+            if self.executor is broken:
+                self.executor = self._factory()
+                self._restarts += 1
+                replaced = True
+            else:
+                replaced = False
+            executor = self.executor
+        if replaced:
+            broken.shutdown(wait=False, cancel_futures=True)
+        return executor
+
+    def wait_for_workers(self, hold_s: float = 0.05) -> set[int]:
+        """Block until every worker process has started and run its initializer; returns their pids.
+
+        Workers are spawned on demand and one fast worker can take several tasks, so probes are resubmitted until
+        each process has answered one. A worker only takes tasks once its initializer has finished.
+        """
+
+        if self.kind != 'process':
+            return set()
+        seen: set[int] = set()
+        while len(seen) < self.size:
+            futures = [self.submit(_worker_pid, hold_s) for _ in range(self.size)]
+            seen.update(future.result() for future in futures)
+        return seen
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        executor = self.executor
+        try:
+            return self.submit(fn, *args, **kwargs).result()
+        except BrokenProcessPool:
+            if self._factory is None:
+                raise
+            self._restart(executor)
+            return self.submit(fn, *args, **kwargs).result()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        executor = self.executor
+        try:
+            return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+        except BrokenProcessPool:
+            if self._factory is None:
+                raise
+            self._restart(executor)
+            return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = self._submitted - self._completed - self._failed
+            finished = self._completed + self._failed
+            return {
+                'name': self.name,
+                'kind': self.kind,
+                'size': self.size,
+                'pending': pending,
+                'active': min(pending, self.size),
+                'queued': max(0, pending - self.size),
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'failed': self._failed,
+                'restarts': self._restarts,
+                'utilization': round(min(pending, self.size) / self.size, 4) if self.size else 0.0,
+                'avg_task_s': round(self._latency_total_s / finished, 4) if finished else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(self, future: Future, submitted_at: float) -> None:
+        with self._lock:
+            # Submit-to-done latency, so it includes time spent queued behind busy workers.
+            self._latency_total_s += time.perf_counter() - submitted_at
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+
+class ExecutorRegistry:
+    def __init__(self) -> None:
+        self._pools: dict[str, ExecutorPool] = {}
+
+    def register(self, pool: ExecutorPool) -> ExecutorPool:
+        self._pools[pool.name] = pool
+        return pool
+
+    def pool(self, name: str) -> ExecutorPool | None:
+        return self._pools.get(name)
+
+    def stats(self) -> dict[str, dict]:
+        return {name: pool.stats() for name, pool in self._pools.items()}
+
+    def shutdown(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown()
@@ -6,11 +6,27 @@ import sys
 
 LOG_FORMAT = '%(asctime)s | %(levelname)s | %(name)s | %(message)s'
 
+# Attributes every LogRecord has; anything else on a record came from `extra=`.
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+
+class ExtraFieldsFormatter(logging.Formatter):
+    """Appends `extra=` fields as `key=value` pairs so structured context is not silently dropped."""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = super().formatMessage(record)
+        extras = {key: value for key, value in vars(record).items() if key not in _RESERVED_ATTRS}
+        if not extras:
+            return message
+        fields = ' '.join(f'{key}={value}' for key, value in extras.items())
+        return f'{message} | {fields}'
+
 
 def setup_logging(level: str) -> None:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(ExtraFieldsFormatter(LOG_FORMAT))
     logging.basicConfig(
         level=getattr(logging, level.upper(), logging.INFO),
-        format=LOG_FORMAT,
-        handlers=[logging.StreamHandler(sys.stdout)],
+        handlers=[handler],
         force=True,
     )
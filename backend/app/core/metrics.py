@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+# Minimal Prometheus text-format registry. Recording is a dict lookup plus a bisect under a
+# per-metric lock, so it stays on in production.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0)
+RATIO_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+THROUGHPUT_BUCKETS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0)
+
+LabelKey = tuple[tuple[str, str], ...]
+Sample = tuple[str, str, dict[str, str], float]
+
+
+def _label_key(labels: dict[str, str]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+    pairs = [f'{key}="{_escape(value)}"' for key, value in labels]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f'{self.name}{_format_labels(key)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: dict[LabelKey, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = key + (('le', _format_value(bound) if not math.isinf(bound) else '+Inf'),)
+                lines.append(f'{self.name}_bucket{_format_labels(labels)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(key)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+        # Scrape-time gauges: each collector yields (name, help, labels, value) samples.
+        self._collectors: list[Callable[[], Iterable[Sample]]] = []
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        metric = Counter(name, documentation)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        grouped: dict[str, tuple[str, list[str]]] = {}
+        for collector in self._collectors:
+            for name, documentation, labels, value in collector():
+                entry = grouped.setdefault(name, (documentation, []))
+                entry[1].append(f'{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}')
+        for name, (documentation, samples) in grouped.items():
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+INGEST_STAGE_SECONDS = REGISTRY.histogram(
+    'ingest_stage_duration_seconds',
+    'Wall time per ingestion stage (download, audio_extraction, transcription, chunking, embedding).',
+)
+TRANSCRIPTION_REALTIME_FACTOR = REGISTRY.histogram(
+    'transcription_realtime_factor',
+    'Audio seconds transcribed per wall-clock second.',
+    RATIO_BUCKETS,
+)
+EMBEDDING_CHUNKS_PER_SECOND = REGISTRY.histogram(
+    'embedding_batch_chunks_per_second',
+    'Chunks embedded per wall-clock second for each ingestion embed_batch call, by backend.',
+    THROUGHPUT_BUCKETS,
+)
+QUERY_EMBEDDING_SECONDS = REGISTRY.histogram(
+    'query_embedding_duration_seconds',
+    'Time to embed one chat query variant.',
+)
+MILVUS_OPERATION_SECONDS = REGISTRY.histogram(
+    'milvus_operation_duration_seconds',
+    'Milvus call latency by operation.',
+)
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    'llm_time_to_first_token_seconds',
+    'Time from sending the completion request to the first streamed token.',
+)
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    'llm_request_duration_seconds',
+    'Total LLM completion time, including the full stream when streaming.',
+)
+CACHE_HITS = REGISTRY.counter('cache_hits_total', 'Requests served from a cache, by cache.')
+LLM_TOKENS = REGISTRY.counter('llm_tokens_total', 'Tokens reported by the LLM provider.')
+PREFETCH_LOOKUPS = REGISTRY.counter(
+    'prefetch_lookups_total',
+    'Chat requests with a client_id checked against speculative prefetches, by outcome (hit, miss).',
+)
+ERRORS = REGISTRY.counter('errors_total', 'Failed requests by component.')
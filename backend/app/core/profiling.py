@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable
+
+
+class RequestProfile:
+    """cProfile data for one sampled request, accumulated across the executor calls it makes."""
+
+    def __init__(self, tag: str) -> None:
+        self.tag = tag
+        self.profiler = cProfile.Profile()
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._active = False
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            # Nested submits (e.g. query embedding from inside answer_question) run unprofiled;
+            # the outer profile already accounts for the time spent waiting on them.
+            nested = self._active
+            self._active = True
+        if nested:
+            return fn(*args, **kwargs)
+        try:
+            self.calls += 1
+            return self.profiler.runcall(fn, *args, **kwargs)
+        finally:
+            with self._lock:
+                self._active = False
+
+
+_request_profile: contextvars.ContextVar[RequestProfile | None] = contextvars.ContextVar('request_profile', default=None)
+
+
+def current_request_profile() -> RequestProfile | None:
+    return _request_profile.get()
+
+
+class ProfilingMiddleware:
+    """Samples requests under selected path prefixes and writes one `.prof` file per sampled request."""
+
+    def __init__(
+        self,
+        app,
+        output_dir: Path,
+        sample_rate: float,
+        header: str,
+        path_prefixes: tuple[str, ...],
+    ) -> None:
+        self.app = app
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.header = header.lower().encode('latin-1')
+        self.path_prefixes = path_prefixes
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http' or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        slug = scope['path'].strip('/').replace('/', '_') or 'root'
+        profile = RequestProfile(f'{time.strftime("%Y%m%dT%H%M%S")}-{slug}-{os.urandom(3).hex()}')
+        token = _request_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_profile.reset(token)
+            if profile.calls:
+                elapsed_ms = int((time.perf_counter() - started) * 1000)
+                profile.profiler.dump_stats(str(self.output_dir / f'{profile.tag}-{elapsed_ms}ms.prof'))
+
+    def _should_profile(self, scope) -> bool:
+        if not scope['path'].startswith(self.path_prefixes):
+            return False
+        for key, value in scope.get('headers', []):
+            if key == self.header and value not in (b'', b'0', b'false'):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+
+class ProcessSampler:
+    """Time-boxed, whole-process stack sampler over `sys._current_frames()` (all threads, no tracing hooks)."""
+
+    def __init__(self, output_dir: Path) -> None:
+        self.output_dir = output_dir
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def capture(self, seconds: float, interval_s: float) -> dict:
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError('A process profile is already being captured')
+        try:
+            return self._capture(seconds, interval_s)
+        finally:
+            self._lock.release()
+
+    def _capture(self, seconds: float, interval_s: float) -> dict:
+        own_thread = threading.get_ident()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks: Counter[str] = Counter()
+        leaf_frames: Counter[str] = Counter()
+        samples = 0
+
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                names: list[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f'{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})')
+                    frame = frame.f_back
+                if not names:
+                    continue
+                names.reverse()
+                thread_label = thread_names.get(thread_id, str(thread_id))
+                stacks[';'.join([thread_label, *names])] += 1
+                leaf_frames[names[-1]] += 1
+            samples += 1
+            time.sleep(interval_s)
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        output = self.output_dir / f'process-{time.strftime("%Y%m%dT%H%M%S")}.folded'
+        # Brendan Gregg collapsed-stack format: feed to flamegraph.pl or speedscope.
+        output.write_text(
+            ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common()),
+            encoding='utf-8',
+        )
+        return {
+            'path': str(output),
+            'seconds': seconds,
+            'samples': samples,
+            'top_frames': [{'frame': name, 'samples': count} for name, count in leaf_frames.most_common(20)],
+        }
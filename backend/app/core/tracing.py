@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds and status codes (opentelemetry-proto trace.proto).
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_TRACEPARENT_RE = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None
+    kind: int = SPAN_KIND_INTERNAL
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status_code: int = 0
+    status_message: str = ''
+    _tracer: 'Tracer | None' = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = f'{type(exc).__name__}: {exc}'
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self._tracer is not None:
+            self._tracer._on_end(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+    def to_otlp(self) -> dict:
+        payload = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns or self.start_ns),
+            'attributes': [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            'status': {'code': self.status_code, 'message': self.status_message},
+        }
+        if self.parent_span_id:
+            payload['parentSpanId'] = self.parent_span_id
+        return payload
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    traceparent = ''
+
+
+NOOP_SPAN = _NoopSpan()
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar('current_span', default=None)
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        typed = {'boolValue': value}
+    elif isinstance(value, int):
+        typed = {'intValue': str(value)}
+    elif isinstance(value, float):
+        typed = {'doubleValue': value}
+    else:
+        typed = {'stringValue': str(value)}
+    return {'key': key, 'value': typed}
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str] | None:
+    if not header:
+        return None
+    match = _TRACEPARENT_RE.match(header.strip().lower())
+    if not match or match.group(1) == '0' * 32:
+        return None
+    return match.group(1), match.group(2)
+
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, payload: dict) -> None:
+        """Deliver one OTLP/JSON `ExportTraceServiceRequest`; called from the tracer's background thread."""
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends one OTLP/JSON `ExportTraceServiceRequest` per line (readable by the collector's otlpjsonfile receiver)."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, payload: dict) -> None:
+        with self.path.open('a', encoding='utf-8') as handle:
+            handle.write(json.dumps(payload, separators=(',', ':')) + '\n')
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    def __init__(self, endpoint: str, timeout_s: float = 5.0) -> None:
+        self.endpoint = endpoint
+        self.timeout_s = timeout_s
+
+    def export(self, payload: dict) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout_s):
+            pass
+
+
+class Tracer:
+    """OpenTelemetry-compatible spans with contextvar propagation and batched background export."""
+
+    def __init__(
+        self,
+        service_name: str = 'app',
+        exporter: SpanExporter | None = None,
+        max_queue: int = 10000,
+        batch_size: int = 512,
+        flush_interval_s: float = 2.0,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.dropped = 0
+        self._queue: queue.Queue[Span] = queue.Queue(maxsize=max_queue)
+        self._worker: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.configure(service_name, exporter)
+
+    def configure(self, service_name: str, exporter: SpanExporter | None) -> None:
+        self.service_name = service_name
+        self.exporter = exporter
+        self.enabled = exporter is not None
+
+    def start_span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        parent: tuple[str, str] | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> Span | _NoopSpan:
+        if not self.enabled:
+            return NOOP_SPAN
+        if parent is None:
+            current = _current_span.get()
+            parent = (current.trace_id, current.span_id) if current else None
+        trace_id = parent[0] if parent else os.urandom(16).hex()
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_span_id=parent[1] if parent else None,
+            kind=kind,
+            attributes=dict(attributes or {}),
+            _tracer=self,
+        )
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        parent: tuple[str, str] | None = None,
+        **attributes: Any,
+    ) -> Iterator[Span | _NoopSpan]:
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        span = self.start_span(name, kind=kind, parent=parent, attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_error(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def current_span(self) -> Span | None:
+        return _current_span.get()
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.flush_interval_s * 2)
+
+    def _on_end(self, span: Span) -> None:
+        if self._worker is None:
+            self._start_worker()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._export_loop, name='span-exporter', daemon=True)
+                self._worker.start()
+
+    def _export_loop(self) -> None:
+        while not (self._stopped.is_set() and self._queue.empty()):
+            batch: list[Span] = []
+            deadline = time.monotonic() + self.flush_interval_s
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch:
+                self._export(batch)
+
+    def _export(self, batch: list[Span]) -> None:
+        payload = {
+            'resourceSpans': [
+                {
+                    'resource': {'attributes': [_otlp_attribute('service.name', self.service_name)]},
+                    'scopeSpans': [{'scope': {'name': 'app'}, 'spans': [span.to_otlp() for span in batch]}],
+                }
+            ]
+        }
+        try:
+            self.exporter.export(payload)
+        except Exception as exc:  # noqa: BLE001
+            self.dropped += len(batch)
+            logger.warning('Span export failed', extra={'spans': len(batch), 'error': str(exc)})
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware so the server span also covers streamed response bodies."""
+
+    def __init__(self, app, tracer: Tracer) -> None:
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http' or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode('latin-1'): value.decode('latin-1') for key, value in scope.get('headers', [])}
+        parent = parse_traceparent(headers.get('traceparent'))
+        name = f"{scope['method']} {scope['path']}"
+        with self.tracer.span(name, kind=SPAN_KIND_SERVER, parent=parent) as span:
+            span.set_attribute('http.method', scope['method'])
+            span.set_attribute('http.target', scope['path'])
+
+            async def send_with_trace(message) -> None:
+                if message['type'] == 'http.response.start':
+                    span.set_attribute('http.status_code', message['status'])
+                    if message['status'] >= 500:
+                        span.status_code = STATUS_ERROR
+                    message = {
+                        **message,
+                        'headers': list(message.get('headers', [])) + [(b'traceparent', span.traceparent.encode())],
+                    }
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
+
+
+tracer = Tracer()
+
+
+def configure_tracing(
+    service_name: str,
+    enabled: bool,
+    exporter_name: str,
+    file_path: Path,
+    otlp_endpoint: str,
+) -> Tracer:
+    exporter: SpanExporter | None = None
+    if enabled:
+        if exporter_name == 'otlp':
+            exporter = OtlpHttpSpanExporter(otlp_endpoint)
+        else:
+            exporter = FileSpanExporter(file_path)
+    tracer.configure(service_name, exporter)
+    return tracer
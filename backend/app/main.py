@@ -7,19 +7,56 @@ os.environ.setdefault('KMP_DUPLICATE_LIB_OK', 'TRUE')
 os.environ.setdefault('OMP_NUM_THREADS', '1')
 os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from app.api.chat import router as chat_router
-from app.api.upload import router as upload_router
+from app.api.admin import router as admin_router
 from app.core.config import get_settings
 from app.core.logging import setup_logging
-from app.models.response_models import HealthResponse
+from app.core.metrics import REGISTRY
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import TracingMiddleware, configure_tracing
+from app.models.response_models import HealthResponse, ReadinessResponse
+from app.utils.dependencies import (
+    get_admission_controller,
+    get_executor_registry,
+    get_io_pool,
+    get_warmup_service,
+)
 
 settings = get_settings()
 setup_logging(settings.log_level)
+tracer = configure_tracing(
+    service_name=settings.app_name,
+    enabled=settings.tracing_enabled,
+    exporter_name=settings.tracing_exporter,
+    file_path=settings.tracing_file_path,
+    otlp_endpoint=settings.tracing_otlp_endpoint,
+)
+
 
-app = FastAPI(title=settings.app_name, debug=settings.app_debug)
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    warmup_service = get_warmup_service()
+    warmup_task = None
+    if settings.warmup_on_startup:
+        # Runs in the background so /health answers immediately; /ready flips once this completes.
+        warmup_task = asyncio.create_task(get_io_pool().run(warmup_service.run))
+    else:
+        warmup_service.mark_ready()
+    yield
+    warmup_service.stop()
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    get_executor_registry().shutdown()
+    tracer.shutdown()
+
+
+app = FastAPI(title=settings.app_name, debug=settings.app_debug, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,7 +64,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=['*'],
     allow_headers=['*'],
+    expose_headers=['traceparent'],
 )
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=settings.profiling_dir,
+        sample_rate=settings.profiling_sample_rate,
+        header=settings.profiling_header,
+        path_prefixes=(f'{settings.api_prefix}/chat', f'{settings.api_prefix}/upload'),
+    )
+if tracer.enabled:
+    app.add_middleware(TracingMiddleware, tracer=tracer)
 
 
 @app.get('/health', response_model=HealthResponse)
@@ -35,5 +83,54 @@ async def health_check() -> HealthResponse:
     return HealthResponse(status='ok', app=settings.app_name)
 
 
-app.include_router(upload_router, prefix=settings.api_prefix)
-app.include_router(chat_router, prefix=settings.api_prefix)
+@app.get('/ready', response_model=ReadinessResponse)
+async def readiness_check():
+    snapshot = get_warmup_service().snapshot()
+    body = ReadinessResponse(
+        status='ready' if snapshot['ready'] else ('failed' if snapshot['finished'] else 'warming_up'),
+        app=settings.app_name,
+        steps=snapshot['steps'],
+    )
+    if not snapshot['ready']:
+        return JSONResponse(status_code=503, content=body.model_dump())
+    return body
+
+
+def _runtime_gauges():
+    for name, stats in get_admission_controller().stats().items():
+        labels = {'gate': name}
+        yield 'admission_in_flight', 'Requests holding an admission slot.', labels, stats['in_flight']
+        yield 'admission_queue_depth', 'Requests waiting for an admission slot.', labels, stats['queue_depth']
+        yield 'admission_wait_seconds_avg', 'Average admission queue wait.', labels, stats['avg_wait_s']
+        yield 'admission_wait_seconds_max', 'Longest admission queue wait.', labels, stats['max_wait_s']
+        for reason in ('queue_full', 'timeout'):
+            yield (
+                'admission_rejected',
+                'Requests rejected by admission control (cumulative).',
+                {**labels, 'reason': reason},
+                stats[f'rejected_{reason}'],
+            )
+    for name, stats in get_executor_registry().stats().items():
+        labels = {'pool': name, 'kind': stats['kind']}
+        yield 'executor_pending_tasks', 'Tasks submitted to the pool and not yet finished.', labels, stats['pending']
+        yield 'executor_utilization', 'Fraction of pool workers busy.', labels, stats['utilization']
+
+
+if settings.metrics_enabled:
+    REGISTRY.register_collector(_runtime_gauges)
+
+    @app.get('/metrics', include_in_schema=False)
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse(REGISTRY.render(), media_type='text/plain; version=0.0.4')
+
+
+# Routers are imported per role so chat-only workers never load the ingestion stack (and vice versa).
+if settings.serves_ingest:
+    from app.api.upload import router as upload_router
+
+    app.include_router(upload_router, prefix=settings.api_prefix)
+if settings.serves_chat:
+    from app.api.chat import router as chat_router
+
+    app.include_router(chat_router, prefix=settings.api_prefix)
+app.include_router(admin_router, prefix=settings.api_prefix)
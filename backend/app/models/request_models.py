@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import BaseModel, Field, HttpUrl
 
 
@@ -8,16 +10,41 @@ class UploadRequest(BaseModel):
     collection_name: str | None = Field(default=None, description='Optional custom Milvus collection name')
 
 
+class BatchUploadRequest(BaseModel):
+    urls: list[HttpUrl] = Field(..., min_length=1, description='Video, playlist or channel URLs')
+    collection_name: str | None = Field(default=None, description='Optional custom Milvus collection name')
+
+
 class ChatRequest(BaseModel):
     question: str = Field(..., min_length=1)
     video_id: str | None = Field(default=None)
     collection_name: str | None = Field(default=None)
     top_k: int | None = Field(default=None, ge=1, le=20)
+    session_id: str | None = Field(default=None, description='From POST /chat/sessions; overrides video/collection')
+    client_id: str | None = Field(default=None, max_length=128, description='Claims hits from POST /chat/prefetch')
+
+
+class PrefetchRequest(BaseModel):
+    question: str = Field(..., min_length=1, description='Partial question as typed so far')
+    client_id: str = Field(..., min_length=1, max_length=128)
+    video_id: str | None = Field(default=None)
+    collection_name: str | None = Field(default=None)
+    top_k: int | None = Field(default=None, ge=1, le=20)
+    session_id: str | None = Field(default=None)
+
+
+class ChatSessionRequest(BaseModel):
+    video_id: str | None = Field(default=None)
+    collection_name: str | None = Field(default=None)
 
 
 class RebuildCollectionRequest(BaseModel):
     youtube_url: HttpUrl
     collection_name: str | None = None
+    mode: Literal['incremental', 'full'] = Field(
+        default='incremental',
+        description='incremental re-embeds only changed chunks and swaps data in without downtime; full drops first',
+    )
 
 
 class DeleteCollectionRequest(BaseModel):
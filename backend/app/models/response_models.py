@@ -8,6 +8,12 @@ class HealthResponse(BaseModel):
     app: str
 
 
+class ReadinessResponse(BaseModel):
+    status: str
+    app: str
+    steps: dict
+
+
 class UploadResponse(BaseModel):
     video_id: str
     title: str
@@ -16,6 +22,26 @@ class UploadResponse(BaseModel):
     transcript_path: str
 
 
+class BatchItemResponse(BaseModel):
+    url: str
+    status: str
+    video_id: str | None = None
+    result: UploadResponse | None = None
+    error: str | None = None
+    stage_seconds: dict[str, float] = {}
+
+
+class BatchStatusResponse(BaseModel):
+    batch_id: str
+    status: str
+    error: str | None = None
+    total: int
+    completed: int
+    counts: dict[str, int]
+    elapsed_s: float
+    items: list[BatchItemResponse] = []
+
+
 class SourceChunk(BaseModel):
     text: str
     metadata: dict
@@ -26,6 +52,20 @@ class ChatResponse(BaseModel):
     answer: str
     sources: list[SourceChunk]
     tokens_used: int
+    session_id: str | None = None
+
+
+class PrefetchResponse(BaseModel):
+    status: str
+
+
+class ChatSessionResponse(BaseModel):
+    session_id: str
+    collection_name: str
+    video_id: str | None = None
+    turns: int
+    chunks: int
+    age_s: float
 
 
 class GenericResponse(BaseModel):
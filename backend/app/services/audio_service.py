@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from moviepy.editor import VideoFileClip
+AUDIO_SUFFIXES = ('.mp3', '.wav', '.m4a', '.flac', '.ogg', '.opus', '.aac')
 
 
 class AudioService:
@@ -10,7 +10,14 @@ class AudioService:
         self.audio_dir = audio_dir
 
     def extract_mp3(self, video_path: Path, video_id: str) -> Path:
+        from moviepy.editor import AudioFileClip, VideoFileClip
+
         output = self.audio_dir / f'{video_id}.mp3'
+        if video_path.suffix.lower() in AUDIO_SUFFIXES:
+            # Uploaded recordings may be audio only; VideoFileClip needs a video stream.
+            with AudioFileClip(str(video_path)) as clip:
+                clip.write_audiofile(str(output), codec='mp3', logger=None)
+            return output
         with VideoFileClip(str(video_path)) as clip:
             if clip.audio is None:
                 raise ValueError('No audio stream found in video')
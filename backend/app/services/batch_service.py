@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.admission import AdmissionRejected
+from app.core.executors import ExecutorPool
+from app.core.metrics import ERRORS
+from app.services.pipeline_service import IngestJob, PipelineService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchItem:
+    url: str
+    status: str = 'pending'
+    video_id: str | None = None
+    result: dict | None = None
+    error: str | None = None
+    started_at: float | None = None
+    finished_at: float | None = None
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            'url': self.url,
+            'status': self.status,
+            'video_id': self.video_id,
+            'result': self.result,
+            'error': self.error,
+            'stage_seconds': {name: round(value, 3) for name, value in self.stage_seconds.items()},
+        }
+
+
+@dataclass
+class BatchJob:
+    id: str
+    sources: list[str]
+    collection_name: str | None
+    status: str = 'expanding'
+    items: list[BatchItem] = field(default_factory=list)
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+    def snapshot(self, include_items: bool = True) -> dict[str, Any]:
+        counts: dict[str, int] = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        done = sum(counts.get(status, 0) for status in ('done', 'cached', 'failed'))
+        payload: dict[str, Any] = {
+            'batch_id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'total': len(self.items),
+            'completed': done,
+            'counts': counts,
+            'elapsed_s': round((self.finished_at or time.time()) - self.created_at, 1),
+        }
+        if include_items:
+            payload['items'] = [item.snapshot() for item in self.items]
+        return payload
+
+
+class BatchIngestionService:
+    """Runs many videos through the ingestion stages as a pipeline, one bounded pool per stage.
+
+    A video moves to the next stage's pool as soon as it leaves the previous one, so downloads of later
+    videos overlap transcription and indexing of earlier ones. `max_in_flight` bounds how far downloads
+    may run ahead of indexing (and therefore disk usage).
+    """
+
+    def __init__(
+        self,
+        pipeline_service: PipelineService,
+        stage_pools: dict[str, ExecutorPool],
+        max_in_flight: int,
+        max_items: int,
+        max_active: int = 2,
+        history: int = 50,
+    ) -> None:
+        self.pipeline_service = pipeline_service
+        self.stage_pools = stage_pools
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_items = max_items
+        self.max_active = max(1, max_active)
+        self.history = history
+        self._jobs: OrderedDict[str, BatchJob] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, sources: list[str], collection_name: str | None = None) -> BatchJob:
+        job = BatchJob(id=os.urandom(8).hex(), sources=sources, collection_name=collection_name)
+        with self._lock:
+            # Items skip the per-request ingestion gate, so the number of unfinished batches is what bounds queued work.
+            active = sum(1 for existing in self._jobs.values() if existing.finished_at is None)
+            if active >= self.max_active:
+                raise AdmissionRejected('batch', 429, 60, f'{active} batches are already running')
+            self._jobs[job.id] = job
+            # Oldest finished batches go first; a long-running old batch must not pin everything behind it.
+            excess = len(self._jobs) - self.history
+            if excess > 0:
+                finished = [batch_id for batch_id, existing in self._jobs.items() if existing.finished_at is not None]
+                for batch_id in finished[:excess]:
+                    del self._jobs[batch_id]
+        threading.Thread(target=self._run, args=(job,), name=f'batch-{job.id}', daemon=True).start()
+        return job
+
+    def get(self, batch_id: str) -> BatchJob | None:
+        with self._lock:
+            return self._jobs.get(batch_id)
+
+    def jobs(self) -> list[BatchJob]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def _run(self, job: BatchJob) -> None:
+        try:
+            urls: list[str] = []
+            for source in job.sources:
+                # One past the limit is enough to tell an oversized batch apart without listing a whole channel.
+                urls.extend(self.pipeline_service.youtube_service.expand_urls(source, self.max_items + 1 - len(urls)))
+                urls = list(dict.fromkeys(urls))
+                if len(urls) > self.max_items:
+                    break
+            if len(urls) > self.max_items:
+                raise ValueError(f'Batch expands to more than {self.max_items} videos')
+            job.items = [BatchItem(url=url) for url in urls]
+        except Exception as exc:  # noqa: BLE001
+            logger.exception('Batch expansion failed', extra={'batch_id': job.id})
+            job.status = 'failed'
+            job.error = str(exc)
+            job.finished_at = time.time()
+            return
+
+        job.status = 'running'
+        logger.info('Batch started', extra={'batch_id': job.id, 'videos': len(job.items)})
+        slots = threading.Semaphore(self.max_in_flight)
+        remaining = threading.Semaphore(0)
+        for item in job.items:
+            slots.acquire()
+            item.started_at = time.time()
+            try:
+                ingest_job = self.pipeline_service.start_job(item.url, job.collection_name)
+            except Exception as exc:  # noqa: BLE001
+                self._finish(item, None, exc, slots, remaining)
+                continue
+            self._advance(item, ingest_job, 0, slots, remaining)
+
+        for _ in job.items:
+            remaining.acquire()
+        job.status = 'completed'
+        job.finished_at = time.time()
+        logger.info('Batch finished', extra={'batch_id': job.id, **job.snapshot(include_items=False)['counts']})
+
+    def _advance(
+        self,
+        item: BatchItem,
+        ingest_job: IngestJob,
+        index: int,
+        slots: threading.Semaphore,
+        remaining: threading.Semaphore,
+    ) -> None:
+        stages = self.pipeline_service.stages()
+        if ingest_job.result is not None or index >= len(stages):
+            self._finish(item, ingest_job, None, slots, remaining)
+            return
+
+        name, run_stage = stages[index]
+        item.status = f'queued:{name}'
+
+        def _run_stage() -> None:
+            item.status = name
+            started = time.perf_counter()
+            try:
+                run_stage(ingest_job)
+            finally:
+                item.stage_seconds[name] = time.perf_counter() - started
+            if ingest_job.downloaded is not None:
+                item.video_id = ingest_job.downloaded.video_id
+
+        def _on_done(future) -> None:
+            exc = RuntimeError('stage cancelled') if future.cancelled() else future.exception()
+            if exc is not None:
+                self._finish(item, ingest_job, exc, slots, remaining)
+            else:
+                self._advance(item, ingest_job, index + 1, slots, remaining)
+
+        self.stage_pools[name].submit(_run_stage).add_done_callback(_on_done)
+
+    def _finish(
+        self,
+        item: BatchItem,
+        ingest_job: IngestJob | None,
+        exc: BaseException | None,
+        slots: threading.Semaphore,
+        remaining: threading.Semaphore,
+    ) -> None:
+        if ingest_job is not None:
+            self.pipeline_service.finish_job(ingest_job)
+        if exc is not None:
+            ERRORS.inc(component='batch', kind='item')
+            logger.warning('Batch item failed', extra={'url': item.url, 'stage': item.status, 'error': str(exc)})
+            item.error = f'{item.status}: {exc}'
+            item.status = 'failed'
+        else:
+            item.result = ingest_job.result
+            item.video_id = ingest_job.result['video_id']
+            # Without an indexing stage the video was answered from an existing manifest.
+            item.status = 'done' if 'indexing' in item.stage_seconds else 'cached'
+        item.finished_at = time.time()
+        slots.release()
+        remaining.release()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp_path = path.with_name(f'{path.name}.tmp')
+    with tmp_path.open('w', encoding='utf-8') as handle:
+        handle.write(text)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+class SegmentLog:
+    """Append-only JSONL of transcribed segments; a torn last line from a crash is ignored on read."""
+
+    def __init__(self, path: Path, fsync_every: int = 10) -> None:
+        self.path = path
+        self.fsync_every = fsync_every
+        self._handle = None
+        self._pending = 0
+
+    def read(self) -> list[dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        segments: list[dict[str, Any]] = []
+        with self.path.open('r', encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    segments.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return segments
+
+    def truncate_to(self, segments: list[dict[str, Any]]) -> None:
+        # Rewrites the log without a torn tail so new appends start on a clean line.
+        _write_atomic(self.path, ''.join(json.dumps(segment) + '\n' for segment in segments))
+
+    def append(self, start: float, end: float, text: str) -> None:
+        if self._handle is None:
+            self._handle = self.path.open('a', encoding='utf-8')
+        self._handle.write(json.dumps({'start': round(start, 3), 'end': round(end, 3), 'text': text}) + '\n')
+        self._handle.flush()
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            os.fsync(self._handle.fileno())
+            self._pending = 0
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._handle.close()
+            self._handle = None
+            self._pending = 0
+
+
+@dataclass
+class IngestCheckpoint:
+    """Durable progress of one video's ingestion, rewritten atomically after every completed step."""
+
+    video_id: str
+    path: Path
+    title: str = ''
+    video_path: str = ''
+    audio_path: str = ''
+    transcript_path: str = ''
+    collection: str = ''
+    chunk_size: int = 0
+    chunk_overlap: int = 0
+    chunk_count: int = 0
+    inserted_chunks: int = 0
+    summary: dict = field(default_factory=dict)
+
+    @classmethod
+    def for_video(cls, transcript_dir: Path, video_id: str) -> IngestCheckpoint:
+        path = transcript_dir / f'{video_id}.checkpoint.json'
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+                data.pop('video_id', None)
+                return cls(video_id=video_id, path=path, **data)
+            except (json.JSONDecodeError, OSError, TypeError) as exc:
+                logger.warning('Ignoring unreadable ingest checkpoint', extra={'path': str(path), 'error': str(exc)})
+        return cls(video_id=video_id, path=path)
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @property
+    def segment_log_path(self) -> Path:
+        return self.path.with_name(f'{self.video_id}.segments.jsonl')
+
+    @property
+    def stage(self) -> str:
+        if self.chunk_count:
+            return 'insert'
+        if self.transcript_path:
+            return 'chunking'
+        if self.audio_path:
+            return 'transcription'
+        if self.video_path:
+            return 'audio_extraction'
+        return 'download'
+
+    def update(self, **values: Any) -> None:
+        for key, value in values.items():
+            setattr(self, key, value)
+        data = asdict(self)
+        data.pop('path')
+        _write_atomic(self.path, json.dumps(data, indent=2))
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.segment_log_path.unlink(missing_ok=True)
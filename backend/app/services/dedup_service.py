@@ -0,0 +1,106 @@
+"""Near-duplicate chunk detection with MinHash signatures and LSH banding.
+
+Auto-generated transcripts repeat intros, sponsor reads and catch phrases. Chunks whose word-shingle Jaccard
+similarity reaches `threshold` are collapsed into the first occurrence, which keeps a back-reference to each copy.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from typing import Any
+
+_WORD_PATTERN = re.compile(r"[a-z0-9']+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Back-reference fields copied from a collapsed chunk's metadata.
+_REFERENCE_KEYS = ('chunk_index', 'start_s', 'end_s')
+
+
+def _lsh_bands(num_perm: int, threshold: float, recall: float = 0.99) -> int:
+    # A pair with Jaccard s shares at least one of b bands of r rows with probability 1 - (1 - s^r)^b. Take the fewest
+    # bands that still catch pairs at the threshold with `recall`; extra candidates only cost an exact Jaccard check.
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands == 0 and 1 - (1 - threshold ** (num_perm // bands)) ** bands >= recall:
+            return bands
+    return num_perm
+
+
+class DedupService:
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, shingle_words: int = 5, seed: int = 1) -> None:
+        if not 0 < threshold <= 1:
+            raise ValueError('threshold must be in (0, 1]')
+        self.threshold = threshold
+        self.num_perm = max(1, num_perm)
+        self.shingle_words = max(1, shingle_words)
+        self.bands = _lsh_bands(self.num_perm, threshold)
+        self.rows = self.num_perm // self.bands
+        # Fixed seed: the same transcript always collapses the same way, which checkpoints and incremental sync rely on.
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1)) for _ in range(self.num_perm)
+        ]
+
+    def shingles(self, text: str) -> set[int]:
+        words = _WORD_PATTERN.findall(text.lower())
+        size = self.shingle_words
+        grams = [' '.join(words[start:start + size]) for start in range(max(1, len(words) - size + 1))]
+        digests = (hashlib.blake2b(gram.encode('utf-8'), digest_size=4).digest() for gram in grams)
+        return {int.from_bytes(digest, 'little') for digest in digests}
+
+    def signature(self, shingles: set[int]) -> tuple[int, ...]:
+        if not shingles:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(
+            min((a * value + b) % _MERSENNE_PRIME for value in shingles) & _MAX_HASH for a, b in self._permutations
+        )
+
+    def find_duplicates(self, texts: list[str]) -> dict[int, int]:
+        """Map each near-duplicate index to the index of the earlier text it duplicates."""
+
+        buckets: dict[tuple[int, tuple[int, ...]], list[int]] = {}
+        shingle_sets: dict[int, set[int]] = {}
+        duplicates: dict[int, int] = {}
+        for index, text in enumerate(texts):
+            shingles = self.shingles(text)
+            signature = self.signature(shingles)
+            keys = [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+            candidates = {kept for key in keys for kept in buckets.get(key, ())}
+            best, best_similarity = None, 0.0
+            for kept in sorted(candidates):
+                similarity = _jaccard(shingles, shingle_sets[kept])
+                if similarity >= self.threshold and similarity > best_similarity:
+                    best, best_similarity = kept, similarity
+            if best is not None:
+                duplicates[index] = best
+                continue
+            # Only first occurrences enter the index, so every duplicate points straight at a kept chunk.
+            shingle_sets[index] = shingles
+            for key in keys:
+                buckets.setdefault(key, []).append(index)
+        return duplicates
+
+    def collapse(
+        self,
+        chunks: list[str],
+        metadata: list[dict[str, Any]],
+    ) -> tuple[list[str], list[dict[str, Any]], int]:
+        """Drop near-duplicate chunks; each kept chunk lists the copies it stands for under `duplicates`."""
+
+        duplicates = self.find_duplicates(chunks)
+        if not duplicates:
+            return chunks, metadata, 0
+        kept_metadata = {index: dict(item) for index, item in enumerate(metadata) if index not in duplicates}
+        for index, kept in sorted(duplicates.items()):
+            reference = {key: metadata[index][key] for key in _REFERENCE_KEYS if key in metadata[index]}
+            kept_metadata[kept].setdefault('duplicates', []).append(reference)
+        kept_indexes = sorted(kept_metadata)
+        kept_chunks = [chunks[index] for index in kept_indexes]
+        return kept_chunks, [kept_metadata[index] for index in kept_indexes], len(duplicates)
+
+
+def _jaccard(left: set[int], right: set[int]) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
@@ -1,22 +1,163 @@
 from __future__ import annotations
 
+import logging
+import math
 import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+from app.core.admission import AdmissionGate
+from app.core.executors import ExecutorPool
+from app.core.metrics import EMBEDDING_CHUNKS_PER_SECOND
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per wordpiece token for English transcripts; only used to size batches, never to truncate.
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    # +2 for the [CLS]/[SEP] special tokens every sequence carries.
+    return len(text) // _CHARS_PER_TOKEN + 2
+
+
+def plan_batches(texts: list[str], max_batch_tokens: int) -> list[list[int]]:
+    """Group text indexes into length-sorted batches whose padded size stays within `max_batch_tokens`.
+
+    A batch is padded to its longest text, so its cost is `len(batch) * longest`; sorting by length keeps
+    neighbours similar and the padding small. A single text longer than the budget still gets its own batch.
+    """
+
+    order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+    batches: list[list[int]] = []
+    current: list[int] = []
+    for index in order:
+        # Ascending order: the text being added is the longest in the batch.
+        if current and (len(current) + 1) * estimate_tokens(texts[index]) > max_batch_tokens:
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
 
 
 class EmbeddingService:
-    def __init__(self, model_name: str, device: str) -> None:
+    def __init__(
+        self,
+        model_name: str,
+        device: str,
+        admission_gate: AdmissionGate | None = None,
+        query_executor: ExecutorPool | None = None,
+        batch_executor: ExecutorPool | None = None,
+        backend: str = 'torch',
+        onnx_dir: Path | None = None,
+        onnx_threads: int = 0,
+        batch_tokens: int = 8192,
+    ) -> None:
         # Stabilize torch/sentence-transformers runtime on macOS.
         os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
         os.environ.setdefault('OMP_NUM_THREADS', '1')
         os.environ.setdefault('KMP_DUPLICATE_LIB_OK', 'TRUE')
+
+        self.model_name = model_name
+        self.device = device
+        self.admission_gate = admission_gate
+        self.query_executor = query_executor
+        self.batch_executor = batch_executor
+        self.backend = backend
+        self.onnx_dir = onnx_dir
+        self.onnx_threads = onnx_threads
+        self.batch_tokens = max(1, batch_tokens)
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    def _load_model(self):
+        if self.backend == 'onnx':
+            # Never imports torch; the exported model must match EMBEDDING_MODEL or vectors would not fit the index.
+            from app.services.onnx_embedding import OnnxEncoder
+
+            encoder = OnnxEncoder(self.onnx_dir, threads=self.onnx_threads)
+            if encoder.model_name != self.model_name:
+                raise RuntimeError(
+                    f'ONNX model in {self.onnx_dir} was exported from {encoder.model_name}, not {self.model_name}'
+                )
+            return encoder
+
         from sentence_transformers import SentenceTransformer
 
-        self.model = SentenceTransformer(model_name, device=device)
+        return SentenceTransformer(self.model_name, device=self.device)
 
     def embed_text(self, text: str) -> list[float]:
+        with self._slot():
+            if self.query_executor is not None:
+                return self.query_executor.call(self._encode_one, text)
+            return self._encode_one(text)
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts in length buckets, spread across the ingestion process pool when there is one.
+
+        Vectors come back in the order of `texts`.
+        """
+
+        if not texts:
+            return []
+        started = time.perf_counter()
+        vectors: list[list[float] | None] = [None] * len(texts)
+        # No admission slot: the embedding gate is for chat queries. Ingestion is already bounded by its own gate
+        # and the embedding pool, and a rejection here would throw away a finished transcription.
+        if self.batch_executor is not None:
+            from app.services import worker_tasks
+
+            # Cap the budget so a batch smaller than EMBEDDING_BATCH_TOKENS still keeps every worker busy.
+            share = math.ceil(sum(estimate_tokens(text) for text in texts) / self.batch_executor.size)
+            batches = plan_batches(texts, min(self.batch_tokens, max(share, 1)))
+            futures = [
+                self.batch_executor.submit(worker_tasks.embed_batch, [texts[index] for index in batch])
+                for batch in batches
+            ]
+            for batch, future in zip(batches, futures):
+                for index, vector in zip(batch, future.result()):
+                    vectors[index] = vector
+        else:
+            batches = plan_batches(texts, self.batch_tokens)
+            for batch in batches:
+                encoded = self.model.encode(
+                    [texts[index] for index in batch],
+                    batch_size=len(batch),
+                    normalize_embeddings=True,
+                )
+                for index, vector in zip(batch, encoded):
+                    vectors[index] = vector.tolist()
+
+        elapsed = time.perf_counter() - started
+        EMBEDDING_CHUNKS_PER_SECOND.observe(len(texts) / max(elapsed, 1e-9), backend=self.backend)
+        logger.debug(
+            'Embedded batch',
+            extra={'chunks': len(texts), 'batches': len(batches), 'seconds': round(elapsed, 3)},
+        )
+        return vectors
+
+    def warmup(self, batch: bool = False) -> None:
+        if batch and self.batch_executor is not None:
+            # Workers warm their model in the pool initializer, before they take any task.
+            self.batch_executor.wait_for_workers()
+            return
+        self._encode_one('warmup')
+
+    def _encode_one(self, text: str) -> list[float]:
         vector = self.model.encode(text, normalize_embeddings=True)
         return vector.tolist()
 
-    def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        vectors = self.model.encode(texts, normalize_embeddings=True)
-        return [vector.tolist() for vector in vectors]
+    def _slot(self):
+        return self.admission_gate.slot() if self.admission_gate else nullcontext()
@@ -0,0 +1,231 @@
+"""Direct media uploads: a multipart body streamed to disk in fixed-size chunks and hashed as it arrives.
+
+The content hash names the upload (`media_<sha256 prefix>`), so the same recording uploaded twice is stored and
+indexed once, the way YouTube videos are deduplicated by their video id.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, AsyncIterator, Awaitable, Callable
+
+from app.services.youtube_service import DownloadedVideo
+
+logger = logging.getLogger(__name__)
+
+FILE_FIELD = 'file'
+_BOUNDARY_PATTERN = re.compile(r'boundary=(?:"([^"]+)"|([^;\s]+))', re.IGNORECASE)
+_PARAM_PATTERN = re.compile(r';\s*([a-zA-Z*]+)=(?:"((?:[^"\\]|\\.)*)"|([^;\s]*))')
+_SUFFIX_PATTERN = re.compile(r'^\.[a-z0-9]{1,8}$')
+_MAX_FIELD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """The body exceeded MEDIA_UPLOAD_MAX_BYTES; maps to 413."""
+
+
+class MultipartReader:
+    """Incremental multipart/form-data parser.
+
+    `feed` takes body chunks and returns ('part', (name, filename)), ('data', bytes) and ('end', None) events. It only
+    holds back the few bytes that could be the start of the next delimiter, so memory does not grow with part size.
+    """
+
+    def __init__(self, boundary: bytes, max_header_bytes: int = 16 * 1024) -> None:
+        self._delimiter = b'--' + boundary
+        self._separator = b'\r\n--' + boundary
+        self._max_header_bytes = max_header_bytes
+        self._buffer = bytearray()
+        self._state = 'preamble'
+
+    def feed(self, data: bytes) -> list[tuple[str, Any]]:
+        buffer = self._buffer
+        buffer += data
+        events: list[tuple[str, Any]] = []
+        while True:
+            if self._state == 'preamble':
+                index = buffer.find(self._delimiter)
+                if index < 0:
+                    del buffer[: max(0, len(buffer) - len(self._delimiter) + 1)]
+                    break
+                del buffer[: index + len(self._delimiter)]
+                self._state = 'delimiter'
+            elif self._state == 'delimiter':
+                if len(buffer) < 2:
+                    break
+                if buffer[:2] == b'--':
+                    self._state = 'done'
+                    events.append(('end', None))
+                    continue
+                if buffer[:2] != b'\r\n':
+                    raise ValueError('Malformed multipart body: bad delimiter line')
+                del buffer[:2]
+                self._state = 'headers'
+            elif self._state == 'headers':
+                index = buffer.find(b'\r\n\r\n')
+                if index < 0:
+                    if len(buffer) > self._max_header_bytes:
+                        raise ValueError('Malformed multipart body: part headers too large')
+                    break
+                events.append(('part', _content_disposition(bytes(buffer[:index]))))
+                del buffer[: index + 4]
+                self._state = 'data'
+            elif self._state == 'data':
+                index = buffer.find(self._separator)
+                if index < 0:
+                    keep = len(self._separator) - 1
+                    if len(buffer) > keep:
+                        events.append(('data', bytes(buffer[:-keep])))
+                        del buffer[:-keep]
+                    break
+                if index:
+                    events.append(('data', bytes(buffer[:index])))
+                del buffer[: index + len(self._separator)]
+                self._state = 'delimiter'
+            else:
+                # Epilogue after the closing delimiter is ignored.
+                buffer.clear()
+                break
+        return events
+
+    def close(self) -> None:
+        if self._state != 'done':
+            raise ValueError('Malformed multipart body: missing closing boundary')
+
+
+def _content_disposition(raw_headers: bytes) -> tuple[str, str | None]:
+    for line in raw_headers.decode('latin-1').split('\r\n'):
+        name, _, value = line.partition(':')
+        if name.strip().lower() != 'content-disposition':
+            continue
+        params = {key.lower(): quoted or plain for key, quoted, plain in _PARAM_PATTERN.findall(value)}
+        if 'filename' in params:
+            # Browsers send UTF-8 bytes in the quoted filename; undo the latin-1 decoding above.
+            params['filename'] = params['filename'].encode('latin-1').decode('utf-8', 'replace')
+        return params.get('name', ''), params.get('filename')
+    raise ValueError('Malformed multipart body: part without Content-Disposition')
+
+
+def multipart_boundary(content_type: str) -> bytes:
+    if not content_type.lower().startswith('multipart/form-data'):
+        raise ValueError('Expected a multipart/form-data body')
+    match = _BOUNDARY_PATTERN.search(content_type)
+    if not match:
+        raise ValueError('multipart/form-data body without a boundary')
+    return (match.group(1) or match.group(2)).encode('latin-1')
+
+
+@dataclass
+class ReceivedMedia:
+    video: DownloadedVideo
+    sha256: str
+    size_bytes: int
+    fields: dict[str, str] = field(default_factory=dict)
+
+
+class MediaUploadService:
+    def __init__(self, upload_dir: Path, chunk_bytes: int = 1024 * 1024, max_bytes: int = 20 * 1024**3) -> None:
+        self.upload_dir = upload_dir
+        self.chunk_bytes = max(64 * 1024, chunk_bytes)
+        self.max_bytes = max_bytes
+
+    async def receive(
+        self,
+        body: AsyncIterator[bytes],
+        content_type: str,
+        run: Callable[..., Awaitable[Any]],
+    ) -> ReceivedMedia:
+        """Stream the `file` part of a multipart body to disk; other parts are read as small text fields.
+
+        `run` executes the blocking disk writes off the event loop (e.g. the io pool's `run`).
+        """
+
+        started = time.perf_counter()
+        reader = MultipartReader(multipart_boundary(content_type))
+        incoming = self.upload_dir / 'incoming'
+        incoming.mkdir(parents=True, exist_ok=True)
+        tmp_path = incoming / f'{uuid.uuid4().hex}.part'
+
+        digest = hashlib.sha256()
+        fields: dict[str, bytearray] = {}
+        filename: str | None = None
+        handle: IO[bytes] | None = None
+        writing = False
+        target: bytearray | None = None
+        pending = bytearray()
+        size = 0
+        try:
+            async for data in body:
+                for kind, value in reader.feed(data):
+                    if kind == 'part':
+                        name, part_filename = value
+                        target, writing = None, False
+                        if name == FILE_FIELD and part_filename is not None and handle is None:
+                            filename = part_filename
+                            handle = tmp_path.open('wb')
+                            writing = True
+                        elif part_filename is None:
+                            target = fields.setdefault(name, bytearray())
+                        # Further file parts are skipped, not stored.
+                    elif kind == 'data' and target is not None:
+                        if len(target) + len(value) > _MAX_FIELD_BYTES:
+                            raise ValueError('Form field too large')
+                        target += value
+                    elif kind == 'data' and writing:
+                        size += len(value)
+                        if size > self.max_bytes:
+                            raise UploadTooLarge(f'Upload exceeds {self.max_bytes} bytes')
+                        pending += value
+                        if len(pending) >= self.chunk_bytes:
+                            await run(_write_chunk, handle, digest, bytes(pending))
+                            pending.clear()
+            reader.close()
+            if handle is None:
+                raise ValueError(f'Multipart body has no "{FILE_FIELD}" file part')
+            if pending:
+                await run(_write_chunk, handle, digest, bytes(pending))
+            handle.close()
+            handle = None
+            if not size:
+                raise ValueError('Uploaded file is empty')
+            text_fields = {name: value.decode('utf-8', 'replace').strip() for name, value in fields.items()}
+            video = await run(self._store, tmp_path, digest.hexdigest(), filename or '', text_fields.get('title', ''))
+        finally:
+            if handle is not None:
+                handle.close()
+            tmp_path.unlink(missing_ok=True)
+
+        logger.info(
+            'Received media upload',
+            extra={
+                'video_id': video.video_id,
+                'bytes': size,
+                'seconds': round(time.perf_counter() - started, 2),
+            },
+        )
+        return ReceivedMedia(video, digest.hexdigest(), size, text_fields)
+
+    def _store(self, tmp_path: Path, sha256: str, filename: str, title: str) -> DownloadedVideo:
+        media_id = f'media_{sha256[:24]}'
+        suffix = Path(filename).suffix.lower()
+        if not _SUFFIX_PATTERN.match(suffix):
+            suffix = '.bin'
+        existing = sorted(self.upload_dir.glob(f'{media_id}.*'))
+        if existing:
+            # Same bytes as an earlier upload: keep the stored copy, drop this one.
+            path = existing[0]
+        else:
+            path = self.upload_dir / f'{media_id}{suffix}'
+            tmp_path.replace(path)
+        return DownloadedVideo(media_id, title or Path(filename).stem or media_id, path)
+
+
+def _write_chunk(handle: IO[bytes], digest: Any, data: bytes) -> None:
+    digest.update(data)
+    handle.write(data)
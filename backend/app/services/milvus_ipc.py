@@ -0,0 +1,386 @@
+"""Single-owner Milvus Lite serving for multi-worker deployments.
+
+Milvus Lite's file mode must only be opened by one process. `MilvusOwnerServer` is that process: it holds the
+connection and serves API workers over a Unix socket. `RemoteMilvusService` is a drop-in `MilvusService` that
+forwards every data operation to it. Run the owner with `python -m app.services.milvus_ipc`.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import queue
+import signal
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from app.core.metrics import MILVUS_OPERATION_SECONDS
+from app.services.milvus_service import MilvusService
+
+logger = logging.getLogger(__name__)
+
+# Reads are batched on one lane and writes serialized on another, so a long insert+flush never stalls chat search.
+READ_METHODS = frozenset(
+    {
+        'search',
+        'search_many',
+        'fetch_chunks_by_index',
+        'fetch_video_chunks',
+        'collection_size',
+        'load_collection',
+        'list_collections',
+        'index_params',
+    }
+)
+WRITE_METHODS = frozenset({'upsert_chunks', 'delete_ids', 'delete_video_chunks', 'drop_collection', 'swap_collection'})
+# Calls expected to answer quickly; everything else (writes with their flush, loads, whole-video fetches) can take
+# minutes, and abandoning one client-side would not stop the owner from applying it.
+FAST_METHODS = frozenset(
+    {'search', 'search_many', 'fetch_chunks_by_index', 'collection_size', 'list_collections', 'index_params'}
+)
+
+
+class MilvusOwnerError(Exception):
+    """An operation failed inside the owner process with an exception that cannot cross the socket as-is."""
+
+
+@dataclass
+class _Request:
+    peer: _Peer
+    request_id: int
+    method: str
+    args: tuple
+
+
+class _Peer:
+    def __init__(self, conn: Connection) -> None:
+        self.conn = conn
+        self._lock = threading.Lock()
+
+    def reply(self, request_id: int, ok: bool, value: Any) -> None:
+        if not ok and type(value).__module__ != 'builtins':
+            value = MilvusOwnerError(f'{type(value).__name__}: {value}')
+        try:
+            with self._lock:
+                self.conn.send((request_id, ok, value))
+        except (OSError, EOFError, ValueError):
+            # The worker went away; nothing is waiting for this reply any more.
+            pass
+
+
+class MilvusOwnerServer:
+    def __init__(
+        self,
+        service: MilvusService,
+        socket_path: Path,
+        authkey: bytes | None = None,
+        max_batch: int = 32,
+    ) -> None:
+        self.service = service
+        self.socket_path = socket_path
+        self.authkey = authkey
+        self.max_batch = max(1, max_batch)
+        self._reads: queue.Queue[_Request] = queue.Queue()
+        self._writes: queue.Queue[_Request] = queue.Queue()
+        self._listener: Listener | None = None
+        self._closed = threading.Event()
+
+    def serve_forever(self) -> None:
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+        self._listener = Listener(str(self.socket_path), family='AF_UNIX', authkey=self.authkey)
+        os.chmod(self.socket_path, 0o600)
+        threading.Thread(target=self._read_lane, name='milvus-owner-reads', daemon=True).start()
+        threading.Thread(target=self._write_lane, name='milvus-owner-writes', daemon=True).start()
+        logger.info('Milvus owner listening', extra={'socket': str(self.socket_path), 'uri': self.service.uri})
+
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._closed.is_set():
+                    break
+                logger.exception('Milvus owner accept failed')
+                continue
+            except Exception as exc:  # noqa: BLE001
+                logger.warning('Rejected Milvus owner client', extra={'error': str(exc)})
+                continue
+            peer = _Peer(conn)
+            threading.Thread(target=self._serve_peer, args=(peer,), name='milvus-owner-peer', daemon=True).start()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._listener is not None:
+            self._listener.close()
+        self.socket_path.unlink(missing_ok=True)
+
+    def _serve_peer(self, peer: _Peer) -> None:
+        # Workers pipeline requests on one connection; replies carry the request id and may come back out of order.
+        try:
+            while True:
+                request_id, method, args = peer.conn.recv()
+                request = _Request(peer, request_id, method, tuple(args))
+                if method in READ_METHODS:
+                    self._reads.put(request)
+                elif method in WRITE_METHODS:
+                    self._writes.put(request)
+                else:
+                    peer.reply(request_id, False, ValueError(f'Unsupported Milvus owner method: {method}'))
+        except (EOFError, OSError):
+            pass
+        finally:
+            peer.conn.close()
+
+    def _read_lane(self) -> None:
+        while True:
+            batch = [self._reads.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._reads.get_nowait())
+                except queue.Empty:
+                    break
+
+            searches: dict[tuple[str, int | None], list[_Request]] = {}
+            for request in batch:
+                if request.method == 'search':
+                    collection_name, _, top_k = (*request.args, None)[:3]
+                    searches.setdefault((collection_name, top_k), []).append(request)
+                else:
+                    self._execute(request)
+            for (collection_name, top_k), requests in searches.items():
+                self._execute_searches(collection_name, top_k, requests)
+
+    def _write_lane(self) -> None:
+        while True:
+            self._execute(self._writes.get())
+
+    def _execute(self, request: _Request) -> None:
+        try:
+            value = getattr(self.service, request.method)(*request.args)
+        except Exception as exc:  # noqa: BLE001
+            request.peer.reply(request.request_id, False, exc)
+            return
+        request.peer.reply(request.request_id, True, value)
+
+    def _execute_searches(self, collection_name: str, top_k: int | None, requests: list[_Request]) -> None:
+        # Concurrent single-vector searches from all workers against one collection become one ANN call.
+        try:
+            results = self.service.search_many(collection_name, [request.args[1] for request in requests], top_k)
+        except Exception as exc:  # noqa: BLE001
+            for request in requests:
+                request.peer.reply(request.request_id, False, exc)
+            return
+        for request, hits in zip(requests, results):
+            request.peer.reply(request.request_id, True, hits)
+
+
+class RemoteMilvusService(MilvusService):
+    """`MilvusService` client for an owner process; collection naming stays local, data operations go over IPC."""
+
+    def __init__(
+        self,
+        socket_path: Path,
+        default_collection: str,
+        dimension: int,
+        top_k: int,
+        create_collection_per_video: bool = False,
+        authkey: bytes | None = None,
+        timeout_s: float = 30.0,
+        slow_timeout_s: float | None = None,
+    ) -> None:
+        self.uri = f'unix:{socket_path}'
+        self.default_collection = self._sanitize_collection_name(default_collection)
+        self.dimension = dimension
+        self.top_k = top_k
+        self.create_collection_per_video = create_collection_per_video
+        self.socket_path = socket_path
+        self.authkey = authkey
+        self.timeout_s = timeout_s
+        self.slow_timeout_s = slow_timeout_s
+
+        self._conn: Connection | None = None
+        self._lock = threading.Lock()
+        self._pending: dict[int, Future] = {}
+        self._ids = itertools.count()
+
+    def _connection(self) -> Connection:
+        if self._conn is None:
+            self._conn = Client(str(self.socket_path), family='AF_UNIX', authkey=self.authkey)
+            threading.Thread(
+                target=self._read_replies,
+                args=(self._conn,),
+                name='milvus-ipc-reader',
+                daemon=True,
+            ).start()
+        return self._conn
+
+    def _read_replies(self, conn: Connection) -> None:
+        try:
+            while True:
+                request_id, ok, value = conn.recv()
+                future = self._pending.pop(request_id, None)
+                if future is None:
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        except (EOFError, OSError) as exc:
+            self._disconnect(conn, exc)
+
+    def _disconnect(self, conn: Connection, exc: BaseException) -> None:
+        with self._lock:
+            if self._conn is conn:
+                self._conn = None
+            pending, self._pending = self._pending, {}
+        conn.close()
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(f'Milvus owner connection lost: {exc}'))
+
+    def _call(self, method: str, *args: Any) -> Any:
+        future: Future = Future()
+        with MILVUS_OPERATION_SECONDS.time(operation=f'ipc_{method}'):
+            with self._lock:
+                request_id = next(self._ids)
+                self._pending[request_id] = future
+                try:
+                    conn = self._connection()
+                    conn.send((request_id, method, args))
+                except (OSError, EOFError) as exc:
+                    self._pending.pop(request_id, None)
+                    self._conn = None
+                    raise ConnectionError(f'Milvus owner unavailable at {self.socket_path}: {exc}') from exc
+            timeout = self.timeout_s if method in FAST_METHODS else self.slow_timeout_s
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError as exc:
+                self._pending.pop(request_id, None)
+                raise TimeoutError(f'Milvus owner did not answer {method} within {timeout}s') from exc
+
+    def _unsupported(self, operation: str) -> RuntimeError:
+        return RuntimeError(f'{operation} is not supported through the Milvus owner at {self.socket_path}')
+
+    def ensure_collection(self, collection_name: str, dimension: int):
+        # A pymilvus Collection handle cannot cross the socket; the owner creates collections on first upsert.
+        raise self._unsupported('ensure_collection')
+
+    def _generations(self, collection_name: str) -> list[str]:
+        # Generations and aliases live in the owner; this instance never connected to Milvus itself.
+        raise self._unsupported('_generations')
+
+    def list_collections(self) -> list[str]:
+        return self._call('list_collections')
+
+    def index_params(self, collection_name: str) -> dict[str, Any] | None:
+        return self._call('index_params', collection_name)
+
+    def iter_rows(self, collection_name: str, batch_size: int = 2048) -> Iterator[list[dict[str, Any]]]:
+        # Streaming a whole collection needs a generator on both ends, which the request/reply protocol lacks.
+        raise self._unsupported('iter_rows')
+
+    def bulk_load(
+        self,
+        collection_name: str,
+        dimension: int,
+        batches: Iterable[tuple[list[list[float]], list[str], list[dict[str, Any]]]],
+        index_params: dict[str, Any] | None = None,
+    ) -> int:
+        raise self._unsupported('bulk_load')
+
+    def swap_collection(self, collection_name: str, physical_name: str) -> None:
+        self._call('swap_collection', collection_name, physical_name)
+
+    def upsert_chunks(
+        self,
+        collection_name: str,
+        embeddings: list[list[float]],
+        chunks: list[str],
+        metadatas: list[dict[str, Any]],
+    ) -> int:
+        if not embeddings:
+            return 0
+        return self._call('upsert_chunks', collection_name, embeddings, chunks, metadatas)
+
+    def search(
+        self,
+        collection_name: str,
+        query_vector: list[float],
+        top_k: int | None = None,
+    ) -> list[dict[str, Any]]:
+        return self._call('search', collection_name, query_vector, top_k)
+
+    def search_many(
+        self,
+        collection_name: str,
+        query_vectors: list[list[float]],
+        top_k: int | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        return self._call('search_many', collection_name, query_vectors, top_k)
+
+    def load_collection(self, collection_name: str) -> bool:
+        return self._call('load_collection', collection_name)
+
+    def drop_collection(self, collection_name: str) -> bool:
+        return self._call('drop_collection', collection_name)
+
+    def fetch_video_chunks(self, collection_name: str, video_id: str) -> list[dict[str, Any]]:
+        return self._call('fetch_video_chunks', collection_name, video_id)
+
+    def fetch_chunks_by_index(self, collection_name: str, indexes: dict[str, list[int]]) -> list[dict[str, Any]]:
+        return self._call('fetch_chunks_by_index', collection_name, indexes)
+
+    def delete_ids(self, collection_name: str, ids: list[int]) -> None:
+        self._call('delete_ids', collection_name, ids)
+
+    def delete_video_chunks(self, collection_name: str, video_id: str, from_chunk_index: int = 0) -> None:
+        self._call('delete_video_chunks', collection_name, video_id, from_chunk_index)
+
+    def collection_size(self, collection_name: str) -> int:
+        return self._call('collection_size', collection_name)
+
+
+def main() -> None:
+    from app.core.config import get_settings
+    from app.core.logging import setup_logging
+
+    settings = get_settings()
+    setup_logging(settings.log_level)
+    if not settings.milvus_owner_socket:
+        raise SystemExit('Set MILVUS_OWNER_SOCKET to the Unix socket path the owner should listen on')
+
+    service = MilvusService(
+        uri=settings.milvus_uri,
+        default_collection=settings.milvus_default_collection,
+        dimension=settings.milvus_dimension,
+        top_k=settings.milvus_top_k,
+        create_collection_per_video=settings.milvus_create_collection_per_video,
+    )
+    server = MilvusOwnerServer(
+        service,
+        Path(settings.milvus_owner_socket),
+        authkey=settings.milvus_owner_authkey.encode() or None,
+        max_batch=settings.milvus_owner_max_batch,
+    )
+    signal.signal(signal.SIGTERM, _terminate)
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.close()
+
+
+def _terminate(*_: Any) -> None:
+    # Raised in the main thread, which interrupts the blocking accept() so the socket file is removed on exit.
+    raise SystemExit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,8 +4,9 @@ import json
 import logging
 import os
 import re
+import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 # pymilvus reads MILVUS_URI during module import and expects an HTTP URI.
 # It also calls load_dotenv() internally, so we must pre-set MILVUS_URI to a valid URL
@@ -17,15 +18,28 @@ os.environ.setdefault('MILVUS_URI', 'http://localhost:19530')
 
 from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, connections, utility
 
+from app.core.metrics import MILVUS_OPERATION_SECONDS
+
 logger = logging.getLogger(__name__)
 
+# Physical collections built by incremental rebuilds are named `<logical>__g<ms>` and served through an alias.
+GENERATION_SEPARATOR = '__g'
+
 
 class MilvusService:
-    def __init__(self, uri: str, default_collection: str, dimension: int, top_k: int) -> None:
+    def __init__(
+        self,
+        uri: str,
+        default_collection: str,
+        dimension: int,
+        top_k: int,
+        create_collection_per_video: bool = False,
+    ) -> None:
         self.uri = uri
         self.default_collection = self._sanitize_collection_name(default_collection)
         self.dimension = dimension
         self.top_k = top_k
+        self.create_collection_per_video = create_collection_per_video
 
         # Milvus Lite creates local Unix sockets under TMPDIR; ensure a writable path.
         tmp_dir = Path('./data/tmp').resolve()
@@ -34,6 +48,13 @@ class MilvusService:
 
         connections.connect(uri=self.uri)
 
+        # Milvus Lite has no alias support, so logical -> physical names are kept in a sidecar file instead.
+        self._lite = self.uri.endswith('.db')
+        self._aliases_path = Path(f'{self.uri}.aliases.json') if self._lite else None
+        self._aliases: dict[str, str] = {}
+        if self._aliases_path and self._aliases_path.exists():
+            self._aliases = json.loads(self._aliases_path.read_text(encoding='utf-8'))
+
     @staticmethod
     def _sanitize_collection_name(name: str) -> str:
         sanitized = re.sub(r'[^a-zA-Z0-9_]', '_', name)
@@ -44,6 +65,57 @@ class MilvusService:
     def collection_name_for_video(self, video_id: str) -> str:
         return self._sanitize_collection_name(f'video_{video_id}')
 
+    def resolve_collection_name(self, video_id: str | None, explicit: str | None = None) -> str:
+        if explicit:
+            return explicit
+        if self.create_collection_per_video and video_id:
+            return self.collection_name_for_video(video_id)
+        return self.default_collection
+
+    def _physical(self, collection_name: str) -> str:
+        collection_name = self._sanitize_collection_name(collection_name)
+        # Server-side aliases are resolved by Milvus itself.
+        return self._aliases.get(collection_name, collection_name)
+
+    def _generations(self, collection_name: str) -> list[str]:
+        prefix = f'{collection_name}{GENERATION_SEPARATOR}'
+        return [name for name in utility.list_collections() if name.startswith(prefix)]
+
+    def _save_aliases(self) -> None:
+        tmp_path = self._aliases_path.with_name(f'{self._aliases_path.name}.tmp')
+        tmp_path.write_text(json.dumps(self._aliases, indent=2), encoding='utf-8')
+        os.replace(tmp_path, self._aliases_path)
+
+    def shadow_collection_name(self, collection_name: str) -> str:
+        collection_name = self._sanitize_collection_name(collection_name)
+        return f'{collection_name}{GENERATION_SEPARATOR}{int(time.time() * 1000)}'
+
+    def swap_collection(self, collection_name: str, physical_name: str) -> None:
+        """Point `collection_name` at `physical_name`, then drop every other generation behind it."""
+
+        collection_name = self._sanitize_collection_name(collection_name)
+        if self._lite:
+            self._aliases[collection_name] = physical_name
+            self._save_aliases()
+            stale = self._generations(collection_name)
+            if utility.has_collection(collection_name):
+                stale.append(collection_name)
+        else:
+            try:
+                utility.alter_alias(physical_name, collection_name)
+                stale = self._generations(collection_name)
+            except Exception:  # noqa: BLE001
+                # First swap: a pre-existing physical collection holds the name and must go before the alias exists.
+                stale = self._generations(collection_name)
+                if utility.has_collection(collection_name):
+                    utility.drop_collection(collection_name)
+                utility.create_alias(physical_name, collection_name)
+
+        for name in stale:
+            if name != physical_name:
+                utility.drop_collection(name)
+        logger.info('Swapped collection', extra={'collection': collection_name, 'physical': physical_name})
+
     def _build_schema(self, dimension: int) -> CollectionSchema:
         fields = [
             FieldSchema(name='id', dtype=DataType.INT64, is_primary=True, auto_id=True),
@@ -53,53 +125,55 @@ class MilvusService:
         ]
         return CollectionSchema(fields=fields, description='Video transcript chunks')
 
-    def ensure_collection(self, collection_name: str, dimension: int) -> Collection:
-        collection_name = self._sanitize_collection_name(collection_name)
+    def _create_index(self, collection: Collection, preferred: dict[str, Any] | None = None) -> None:
+        index_candidates = [
+            {
+                'index_type': 'HNSW',
+                'metric_type': 'COSINE',
+                'params': {'M': 8, 'efConstruction': 64},
+            },
+            {
+                'index_type': 'AUTOINDEX',
+                'metric_type': 'COSINE',
+                'params': {},
+            },
+            {
+                'index_type': 'IVF_FLAT',
+                'metric_type': 'COSINE',
+                'params': {'nlist': 1024},
+            },
+            {
+                'index_type': 'FLAT',
+                'metric_type': 'COSINE',
+                'params': {},
+            },
+        ]
+        if preferred:
+            index_candidates.insert(0, preferred)
+        last_error: Exception | None = None
+        for params in index_candidates:
+            try:
+                collection.create_index(field_name='embedding', index_params=params)
+                logger.info(
+                    'Created Milvus index',
+                    extra={'collection': collection.name, 'index_type': params['index_type']},
+                )
+                return
+            except Exception as exc:  # noqa: BLE001
+                last_error = exc
+                logger.warning(
+                    'Index type not supported, trying next',
+                    extra={'collection': collection.name, 'index_type': params['index_type'], 'error': str(exc)},
+                )
+        raise RuntimeError(f'Unable to create a supported index for collection {collection.name}: {last_error}')
 
-        def _create_supported_index(collection: Collection) -> None:
-            index_candidates = [
-                {
-                    'index_type': 'HNSW',
-                    'metric_type': 'COSINE',
-                    'params': {'M': 8, 'efConstruction': 64},
-                },
-                {
-                    'index_type': 'AUTOINDEX',
-                    'metric_type': 'COSINE',
-                    'params': {},
-                },
-                {
-                    'index_type': 'IVF_FLAT',
-                    'metric_type': 'COSINE',
-                    'params': {'nlist': 1024},
-                },
-                {
-                    'index_type': 'FLAT',
-                    'metric_type': 'COSINE',
-                    'params': {},
-                },
-            ]
-            last_error: Exception | None = None
-            for params in index_candidates:
-                try:
-                    collection.create_index(field_name='embedding', index_params=params)
-                    logger.info(
-                        'Created Milvus index',
-                        extra={'collection': collection.name, 'index_type': params['index_type']},
-                    )
-                    return
-                except Exception as exc:  # noqa: BLE001
-                    last_error = exc
-                    logger.warning(
-                        'Index type not supported, trying next',
-                        extra={'collection': collection.name, 'index_type': params['index_type'], 'error': str(exc)},
-                    )
-            raise RuntimeError(f'Unable to create a supported index for collection {collection.name}: {last_error}')
+    def ensure_collection(self, collection_name: str, dimension: int) -> Collection:
+        collection_name = self._physical(collection_name)
 
         if not utility.has_collection(collection_name):
             schema = self._build_schema(dimension)
             collection = Collection(name=collection_name, schema=schema)
-            _create_supported_index(collection)
+            self._create_index(collection)
             logger.info('Created Milvus collection', extra={'collection': collection_name, 'dim': dimension})
         else:
             collection = Collection(name=collection_name)
@@ -108,7 +182,7 @@ class MilvusService:
             except Exception:  # noqa: BLE001
                 existing_indexes = []
             if not existing_indexes:
-                _create_supported_index(collection)
+                self._create_index(collection)
 
         collection.load()
         return collection
@@ -127,8 +201,9 @@ class MilvusService:
         collection = self.ensure_collection(collection_name, dimension)
 
         payload = [embeddings, chunks, metadatas]
-        result = collection.insert(payload)
-        collection.flush()
+        with MILVUS_OPERATION_SECONDS.time(operation='insert'):
+            result = collection.insert(payload)
+            collection.flush()
         return len(result.primary_keys)
 
     def search(
@@ -137,24 +212,36 @@ class MilvusService:
         query_vector: list[float],
         top_k: int | None = None,
     ) -> list[dict[str, Any]]:
-        collection_name = self._sanitize_collection_name(collection_name)
-        if not utility.has_collection(collection_name):
-            return []
+        return self.search_many(collection_name, [query_vector], top_k)[0]
+
+    def search_many(
+        self,
+        collection_name: str,
+        query_vectors: list[list[float]],
+        top_k: int | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """One ANN call for several query vectors; returns one deduplicated hit list per vector."""
+
+        collection_name = self._physical(collection_name)
+        if not query_vectors or not utility.has_collection(collection_name):
+            return [[] for _ in query_vectors]
 
         collection = Collection(name=collection_name)
         collection.load()
 
-        search_result = collection.search(
-            data=[query_vector],
-            anns_field='embedding',
-            param={'metric_type': 'COSINE', 'params': {'ef': 64}},
-            limit=top_k or self.top_k,
-            output_fields=['text', 'metadata'],
-        )
+        with MILVUS_OPERATION_SECONDS.time(operation='search'):
+            search_result = collection.search(
+                data=query_vectors,
+                anns_field='embedding',
+                param={'metric_type': 'COSINE', 'params': {'ef': 64}},
+                limit=top_k or self.top_k,
+                output_fields=['text', 'metadata'],
+            )
 
-        rows: list[dict[str, Any]] = []
-        seen: set[tuple[str, str, str]] = set()
+        results: list[list[dict[str, Any]]] = []
         for hits in search_result:
+            rows: list[dict[str, Any]] = []
+            seen: set[tuple[str, str, str]] = set()
             for hit in hits:
                 metadata = hit.entity.get('metadata')
                 if isinstance(metadata, str):
@@ -181,19 +268,187 @@ class MilvusService:
                         'metadata': safe_metadata,
                     }
                 )
-        return rows
+            results.append(rows)
+        return results
+
+    def load_collection(self, collection_name: str) -> bool:
+        collection_name = self._physical(collection_name)
+        if not utility.has_collection(collection_name):
+            return False
+        Collection(name=collection_name).load()
+        return True
 
     def drop_collection(self, collection_name: str) -> bool:
         collection_name = self._sanitize_collection_name(collection_name)
-        if utility.has_collection(collection_name):
-            utility.drop_collection(collection_name)
-            return True
-        return False
+        dropped = False
+        if self._lite:
+            if self._aliases.pop(collection_name, None):
+                self._save_aliases()
+        else:
+            try:
+                utility.drop_alias(collection_name)
+            except Exception:  # noqa: BLE001
+                pass
+        for name in [collection_name, *self._generations(collection_name)]:
+            if utility.has_collection(name):
+                utility.drop_collection(name)
+                dropped = True
+        return dropped
+
+    def owns_collection(self, collection_name: str, video_id: str) -> bool:
+        """Whether `collection_name` is the dedicated per-video collection of `video_id` (no other video's rows)."""
+
+        return self.create_collection_per_video and (
+            self._sanitize_collection_name(collection_name) == self.collection_name_for_video(video_id)
+        )
+
+    def fetch_video_chunks(self, collection_name: str, video_id: str, batch_size: int = 2048) -> list[dict[str, Any]]:
+        """Every stored row of one video, embeddings included, paged with a server-side query iterator."""
+
+        collection_name = self._physical(collection_name)
+        if not utility.has_collection(collection_name):
+            return []
+        collection = Collection(name=collection_name)
+        collection.load()
+        iterator = collection.query_iterator(
+            batch_size=batch_size,
+            expr=f'metadata["video_id"] == {json.dumps(video_id)}',
+            output_fields=['id', 'text', 'metadata', 'embedding'],
+        )
+        chunks: list[dict[str, Any]] = []
+        try:
+            while True:
+                with MILVUS_OPERATION_SECONDS.time(operation='query'):
+                    rows = iterator.next()
+                if not rows:
+                    break
+                chunks.extend(
+                    {
+                        'id': row['id'],
+                        'text': row.get('text') or '',
+                        'metadata': row.get('metadata') or {},
+                        'embedding': [float(value) for value in row['embedding']],
+                    }
+                    for row in rows
+                )
+        finally:
+            iterator.close()
+        return chunks
+
+    def fetch_chunks_by_index(self, collection_name: str, indexes: dict[str, list[int]]) -> list[dict[str, Any]]:
+        """Scalar lookup of specific chunks by (video_id, chunk_index), all videos in a single query."""
+
+        clauses = [
+            f'(metadata["video_id"] == {json.dumps(video_id)} and metadata["chunk_index"] in {sorted(set(values))})'
+            for video_id, values in indexes.items()
+            if values
+        ]
+        collection_name = self._physical(collection_name)
+        if not clauses or not utility.has_collection(collection_name):
+            return []
+        collection = Collection(name=collection_name)
+        with MILVUS_OPERATION_SECONDS.time(operation='query'):
+            rows = collection.query(
+                expr=' or '.join(clauses),
+                output_fields=['id', 'text', 'metadata'],
+                limit=sum(len(values) for values in indexes.values()) * 2,
+            )
+        return [{'id': row['id'], 'text': row.get('text') or '', 'metadata': row.get('metadata') or {}} for row in rows]
+
+    def delete_ids(self, collection_name: str, ids: list[int]) -> None:
+        if not ids:
+            return
+        collection = Collection(name=self._physical(collection_name))
+        with MILVUS_OPERATION_SECONDS.time(operation='delete'):
+            collection.delete(f'id in {[int(item) for item in ids]}')
+            collection.flush()
+
+    def delete_video_chunks(self, collection_name: str, video_id: str, from_chunk_index: int = 0) -> None:
+        collection_name = self._physical(collection_name)
+        if not utility.has_collection(collection_name):
+            return
+        collection = Collection(name=collection_name)
+        expr = f'metadata["video_id"] == {json.dumps(video_id)} and metadata["chunk_index"] >= {int(from_chunk_index)}'
+        with MILVUS_OPERATION_SECONDS.time(operation='delete'):
+            collection.delete(expr)
+            collection.flush()
 
     def collection_size(self, collection_name: str) -> int:
-        collection_name = self._sanitize_collection_name(collection_name)
+        collection_name = self._physical(collection_name)
         if not utility.has_collection(collection_name):
             return 0
 
         collection = Collection(name=collection_name)
         return int(collection.num_entities)
+
+    def list_collections(self) -> list[str]:
+        """Logical collection names; rebuild generations are reported under the name they serve."""
+
+        names = set()
+        for name in utility.list_collections():
+            logical, separator, generation = name.rpartition(GENERATION_SEPARATOR)
+            names.add(logical if separator and generation.isdigit() else name)
+        return sorted(names)
+
+    def index_params(self, collection_name: str) -> dict[str, Any] | None:
+        collection_name = self._physical(collection_name)
+        if not utility.has_collection(collection_name):
+            return None
+        for index in Collection(name=collection_name).indexes:
+            if index.field_name == 'embedding':
+                return dict(index.params)
+        return None
+
+    def iter_rows(self, collection_name: str, batch_size: int = 2048) -> Iterator[list[dict[str, Any]]]:
+        """Every row of a collection, embeddings included, in batches from a server-side query iterator."""
+
+        collection_name = self._physical(collection_name)
+        if not utility.has_collection(collection_name):
+            return
+        collection = Collection(name=collection_name)
+        collection.load()
+        iterator = collection.query_iterator(batch_size=batch_size, output_fields=['text', 'metadata', 'embedding'])
+        try:
+            while True:
+                with MILVUS_OPERATION_SECONDS.time(operation='query'):
+                    rows = iterator.next()
+                if not rows:
+                    break
+                yield [
+                    {
+                        'text': row.get('text') or '',
+                        'metadata': row.get('metadata') or {},
+                        'embedding': row['embedding'],
+                    }
+                    for row in rows
+                ]
+        finally:
+            iterator.close()
+
+    def bulk_load(
+        self,
+        collection_name: str,
+        dimension: int,
+        batches: Iterable[tuple[list[list[float]], list[str], list[dict[str, Any]]]],
+        index_params: dict[str, Any] | None = None,
+    ) -> int:
+        """Load rows into a fresh generation, then build the index once and swap it in behind `collection_name`.
+
+        Inserting before the index exists and flushing once is far cheaper than `upsert_chunks` per batch.
+        """
+
+        physical_name = self.shadow_collection_name(collection_name)
+        collection = Collection(name=physical_name, schema=self._build_schema(dimension))
+        inserted = 0
+        try:
+            for embeddings, chunks, metadatas in batches:
+                with MILVUS_OPERATION_SECONDS.time(operation='insert'):
+                    inserted += len(collection.insert([embeddings, chunks, metadatas]).primary_keys)
+            collection.flush()
+            self._create_index(collection, index_params)
+            collection.load()
+        except Exception:
+            utility.drop_collection(physical_name)
+            raise
+        self.swap_collection(collection_name, physical_name)
+        return inserted
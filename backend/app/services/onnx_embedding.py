@@ -0,0 +1,149 @@
+"""int8-quantized ONNX export of a sentence-transformers model, and a torch-free encoder for it.
+
+Export once (needs torch, sentence-transformers and onnxruntime):
+
+    python -m app.services.onnx_embedding export \
+        --model sentence-transformers/all-MiniLM-L6-v2 --output ./data/models/onnx
+
+Serving then only needs `onnxruntime`, `tokenizers` and `numpy` (EMBEDDING_BACKEND=onnx).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Sequence
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = 'model.onnx'
+TOKENIZER_FILE = 'tokenizer.json'
+CONFIG_FILE = 'embedding_config.json'
+
+
+class OnnxEncoder:
+    """Drop-in for the part of `SentenceTransformer.encode` that EmbeddingService uses."""
+
+    def __init__(self, model_dir: Path, threads: int = 0) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.config = json.loads((model_dir / CONFIG_FILE).read_text(encoding='utf-8'))
+        self.model_name = self.config['model_name']
+        self.dimension = int(self.config['dimension'])
+        self.pooling = self.config['pooling']
+
+        options = ort.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(str(model_dir / MODEL_FILE), options, providers=['CPUExecutionProvider'])
+        self.input_names = {item.name for item in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=int(self.config['max_length']))
+        self.tokenizer.enable_padding(pad_id=int(self.config['pad_id']), pad_token=self.config['pad_token'])
+
+    def encode(self, sentences: str | Sequence[str], batch_size: int = 32, normalize_embeddings: bool = True):
+        import numpy as np
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        # Like sentence-transformers, batch texts of similar length together so little compute goes to padding.
+        order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+        for start in range(0, len(order), batch_size):
+            indexes = order[start:start + batch_size]
+            encodings = self.tokenizer.encode_batch([texts[index] for index in indexes])
+            mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+            feeds = {
+                'input_ids': np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+                'attention_mask': mask,
+            }
+            if 'token_type_ids' in self.input_names:
+                feeds['token_type_ids'] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+            hidden = self.session.run(None, feeds)[0]
+            if self.pooling == 'cls':
+                pooled = hidden[:, 0]
+            else:
+                weights = mask[..., None].astype(np.float32)
+                pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            vectors[indexes] = pooled
+
+        if normalize_embeddings:
+            vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors[0] if single else vectors
+
+
+def export_model(model_name: str, output_dir: Path, quantize: bool = True, opset: int = 17) -> dict:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device='cpu')
+    modules = list(model)
+    pooling = modules[1].get_pooling_mode_str() if len(modules) > 1 else 'mean'
+    extra = [type(module).__name__ for module in modules[2:] if type(module).__name__ != 'Normalize']
+    if pooling not in {'mean', 'cls'} or extra:
+        raise ValueError(f'{model_name} uses pooling={pooling} with modules {extra}; only mean/cls pooling is exported')
+
+    transformer = modules[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    sample = tokenizer(['export sample text'], return_tensors='pt')
+    input_names = list(sample.keys())
+
+    class _HiddenStates(torch.nn.Module):
+        def forward(self, *inputs):
+            return transformer(**dict(zip(input_names, inputs))).last_hidden_state
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fp32_path = output_dir / 'model.fp32.onnx'
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in [*input_names, 'last_hidden_state']}
+    torch.onnx.export(
+        _HiddenStates(),
+        tuple(sample[name] for name in input_names),
+        str(fp32_path),
+        input_names=input_names,
+        output_names=['last_hidden_state'],
+        dynamic_axes=dynamic_axes,
+        opset_version=opset,
+    )
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(str(fp32_path), str(output_dir / MODEL_FILE), weight_type=QuantType.QInt8)
+        fp32_path.unlink()
+    else:
+        fp32_path.replace(output_dir / MODEL_FILE)
+
+    tokenizer.backend_tokenizer.save(str(output_dir / TOKENIZER_FILE))
+    config = {
+        'model_name': model_name,
+        'pooling': pooling,
+        'max_length': int(model.max_seq_length),
+        'dimension': int(model.get_sentence_embedding_dimension()),
+        'pad_id': int(tokenizer.pad_token_id),
+        'pad_token': tokenizer.pad_token,
+        'quantized': quantize,
+    }
+    (output_dir / CONFIG_FILE).write_text(json.dumps(config, indent=2), encoding='utf-8')
+    logger.info('Exported ONNX embedding model', extra={'model': model_name, 'path': str(output_dir), **config})
+    return config
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Export a sentence-transformers model to (int8) ONNX.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export')
+    export_parser.add_argument('--model', default='sentence-transformers/all-MiniLM-L6-v2')
+    export_parser.add_argument('--output', type=Path, default=Path('./data/models/onnx'))
+    export_parser.add_argument('--no-quantize', action='store_true')
+    export_parser.add_argument('--opset', type=int, default=17)
+    args = parser.parse_args()
+    config = export_model(args.model, args.output, quantize=not args.no_quantize, opset=args.opset)
+    print(json.dumps(config, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,54 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 
+from app.core.metrics import CACHE_HITS, ERRORS, INGEST_STAGE_SECONDS, TRANSCRIPTION_REALTIME_FACTOR
+from app.core.tracing import tracer
 from app.services.audio_service import AudioService
+from app.services.checkpoint_service import IngestCheckpoint
+from app.services.dedup_service import DedupService
 from app.services.embedding_service import EmbeddingService
 from app.services.milvus_service import MilvusService
 from app.services.rag_service import RagService
+from app.services.segment_store import SegmentStore
+from app.services.summary_service import ManifestIndex, SummaryService, transcript_hash
 from app.services.transcription_service import TranscriptionService
-from app.services.youtube_service import YouTubeService
+from app.services.youtube_service import DownloadedVideo, YouTubeService
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+@dataclass
+class IngestJob:
+    """State handed from one ingestion stage to the next; `result` is set once the video is indexed or cached."""
+
+    youtube_url: str
+    collection_name: str | None = None
+    rebuild: bool = False
+    incremental: bool = False
+    checkpoint: IngestCheckpoint | None = None
+    downloaded: DownloadedVideo | None = None
+    target_collection: str = ''
+    audio_path: Path | None = None
+    transcript_path: Path | None = None
+    transcript_text: str = ''
+    segments: SegmentStore | None = None
+    summary: dict | None = None
+    result: dict | None = None
+    # Video whose ingestion lock this job holds; released by PipelineService.finish_job.
+    locked_video: str | None = None
 
 
 class PipelineService:
@@ -24,6 +63,10 @@ class PipelineService:
         transcript_dir: Path,
         create_collection_per_video: bool,
         default_collection: str,
+        checkpoints_enabled: bool = True,
+        insert_batch_size: int = 256,
+        summary_service: SummaryService | None = None,
+        dedup_service: DedupService | None = None,
     ) -> None:
         self.youtube_service = youtube_service
         self.audio_service = audio_service
@@ -34,78 +77,466 @@ class PipelineService:
         self.transcript_dir = transcript_dir
         self.create_collection_per_video = create_collection_per_video
         self.default_collection = default_collection
+        self.checkpoints_enabled = checkpoints_enabled
+        self.insert_batch_size = max(1, insert_batch_size)
+        self.summary_service = summary_service
+        self.dedup_service = dedup_service
+        self.manifest_index = ManifestIndex(transcript_dir)
+        # One ingestion per video at a time, whichever endpoint or batch started it: concurrent writers would share
+        # a checkpoint, a segment log and the video's rows. Entries are [lock, holders + waiters].
+        self._video_locks: dict[str, list] = {}
+        self._video_locks_guard = threading.Lock()
 
     def resolve_collection_name(self, video_id: str | None, explicit: str | None = None) -> str:
-        if explicit:
-            return explicit
-        if self.create_collection_per_video and video_id:
-            return self.milvus_service.collection_name_for_video(video_id)
-        return self.default_collection
+        return self.milvus_service.resolve_collection_name(video_id, explicit)
 
-    def process_youtube(self, youtube_url: str, collection_name: str | None = None, rebuild: bool = False) -> dict:
+    def find_cached_result(self, youtube_url: str, collection_name: str | None = None) -> dict | None:
         parsed_video_id = self.youtube_service.extract_video_id(youtube_url)
-        target_collection = self.resolve_collection_name(parsed_video_id, collection_name)
+        if not parsed_video_id:
+            return None
+        return self.find_cached_video(parsed_video_id, collection_name)
 
-        if not rebuild and parsed_video_id:
-            cached = self._load_cached_result(parsed_video_id, target_collection)
-            if cached:
-                return cached
+    def find_cached_video(self, video_id: str, collection_name: str | None = None) -> dict | None:
+        target_collection = self.resolve_collection_name(video_id, collection_name)
+        cached = self._load_cached_result(video_id, target_collection)
+        if cached:
+            CACHE_HITS.inc(cache='ingest_manifest')
+        return cached
 
-        downloaded = self.youtube_service.download_video(youtube_url)
-        target_collection = self.resolve_collection_name(downloaded.video_id, collection_name)
+    @contextmanager
+    def _stage(self, name: str, **attributes: Any) -> Iterator[Any]:
+        with tracer.span(f'ingest.{name}', **attributes) as span, INGEST_STAGE_SECONDS.time(stage=name):
+            yield span
 
-        if rebuild:
-            self.milvus_service.drop_collection(target_collection)
+    def process_youtube(
+        self,
+        youtube_url: str,
+        collection_name: str | None = None,
+        rebuild: bool = False,
+        incremental: bool = False,
+    ) -> dict:
+        with tracer.span('ingest.process_youtube', rebuild=rebuild, incremental=incremental) as span:
+            job = self.start_job(youtube_url, collection_name, rebuild, incremental)
+            try:
+                for _, run_stage in self.stages():
+                    if job.result is not None:
+                        break
+                    run_stage(job)
+            finally:
+                self.finish_job(job)
+            span.set_attribute('video_id', job.result['video_id'])
+            span.set_attribute('chunks', job.result['chunk_count'])
+            return job.result
+
+    def process_media(self, media: DownloadedVideo, collection_name: str | None = None, rebuild: bool = False) -> dict:
+        """Index an uploaded recording: the same stages as a YouTube video, minus the download."""
+
+        with tracer.span('ingest.process_media', rebuild=rebuild) as span:
+            job = IngestJob(f'media:{media.video_id}', collection_name, rebuild)
+            try:
+                self.attach_video(job, media)
+                for name, run_stage in self.stages():
+                    if job.result is not None:
+                        break
+                    if name != 'download':
+                        run_stage(job)
+            finally:
+                self.finish_job(job)
+            span.set_attribute('video_id', job.result['video_id'])
+            span.set_attribute('chunks', job.result['chunk_count'])
+            return job.result
+
+    def stages(self) -> list[tuple[str, Callable[[IngestJob], None]]]:
+        # Each stage only reads what earlier stages left on the job, so batches can run them on separate pools.
+        stages = [
+            ('download', self.download),
+            ('audio_extraction', self.extract_audio),
+            ('transcription', self.transcribe),
+            ('indexing', self.index),
+        ]
+        if self.summary_service is not None:
+            stages.insert(3, ('summarization', self.summarize))
+        return stages
+
+    def start_job(
+        self,
+        youtube_url: str,
+        collection_name: str | None = None,
+        rebuild: bool = False,
+        incremental: bool = False,
+    ) -> IngestJob:
+        job = IngestJob(youtube_url, collection_name, rebuild, incremental)
+        if not rebuild:
+            job.result = self.find_cached_result(youtube_url, collection_name)
+        return job
+
+    def finish_job(self, job: IngestJob) -> None:
+        """Release the job's per-video ingestion lock; call once the job is done or has failed."""
+
+        video_id, job.locked_video = job.locked_video, None
+        if video_id is None:
+            return
+        with self._video_locks_guard:
+            entry = self._video_locks[video_id]
+            entry[0].release()
+            entry[1] -= 1
+            if not entry[1]:
+                del self._video_locks[video_id]
+
+    def _lock_video(self, job: IngestJob, video_id: str) -> None:
+        if job.locked_video == video_id:
+            return
+        # A URL whose parsed id differed from the downloaded one only ever guarded the wrong video.
+        self.finish_job(job)
+        with self._video_locks_guard:
+            entry = self._video_locks.setdefault(video_id, [threading.Lock(), 0])
+            entry[1] += 1
+        # Blocks while another job ingests this video; released from whichever thread runs its last stage.
+        entry[0].acquire()
+        job.locked_video = video_id
+
+    def download(self, job: IngestJob) -> None:
+        video_id = self.youtube_service.extract_video_id(job.youtube_url)
+        if video_id:
+            self._lock_video(job, video_id)
+        checkpoint = self._open_checkpoint(video_id, job.rebuild)
+        if checkpoint and checkpoint.video_path and Path(checkpoint.video_path).exists():
+            downloaded = DownloadedVideo(checkpoint.video_id, checkpoint.title, Path(checkpoint.video_path))
+        else:
+            with self._stage('download'):
+                downloaded = self.youtube_service.download_video(job.youtube_url)
+        self.attach_video(job, downloaded, checkpoint)
+
+    def attach_video(
+        self,
+        job: IngestJob,
+        downloaded: DownloadedVideo,
+        checkpoint: IngestCheckpoint | None = None,
+    ) -> None:
+        """Hand a local video file to the remaining stages, resolving its collection and any cached result.
+
+        Takes the video's ingestion lock first; the caller must `finish_job` the job afterwards.
+        """
+
+        self._lock_video(job, downloaded.video_id)
+        if checkpoint is None or checkpoint.video_id != downloaded.video_id:
+            checkpoint = self._open_checkpoint(downloaded.video_id, job.rebuild)
+        if checkpoint and checkpoint.video_path != str(downloaded.video_path):
+            self._save_checkpoint(checkpoint, title=downloaded.title, video_path=str(downloaded.video_path))
+        job.checkpoint = checkpoint
+        job.downloaded = downloaded
+        job.target_collection = self.resolve_collection_name(downloaded.video_id, job.collection_name)
+
+        if job.rebuild and not job.incremental:
+            self.milvus_service.drop_collection(job.target_collection)
+        elif not job.rebuild:
+            job.result = self._load_cached_result(downloaded.video_id, job.target_collection)
+            if job.result:
+                CACHE_HITS.inc(cache='ingest_manifest')
+
+    def extract_audio(self, job: IngestJob) -> None:
+        checkpoint = job.checkpoint
+        if checkpoint and checkpoint.audio_path and Path(checkpoint.audio_path).exists():
+            job.audio_path = Path(checkpoint.audio_path)
+            return
+        with self._stage('audio_extraction'):
+            job.audio_path = self.audio_service.extract_mp3(job.downloaded.video_path, job.downloaded.video_id)
+        self._save_checkpoint(checkpoint, audio_path=str(job.audio_path))
+
+    def transcribe(self, job: IngestJob) -> None:
+        checkpoint = job.checkpoint
+        job.transcript_path = self.transcript_dir / f'{job.downloaded.video_id}.txt'
+        segments_path = self.segments_path(job.downloaded.video_id)
+        if checkpoint and checkpoint.transcript_path and job.transcript_path.exists():
+            job.transcript_text = job.transcript_path.read_text(encoding='utf-8')
+            if segments_path.exists():
+                job.segments = SegmentStore.load(segments_path)
+            return
+
+        started = time.perf_counter()
+        with self._stage('transcription') as span:
+            transcription = self.transcription_service.transcribe(
+                job.audio_path,
+                checkpoint.segment_log_path if checkpoint else None,
+            )
+            span.set_attribute('audio_s', transcription.duration_s)
+            span.set_attribute('resumed_from_s', transcription.resumed_from_s)
+        elapsed = time.perf_counter() - started
+        transcribed_s = transcription.duration_s - transcription.resumed_from_s
+        if transcribed_s > 0 and elapsed > 0:
+            TRANSCRIPTION_REALTIME_FACTOR.observe(transcribed_s / elapsed)
+        job.transcript_text = transcription.text
+        job.segments = SegmentStore.from_segments(transcription.segments)
+        job.segments.save(segments_path)
+        job.transcript_path.write_text(job.transcript_text, encoding='utf-8')
+        self._save_checkpoint(checkpoint, transcript_path=str(job.transcript_path))
+
+    def summarize(self, job: IngestJob) -> None:
+        """Optional stage: precompute the summary and outline that broad chat questions are answered from.
+
+        Best effort; a failure is logged and the video is still indexed, just without a summary.
+        """
+
+        checkpoint = job.checkpoint
+        digest = transcript_hash(job.transcript_text)
+        for candidate in (checkpoint.summary if checkpoint else None, self._manifest_summary(job.downloaded.video_id)):
+            if candidate and candidate.get('transcript_hash') == digest:
+                job.summary = candidate
+                return
+
+        if job.segments:
+            chunks = [(text, start_s, end_s) for start_s, end_s, text in job.segments]
         else:
-            cached = self._load_cached_result(downloaded.video_id, target_collection)
-            if cached:
-                return cached
+            chunks = [(text, None, None) for text in self.rag_service.chunk_text(job.transcript_text)]
+        try:
+            with self._stage('summarization', chunks=len(chunks)):
+                summary = self.summary_service.summarize(job.downloaded.title, chunks)
+        except Exception as exc:  # noqa: BLE001
+            ERRORS.inc(component='ingest', kind='summary')
+            logger.warning(
+                'Summarization failed; indexing without a summary',
+                extra={'video_id': job.downloaded.video_id, 'error': str(exc)},
+            )
+            return
+        summary['transcript_hash'] = digest
+        job.summary = summary
+        self._save_checkpoint(checkpoint, summary=summary)
 
-        audio_path = self.audio_service.extract_mp3(downloaded.video_path, downloaded.video_id)
-        transcript_text = self.transcription_service.transcribe_audio(audio_path)
+    def _manifest_summary(self, video_id: str) -> dict | None:
+        try:
+            manifest = json.loads((self.transcript_dir / f'{video_id}.json').read_text(encoding='utf-8'))
+        except (json.JSONDecodeError, OSError):
+            return None
+        return manifest.get('summary')
 
-        transcript_path = self.transcript_dir / f'{downloaded.video_id}.txt'
-        transcript_path.write_text(transcript_text, encoding='utf-8')
+    def segments_path(self, video_id: str) -> Path:
+        return self.transcript_dir / f'{video_id}.segments.bin'
 
-        chunks = self.rag_service.chunk_text(transcript_text)
-        embeddings = self.embedding_service.embed_batch(chunks)
+    def index(self, job: IngestJob) -> None:
+        downloaded = job.downloaded
+        with self._stage('chunking'):
+            if job.segments:
+                # Segment-aligned chunks carry their time range; transcripts without a segment store fall back.
+                timed_chunks = self.rag_service.chunk_segments(list(job.segments))
+            else:
+                timed_chunks = [(text, None, None) for text in self.rag_service.chunk_text(job.transcript_text)]
+        chunks = [text for text, _, _ in timed_chunks]
 
-        metadata = [
-            {
+        metadata = []
+        for idx, (chunk, start_s, end_s) in enumerate(timed_chunks):
+            item = {
                 'video_id': downloaded.video_id,
                 'title': downloaded.title,
                 'chunk_index': idx,
-                'audio_path': str(audio_path),
-                'transcript_path': str(transcript_path),
+                'chunk_hash': chunk_hash(chunk),
+                'audio_path': str(job.audio_path),
+                'transcript_path': str(job.transcript_path),
             }
-            for idx in range(len(chunks))
-        ]
+            if start_s is not None:
+                item['start_s'] = round(start_s, 2)
+                item['end_s'] = round(end_s, 2)
+            metadata.append(item)
 
-        inserted = self.milvus_service.upsert_chunks(target_collection, embeddings, chunks, metadata)
+        collapsed = 0
+        if self.dedup_service is not None:
+            # Before the incremental diff and the checkpoint layout check, so both see the collapsed chunk set.
+            with self._stage('deduplication', chunks=len(chunks)) as span:
+                chunks, metadata, collapsed = self.dedup_service.collapse(chunks, metadata)
+                span.set_attribute('collapsed', collapsed)
 
+        inserted = None
+        if job.rebuild and job.incremental:
+            inserted = self._sync_chunks(job.target_collection, downloaded.video_id, chunks, metadata)
+        if inserted is None:
+            inserted = self._insert_chunks(job.checkpoint, job.target_collection, downloaded.video_id, chunks, metadata)
+
+        manifest = {
+            'video_id': downloaded.video_id,
+            'title': downloaded.title,
+            'collection': job.target_collection,
+            'chunks': inserted,
+            'transcript_path': str(job.transcript_path),
+        }
+        if collapsed:
+            manifest['duplicates_collapsed'] = collapsed
+        if job.summary:
+            manifest['summary'] = job.summary
         manifest_path = self.transcript_dir / f'{downloaded.video_id}.json'
-        manifest_path.write_text(
-            json.dumps(
-                {
-                    'video_id': downloaded.video_id,
-                    'title': downloaded.title,
-                    'collection': target_collection,
-                    'chunks': inserted,
-                    'transcript_path': str(transcript_path),
-                },
-                indent=2,
-            ),
-            encoding='utf-8',
-        )
+        manifest_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+        self.manifest_index.record(manifest)
+        # The manifest is now the durable record of a finished ingestion.
+        if job.checkpoint:
+            job.checkpoint.clear()
 
-        return {
+        job.result = {
             'video_id': downloaded.video_id,
             'title': downloaded.title,
-            'collection_name': target_collection,
+            'collection_name': job.target_collection,
             'chunk_count': inserted,
-            'transcript_path': str(transcript_path),
+            'transcript_path': str(job.transcript_path),
         }
 
+    def _insert_chunks(
+        self,
+        checkpoint: IngestCheckpoint | None,
+        collection_name: str,
+        video_id: str,
+        chunks: list[str],
+        metadata: list[dict[str, Any]],
+    ) -> int:
+        start_index = 0
+        if checkpoint:
+            same_layout = (
+                checkpoint.collection == collection_name
+                and checkpoint.chunk_count == len(chunks)
+                and checkpoint.chunk_size == self.rag_service.chunk_size
+                and checkpoint.chunk_overlap == self.rag_service.chunk_overlap
+            )
+            if checkpoint.chunk_count:
+                start_index = min(checkpoint.inserted_chunks, len(chunks)) if same_layout else 0
+                # A crash between insert and checkpoint leaves rows past the recorded position; drop them. The
+                # checkpoint counts list positions but rows are deleted by chunk_index, and after dedup the two differ.
+                if start_index == 0:
+                    from_chunk_index = 0
+                elif start_index < len(metadata):
+                    from_chunk_index = metadata[start_index]['chunk_index']
+                else:
+                    from_chunk_index = metadata[-1]['chunk_index'] + 1
+                self.milvus_service.delete_video_chunks(collection_name, video_id, from_chunk_index)
+            checkpoint.update(
+                collection=collection_name,
+                chunk_size=self.rag_service.chunk_size,
+                chunk_overlap=self.rag_service.chunk_overlap,
+                chunk_count=len(chunks),
+                inserted_chunks=start_index,
+            )
+
+        inserted = start_index
+        embedding_s = 0.0
+        for batch_start in range(start_index, len(chunks), self.insert_batch_size):
+            batch_end = min(batch_start + self.insert_batch_size, len(chunks))
+            embedding_started = time.perf_counter()
+            with tracer.span('ingest.embedding', chunks=batch_end - batch_start):
+                embeddings = self.embedding_service.embed_batch(chunks[batch_start:batch_end])
+            embedding_s += time.perf_counter() - embedding_started
+            with tracer.span('ingest.milvus_insert', collection=collection_name):
+                inserted += self.milvus_service.upsert_chunks(
+                    collection_name,
+                    embeddings,
+                    chunks[batch_start:batch_end],
+                    metadata[batch_start:batch_end],
+                )
+            self._save_checkpoint(checkpoint, inserted_chunks=batch_end)
+        if start_index < len(chunks):
+            INGEST_STAGE_SECONDS.observe(embedding_s, stage='embedding')
+        return inserted
+
+    def _sync_chunks(
+        self,
+        collection_name: str,
+        video_id: str,
+        chunks: list[str],
+        metadata: list[dict[str, Any]],
+    ) -> int | None:
+        """Diff the new chunk set against what is stored and embed only chunks whose text is new.
+
+        Returns None when nothing is stored yet, so the caller falls back to a plain insert.
+        """
+
+        stored = self.milvus_service.fetch_video_chunks(collection_name, video_id)
+        if not stored:
+            return None
+
+        def _row_key(row: dict[str, Any]) -> tuple[str, int | None]:
+            # Rows written before chunk hashes existed are hashed from their stored text.
+            return row['metadata'].get('chunk_hash') or chunk_hash(row['text']), row['metadata'].get('chunk_index')
+
+        stored_by_hash = {_row_key(row)[0]: row for row in stored}
+        hashes = [item['chunk_hash'] for item in metadata]
+        new_indexes = [idx for idx, value in enumerate(hashes) if value not in stored_by_hash]
+
+        embeddings = [stored_by_hash[value]['embedding'] if value in stored_by_hash else None for value in hashes]
+        if new_indexes:
+            with self._stage('embedding', chunks=len(new_indexes)):
+                new_embeddings = self.embedding_service.embed_batch([chunks[idx] for idx in new_indexes])
+            for idx, embedding in zip(new_indexes, new_embeddings):
+                embeddings[idx] = embedding
+
+        with tracer.span('ingest.milvus_sync', collection=collection_name) as span:
+            # A dedicated per-video collection is rebuilt as a shadow and swapped in; a shared one is patched in place.
+            if self.milvus_service.owns_collection(collection_name, video_id):
+                shadow = self.milvus_service.shadow_collection_name(collection_name)
+                inserted = self._upsert_batches(shadow, embeddings, chunks, metadata)
+                self.milvus_service.swap_collection(collection_name, shadow)
+                deleted = len(stored)
+            else:
+                # Keyed on the stored chunk_index, not list position: dedup can drop chunks, so the two differ.
+                stored_keys = {_row_key(row) for row in stored}
+                keys = [(value, item['chunk_index']) for value, item in zip(hashes, metadata)]
+                wanted_keys = set(keys)
+                pending = [idx for idx, key in enumerate(keys) if key not in stored_keys]
+                # Inserted before deleting, so the video stays searchable throughout.
+                self._upsert_batches(
+                    collection_name,
+                    [embeddings[idx] for idx in pending],
+                    [chunks[idx] for idx in pending],
+                    [metadata[idx] for idx in pending],
+                )
+                stale = [row['id'] for row in stored if _row_key(row) not in wanted_keys]
+                self.milvus_service.delete_ids(collection_name, stale)
+                inserted = len(chunks)
+                deleted = len(stale)
+            span.set_attribute('embedded', len(new_indexes))
+            span.set_attribute('deleted', deleted)
+
+        logger.info(
+            'Incremental rebuild',
+            extra={
+                'video_id': video_id,
+                'collection': collection_name,
+                'chunks': len(chunks),
+                'reused': len(chunks) - len(new_indexes),
+                'embedded': len(new_indexes),
+                'deleted': deleted,
+            },
+        )
+        return inserted
+
+    def _upsert_batches(
+        self,
+        collection_name: str,
+        embeddings: list[list[float]],
+        chunks: list[str],
+        metadata: list[dict[str, Any]],
+    ) -> int:
+        inserted = 0
+        for start in range(0, len(chunks), self.insert_batch_size):
+            end = start + self.insert_batch_size
+            inserted += self.milvus_service.upsert_chunks(
+                collection_name,
+                embeddings[start:end],
+                chunks[start:end],
+                metadata[start:end],
+            )
+        return inserted
+
+    def _open_checkpoint(self, video_id: str | None, rebuild: bool) -> IngestCheckpoint | None:
+        if not self.checkpoints_enabled or not video_id:
+            return None
+        checkpoint = IngestCheckpoint.for_video(self.transcript_dir, video_id)
+        if rebuild:
+            # A rebuild re-transcribes; only the downloaded video and extracted audio are reused.
+            checkpoint.segment_log_path.unlink(missing_ok=True)
+            checkpoint.update(transcript_path='', collection='', chunk_count=0, inserted_chunks=0, summary={})
+        elif checkpoint.exists:
+            logger.info('Resuming ingestion from checkpoint', extra={'video_id': video_id, 'stage': checkpoint.stage})
+        return checkpoint
+
+    @staticmethod
+    def _save_checkpoint(checkpoint: IngestCheckpoint | None, **values: Any) -> None:
+        if checkpoint is not None:
+            checkpoint.update(**values)
+
     def _load_cached_result(self, video_id: str, collection_name: str) -> dict[str, Any] | None:
         manifest_path = self.transcript_dir / f'{video_id}.json'
         if not manifest_path.exists():
@@ -0,0 +1,158 @@
+"""Speculative retrieval for typing-ahead clients.
+
+The frontend sends the partial question to `POST /chat/prefetch` while the user types. After a debounce, the latest
+partial question per client is retrieved and kept for a few seconds; a `/chat` or `/chat/stream` call from the same
+client whose question closely matches reuses those hits, or waits for the retrieval still in flight, instead of
+starting its own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Awaitable, Callable
+
+from app.core.metrics import PREFETCH_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r'[^\w\s]+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_question(question: str) -> str:
+    return _WHITESPACE.sub(' ', _PUNCTUATION.sub(' ', question.lower())).strip()
+
+
+@dataclass
+class _ClientState:
+    generation: int = 0
+    normalized: str = ''
+    collection_name: str = ''
+    top_k: int | None = None
+    created_at: float = 0.0
+    task: asyncio.Future | None = None
+
+
+class PrefetchCache:
+    def __init__(
+        self,
+        debounce_s: float = 0.25,
+        ttl_s: float = 30.0,
+        min_similarity: float = 0.85,
+        max_clients: int = 10000,
+    ) -> None:
+        self.debounce_s = max(0.0, debounce_s)
+        self.ttl_s = ttl_s
+        self.min_similarity = min_similarity
+        self.max_clients = max(1, max_clients)
+        self._clients: OrderedDict[str, _ClientState] = OrderedDict()
+        self._counts = {'prefetches': 0, 'superseded': 0, 'failed': 0, 'hits': 0, 'misses': 0}
+
+    async def prefetch(
+        self,
+        client_id: str,
+        question: str,
+        collection_name: str,
+        top_k: int | None,
+        retrieve: Callable[[], Awaitable[list[dict]]],
+    ) -> str:
+        """Debounce, then retrieve for the client's latest partial question; returns what happened."""
+
+        state = self._state(client_id)
+        state.generation += 1
+        generation = state.generation
+        await asyncio.sleep(self.debounce_s)
+        if state.generation != generation or self._clients.get(client_id) is not state:
+            self._counts['superseded'] += 1
+            return 'superseded'
+
+        normalized = normalize_question(question)
+        if (
+            state.task is not None
+            and state.normalized == normalized
+            and (state.collection_name, state.top_k) == (collection_name, top_k)
+            and not self._expired(state)
+        ):
+            return 'cached'
+
+        self._counts['prefetches'] += 1
+        task = asyncio.ensure_future(retrieve())
+        state.normalized, state.collection_name, state.top_k = normalized, collection_name, top_k
+        state.created_at, state.task = time.monotonic(), task
+        try:
+            # Shielded: a client aborting its prefetch request must not cancel hits a chat call may be waiting on.
+            await asyncio.shield(task)
+        except Exception as exc:  # noqa: BLE001
+            self._counts['failed'] += 1
+            if state.task is task:
+                state.task = None
+            logger.debug('Prefetch retrieval failed', extra={'client_id': client_id, 'error': str(exc)})
+            return 'failed'
+        return 'ready'
+
+    async def claim(
+        self,
+        client_id: str,
+        question: str,
+        collection_name: str,
+        top_k: int | None,
+        usable: Callable[[list[dict]], Awaitable[bool]] | None = None,
+    ) -> list[dict] | None:
+        """Prefetched hits for a submitted question, or None when nothing close enough was prefetched.
+
+        Empty hits, and hits `usable` turns down for the final question, count as misses, so the hit rate only counts
+        prefetches that actually replaced a retrieval.
+        """
+
+        state = self._clients.get(client_id)
+        task = state.task if state is not None else None
+        if (
+            task is None
+            or self._expired(state)
+            or (state.collection_name, state.top_k) != (collection_name, top_k)
+            or SequenceMatcher(None, state.normalized, normalize_question(question)).ratio() < self.min_similarity
+        ):
+            return self._miss()
+        # One use per prefetch: the next question from this client starts clean.
+        state.task = None
+        try:
+            hits = await asyncio.shield(task)
+            if not hits or (usable is not None and not await usable(hits)):
+                return self._miss()
+        except Exception:  # noqa: BLE001
+            return self._miss()
+        self._counts['hits'] += 1
+        PREFETCH_LOOKUPS.inc(outcome='hit')
+        return hits
+
+    def stats(self) -> dict:
+        lookups = self._counts['hits'] + self._counts['misses']
+        return {
+            'clients': len(self._clients),
+            **self._counts,
+            'hit_rate': round(self._counts['hits'] / lookups, 4) if lookups else 0.0,
+        }
+
+    def _miss(self) -> None:
+        self._counts['misses'] += 1
+        PREFETCH_LOOKUPS.inc(outcome='miss')
+        return None
+
+    def _expired(self, state: _ClientState) -> bool:
+        return time.monotonic() - state.created_at > self.ttl_s
+
+    def _state(self, client_id: str) -> _ClientState:
+        state = self._clients.get(client_id)
+        if state is None:
+            state = self._clients[client_id] = _ClientState()
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(client_id)
+        return state
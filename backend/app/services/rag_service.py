@@ -1,13 +1,45 @@
 from __future__ import annotations
 
 import re
+import threading
+import time
+from contextlib import nullcontext
 from dataclasses import dataclass
+from typing import Callable, Sequence
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from openai import OpenAI
 
+from app.core.admission import AdmissionGate
+from app.core.metrics import (
+    CACHE_HITS,
+    LLM_REQUEST_SECONDS,
+    LLM_TIME_TO_FIRST_TOKEN_SECONDS,
+    LLM_TOKENS,
+    QUERY_EMBEDDING_SECONDS,
+)
+from app.core.tracing import tracer
 from app.services.embedding_service import EmbeddingService
 from app.services.milvus_service import MilvusService
+from app.services.session_service import ChatSession
+from app.services.summary_service import SummaryService
+
+_SYSTEM_PROMPT = 'You are a strict RAG assistant.'
+_NO_ANSWER = "I don't know based on the provided context."
+_INSTRUCTIONS = f"Answer ONLY using the provided context. If the answer is not in the context, say: '{_NO_ANSWER}'"
+
+_SCOPE = r'(?:this|the|these|that)\s+(?:whole\s+|entire\s+|full\s+)?(?:video|talk|lecture|episode|podcast|recording)s?'
+# Questions about the video as a whole. A bare "summary" or "outline" is not enough: "what does she say about summary
+# statistics" is a specific question and must go through retrieval.
+_OVERVIEW_PATTERN = re.compile(
+    rf"\bwhat(?:'s| is| are)\s+{_SCOPE}\s+about\b"
+    rf'|\b(?:summar(?:y|i[sz]e)|overview|outline|recap|gist|tl;?dr)\s+(?:of\s+)?{_SCOPE}'
+    rf'|\b(?:main|key|major)\s+(?:topics?|points?|ideas?|takeaways?|themes?)\s+(?:of|in|from)\s+{_SCOPE}'
+    r'|^(?:(?:can|could|would)\s+you\s+)?(?:please\s+)?(?:summari[sz]e|outline|recap)(?:\s+(?:it|this|that))?'
+    r'(?:\s+for\s+me)?(?:\s+please)?$'
+    r'|^(?:give\s+me|write|i\s+want|can\s+i\s+get)\s+(?:a|an|the)\s+(?:short\s+|brief\s+|quick\s+)?'
+    r'(?:summary|overview|outline|recap)(?:\s+please)?$'
+    r'|^(?:tl;?dr|the\s+gist|what\s+are\s+the\s+(?:main|key)\s+(?:topics|points|takeaways))$'
+)
 
 
 @dataclass
@@ -17,6 +49,71 @@ class RagResult:
     tokens_used: int
 
 
+class LlmStream:
+    """A provider chat stream that holds an LLM admission slot until it is drained or closed.
+
+    Callers must `close()` it even if they never iterate: an abandoned generator that never started would not run
+    its cleanup, and the slot would leak. `close()` is idempotent and safe from any thread.
+    """
+
+    def __init__(
+        self,
+        stream,
+        sent_at: float | None = None,
+        span=None,
+        release: Callable[[], None] | None = None,
+        on_complete: Callable[[str], None] | None = None,
+    ) -> None:
+        self._stream = stream
+        self._sent_at = sent_at
+        self._span = span
+        self._release = release
+        self._on_complete = on_complete
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __iter__(self):
+        first_token = True
+        parts: list[str] = []
+        try:
+            for chunk in self._stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if first_token and delta and self._sent_at is not None:
+                    ttft = time.perf_counter() - self._sent_at
+                    LLM_TIME_TO_FIRST_TOKEN_SECONDS.observe(ttft, mode='stream')
+                    self._span.set_attribute('llm.ttft_ms', round(ttft * 1000, 1))
+                    first_token = False
+                if delta and self._on_complete is not None:
+                    parts.append(delta)
+                yield chunk
+            # Only a fully delivered answer becomes part of the session history.
+            if self._on_complete is not None:
+                self._on_complete(''.join(parts) or _NO_ANSWER)
+        except Exception as exc:
+            if self._span is not None:
+                self._span.record_error(exc)
+            raise
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            close_upstream = getattr(self._stream, 'close', None)
+            if close_upstream is not None:
+                close_upstream()
+        finally:
+            if self._sent_at is not None:
+                LLM_REQUEST_SECONDS.observe(time.perf_counter() - self._sent_at, mode='stream')
+            if self._span is not None:
+                self._span.end()
+            if self._release is not None:
+                self._release()
+
+
 class RagService:
     def __init__(
         self,
@@ -27,118 +124,460 @@ class RagService:
         chunk_size: int,
         chunk_overlap: int,
         max_context_chunks: int,
+        llm_gate: AdmissionGate | None = None,
+        neighbor_window: int = 0,
+        summary_service: SummaryService | None = None,
     ) -> None:
         self.embedding_service = embedding_service
         self.milvus_service = milvus_service
         self.openai_client = openai_client
         self.chat_model = chat_model
         self.max_context_chunks = max_context_chunks
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            separators=['\n\n', '\n', '. ', ' ', ''],
-        )
+        self.llm_gate = llm_gate
+        self.neighbor_window = max(0, neighbor_window)
+        self.summary_service = summary_service
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._splitter = None
+
+    @property
+    def splitter(self):
+        # Only ingestion chunks text; chat-only workers never import the splitter package.
+        if self._splitter is None:
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+            self._splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                separators=['\n\n', '\n', '. ', ' ', ''],
+            )
+        return self._splitter
 
     def chunk_text(self, text: str) -> list[str]:
         return self.splitter.split_text(text)
 
+    def chunk_segments(self, segments: Sequence[tuple[float, float, str]]) -> list[tuple[str, float, float]]:
+        """Pack whole transcript segments into chunks of at most `chunk_size` characters in one forward pass.
+
+        Consecutive chunks share trailing segments worth up to `chunk_overlap` characters; a single segment longer
+        than `chunk_size` becomes its own chunk. Returns `(text, start_s, end_s)` per chunk.
+        """
+
+        lengths = [len(segment[2]) for segment in segments]
+        chunks: list[tuple[str, float, float]] = []
+        start = 0
+        while start < len(segments):
+            end = start + 1
+            size = lengths[start]
+            while end < len(segments) and size + 1 + lengths[end] <= self.chunk_size:
+                size += 1 + lengths[end]
+                end += 1
+            text = ' '.join(segment[2] for segment in segments[start:end])
+            chunks.append((text, float(segments[start][0]), float(segments[end - 1][1])))
+            if end >= len(segments):
+                break
+
+            # Carry trailing segments forward as overlap, but only while the next new segment still fits after them.
+            next_start = end
+            overlap = 0
+            while next_start - 1 > start:
+                carried = overlap + lengths[next_start - 1] + 1
+                if carried > self.chunk_overlap or carried + lengths[end] > self.chunk_size:
+                    break
+                next_start -= 1
+                overlap = carried
+            start = next_start
+        return chunks
+
     def build_prompt(self, question: str, context_chunks: list[str]) -> str:
         context = '\n\n'.join(context_chunks)
-        return (
-            'Answer ONLY using the provided context. '
-            "If the answer is not in the context, say: 'I don't know based on the provided context.'\n\n"
-            f'Context:\n{context}\n\nQuestion: {question}'
-        )
+        return f'{_INSTRUCTIONS}\n\nContext:\n{context}\n\nQuestion: {question}'
+
+    def build_session_messages(
+        self,
+        question: str,
+        context_chunks: list[str],
+        turns: list[tuple[str, str, list[str]]],
+    ) -> list[dict]:
+        """Earlier turns replayed exactly as they were sent, then this turn's new chunks and its question.
+
+        From one turn to the next the message list only grows at the end (until the oldest turn is evicted), so every
+        request starts with the whole previous one, which is the prefix provider-side prompt caching matches on.
+        """
+
+        messages = [{'role': 'system', 'content': f'{_SYSTEM_PROMPT} {_INSTRUCTIONS}'}]
+        for past_question, past_answer, past_context in turns:
+            messages.append({'role': 'user', 'content': self._session_turn(past_question, past_context)})
+            messages.append({'role': 'assistant', 'content': past_answer})
+        messages.append({'role': 'user', 'content': self._session_turn(question, context_chunks)})
+        return messages
+
+    @staticmethod
+    def _session_turn(question: str, context_chunks: list[str]) -> str:
+        if not context_chunks:
+            return f'Question: {question}'
+        context = '\n\n'.join(context_chunks)
+        return f'Context:\n{context}\n\nQuestion: {question}'
 
     def answer_question(
         self,
         question: str,
         collection_name: str,
         top_k: int | None = None,
+        session: ChatSession | None = None,
+        prefetched: list[dict] | None = None,
+        video_id: str | None = None,
     ) -> RagResult:
-        context_hits = self._retrieve_context_hits(question, collection_name, top_k)
-        context_chunks = [item['text'] for item in context_hits if item.get('text')]
+        context_hits, messages, turn_context = self._prepare(
+            question, collection_name, top_k, session, prefetched, video_id
+        )
+        if not messages:
+            return RagResult(answer=_NO_ANSWER, sources=[], tokens_used=0)
+
+        with self.llm_gate.slot() if self.llm_gate else nullcontext():
+            with tracer.span('rag.llm', model=self.chat_model, stream=False) as span:
+                with LLM_REQUEST_SECONDS.time(mode='complete'):
+                    response = self.openai_client.chat.completions.create(
+                        model=self.chat_model,
+                        messages=messages,
+                        temperature=0.0,
+                    )
+                tokens_used = int(response.usage.total_tokens) if response.usage else 0
+                span.set_attribute('llm.tokens', tokens_used)
+
+        answer = response.choices[0].message.content or _NO_ANSWER
+        LLM_TOKENS.inc(tokens_used, mode='complete')
+        if session is not None:
+            session.record_turn(question, answer, turn_context)
 
-        if not context_chunks:
-            return RagResult(
-                answer="I don't know based on the provided context.",
-                sources=[],
-                tokens_used=0,
-            )
+        return RagResult(answer=answer, sources=context_hits, tokens_used=tokens_used)
 
-        prompt = self.build_prompt(question, context_chunks)
-        response = self.openai_client.chat.completions.create(
-            model=self.chat_model,
-            messages=[
-                {'role': 'system', 'content': 'You are a strict RAG assistant.'},
-                {'role': 'user', 'content': prompt},
-            ],
-            temperature=0.0,
+    def stream_answer(
+        self,
+        question: str,
+        collection_name: str,
+        top_k: int | None = None,
+        session: ChatSession | None = None,
+        prefetched: list[dict] | None = None,
+        video_id: str | None = None,
+    ) -> tuple[LlmStream, list[dict]]:
+        context_hits, messages, turn_context = self._prepare(
+            question, collection_name, top_k, session, prefetched, video_id
         )
+        if not messages:
+            return LlmStream(iter(())), []
+
+        acquired_at = self.llm_gate.acquire() if self.llm_gate else None
+        release = (lambda: self.llm_gate.release(acquired_at)) if acquired_at is not None else None
+        # Ended by the returned LlmStream once the stream is drained or closed, so it can outlive this call.
+        span = tracer.start_span('rag.llm', attributes={'model': self.chat_model, 'stream': True})
+        sent_at = time.perf_counter()
+        try:
+            stream = self.openai_client.chat.completions.create(
+                model=self.chat_model,
+                messages=messages,
+                temperature=0.0,
+                stream=True,
+            )
+        except Exception as exc:
+            span.record_error(exc)
+            span.end()
+            if release is not None:
+                release()
+            raise
+
+        on_complete = (
+            (lambda answer: session.record_turn(question, answer, turn_context)) if session is not None else None
+        )
+        return LlmStream(stream, sent_at, span, release, on_complete), context_hits
 
-        answer = response.choices[0].message.content or "I don't know based on the provided context."
-        tokens_used = int(response.usage.total_tokens) if response.usage else 0
+    def _prepare(
+        self,
+        question: str,
+        collection_name: str,
+        top_k: int | None,
+        session: ChatSession | None,
+        prefetched: list[dict] | None = None,
+        video_id: str | None = None,
+    ) -> tuple[list[dict], list[dict], list[str] | None]:
+        """Sources, chat messages and the chunk texts new to a session for one question.
+
+        No messages when there is nothing to answer from. `prefetched` hits, retrieved speculatively for this
+        question and already checked with `prefetch_usable`, stand in for this turn's retrieval.
+        """
+
+        if session is None:
+            if prefetched is not None:
+                context_hits = prefetched
+            else:
+                context_hits = self.retrieve_hits(question, collection_name, top_k, video_id)
+            context_chunks = [item['text'] for item in context_hits if item.get('text')]
+            if not context_chunks:
+                return [], [], None
+            with tracer.span('rag.prompt_build', chunks=len(context_chunks)):
+                prompt = self.build_prompt(question, context_chunks)
+            messages = [{'role': 'system', 'content': _SYSTEM_PROMPT}, {'role': 'user', 'content': prompt}]
+            return context_hits, messages, None
+
+        # Concurrent turns of one session take turns, so each sees the chunks the previous one added.
+        with session.lock:
+            context_hits = self._session_hits(question, session, top_k, prefetched)
+            turns = list(session.turns)
+        if not any(item.get('text') for item in context_hits):
+            return [], [], None
+        # Chunks already sent with a retained turn are still in the replayed history, so only new ones follow it.
+        shown = {text for _, _, turn_context in turns for text in turn_context}
+        context_chunks = [item['text'] for item in context_hits if item.get('text') and item['text'] not in shown]
+        with tracer.span('rag.prompt_build', chunks=len(context_chunks), turns=len(turns)):
+            messages = self.build_session_messages(question, context_chunks, turns)
+        return context_hits, messages, context_chunks
+
+    def prefetch_usable(
+        self,
+        question: str,
+        collection_name: str,
+        prefetched: list[dict],
+        video_id: str | None = None,
+    ) -> bool:
+        """Whether hits prefetched for a partial question can stand in for the final question's retrieval.
+
+        Summary hits only answer an overview question. Retrieved chunks are turned down for an overview question only
+        when summaries exist to answer it from; otherwise retrieval is what it would have run anyway.
+        """
+
+        from_summary = any((hit.get('metadata') or {}).get('source') == 'summary' for hit in prefetched)
+        overview = self.is_overview_question(question)
+        if from_summary:
+            return overview
+        if overview and self.summary_service is not None:
+            return not self.summary_service.summaries_for(collection_name, video_id)
+        return True
+
+    def _session_hits(
+        self,
+        question: str,
+        session: ChatSession,
+        top_k: int | None,
+        prefetched: list[dict] | None = None,
+    ) -> list[dict]:
+        """Retrieve for one turn of a session, fold the hits into its chunk set and rank that set for this question.
+
+        The first turn runs full retrieval. A follow-up whose content words all occur in the chunks already held is
+        answered from them without searching; any other follow-up runs a single search for the previous question
+        plus this one instead of every query variant.
+        """
+
+        collection_name = session.collection_name
+        hits = prefetched if prefetched is not None else self._summary_hits(question, collection_name, session.video_id)
+        if not hits and prefetched is None:
+            if not session.turns:
+                hits = self._retrieve_context_hits(question, collection_name, top_k)
+            elif self._covered_by_session(question, session):
+                CACHE_HITS.inc(cache='chat_session')
+            else:
+                contextual = f'{session.turns[-1][0]} {question}'
+                hits = self._retrieve_context_hits(question, collection_name, top_k, variants=[contextual])
+        session.add_hits(hits)
+        ranked = sorted(session.chunks.values(), key=lambda item: self._rank_score(question, item), reverse=True)
+        return ranked[: self.max_context_chunks]
 
-        return RagResult(answer=answer, sources=context_hits, tokens_used=tokens_used)
+    def retrieve_hits(
+        self,
+        question: str,
+        collection_name: str,
+        top_k: int | None = None,
+        video_id: str | None = None,
+    ) -> list[dict]:
+        return self._summary_hits(question, collection_name, video_id) or self._retrieve_context_hits(
+            question, collection_name, top_k
+        )
 
-    def stream_answer(self, question: str, collection_name: str, top_k: int | None = None):
-        context_hits = self._retrieve_context_hits(question, collection_name, top_k)
-        context_chunks = [item['text'] for item in context_hits if item.get('text')]
+    @staticmethod
+    def _covered_by_session(question: str, session: ChatSession) -> bool:
+        # Whole words only ("art" is not covered by "start"), and a question with no content words is not covered.
+        tokens = {token for token in re.findall(r'[a-z0-9]+', question.lower()) if len(token) > 3}
+        if not tokens:
+            return False
+        held: set[str] = set()
+        for item in session.chunks.values():
+            held.update(re.findall(r'[a-z0-9]+', str(item.get('text') or '').lower()))
+        return tokens <= held
+
+    def _summary_hits(self, question: str, collection_name: str, video_id: str | None = None) -> list[dict]:
+        """Answer overview questions from the summaries precomputed at ingest instead of many retrieved chunks."""
+
+        if self.summary_service is None or not self.is_overview_question(question):
+            return []
+        with tracer.span('rag.summary_lookup', collection=collection_name) as span:
+            manifests = self.summary_service.summaries_for(collection_name, video_id)
+            span.set_attribute('videos', len(manifests))
+        if manifests:
+            CACHE_HITS.inc(cache='video_summary')
+        return [
+            {
+                'id': manifest.get('video_id'),
+                'score': 1.0,
+                'text': self.summary_service.render(manifest),
+                'metadata': {
+                    'video_id': manifest.get('video_id'),
+                    'title': manifest.get('title'),
+                    'source': 'summary',
+                    'outline': manifest['summary'].get('outline', []),
+                },
+            }
+            for manifest in manifests
+        ]
 
-        if not context_chunks:
-            def _empty_stream():
-                if False:
-                    yield None
-
-            return _empty_stream(), []
-
-        prompt = self.build_prompt(question, context_chunks)
-
-        stream = self.openai_client.chat.completions.create(
-            model=self.chat_model,
-            messages=[
-                {'role': 'system', 'content': 'You are a strict RAG assistant.'},
-                {'role': 'user', 'content': prompt},
-            ],
-            temperature=0.0,
-            stream=True,
-        )
-        return stream, context_hits
+    @staticmethod
+    def is_overview_question(question: str) -> bool:
+        normalized = re.sub(r'\s+', ' ', re.sub(r'[?.!,]+', ' ', question.lower())).strip()
+        return bool(_OVERVIEW_PATTERN.search(normalized))
 
-    def _retrieve_context_hits(self, question: str, collection_name: str, top_k: int | None) -> list[dict]:
+    def _retrieve_context_hits(
+        self,
+        question: str,
+        collection_name: str,
+        top_k: int | None,
+        variants: list[str] | None = None,
+    ) -> list[dict]:
         list_intent = self._is_list_or_type_question(question)
         base_top_k = top_k or self.milvus_service.top_k
         candidate_top_k = max(base_top_k, 10 if list_intent else 8)
 
-        variants = self._query_variants(question)
+        variants = variants or self._query_variants(question)
         merged_hits: list[dict] = []
         seen_keys: set[tuple[str, str, str]] = set()
 
-        for variant in variants:
-            query_embedding = self.embedding_service.embed_text(variant)
-            hits = self.milvus_service.search(
-                collection_name=collection_name,
-                query_vector=query_embedding,
-                top_k=candidate_top_k,
-            )
-            for hit in hits:
-                metadata = hit.get('metadata') or {}
-                key = (
-                    str(metadata.get('video_id', '')),
-                    str(metadata.get('chunk_index', '')),
-                    str(hit.get('text', '')),
-                )
-                if key in seen_keys:
-                    continue
-                seen_keys.add(key)
-                merged_hits.append(hit)
-
-        ranked = sorted(merged_hits, key=lambda item: self._rank_score(question, item), reverse=True)
-
-        if list_intent:
-            ranked = self._boost_type_definition_chunks(question, ranked)
-
-        return ranked[: self.max_context_chunks]
+        with tracer.span('rag.retrieve', variants=len(variants), list_intent=list_intent, top_k=candidate_top_k):
+            for index, variant in enumerate(variants):
+                with tracer.span('rag.variant', index=index):
+                    with tracer.span('rag.embed_query'), QUERY_EMBEDDING_SECONDS.time():
+                        query_embedding = self.embedding_service.embed_text(variant)
+                    with tracer.span('rag.milvus_search', collection=collection_name) as span:
+                        hits = self.milvus_service.search(
+                            collection_name=collection_name,
+                            query_vector=query_embedding,
+                            top_k=candidate_top_k,
+                        )
+                        span.set_attribute('hits', len(hits))
+                for hit in hits:
+                    metadata = hit.get('metadata') or {}
+                    key = (
+                        str(metadata.get('video_id', '')),
+                        str(metadata.get('chunk_index', '')),
+                        str(hit.get('text', '')),
+                    )
+                    if key in seen_keys:
+                        continue
+                    seen_keys.add(key)
+                    merged_hits.append(hit)
+
+        with tracer.span('rag.rerank', candidates=len(merged_hits)):
+            ranked = sorted(merged_hits, key=lambda item: self._rank_score(question, item), reverse=True)
+
+            if list_intent:
+                ranked = self._boost_type_definition_chunks(question, ranked)
+
+        top_hits = ranked[: self.max_context_chunks]
+        if self.neighbor_window > 0:
+            with tracer.span('rag.expand_neighbors', window=self.neighbor_window, hits=len(top_hits)):
+                return self._expand_neighbors(top_hits, collection_name)
+        return top_hits
+
+    def _expand_neighbors(self, hits: list[dict], collection_name: str) -> list[dict]:
+        """Widen each hit to `neighbor_window` chunks on either side, fetched by chunk_index in one query.
+
+        Hits from the same video whose windows touch are merged into one passage, ranked by the best hit.
+        """
+
+        window = self.neighbor_window
+        by_key: dict[tuple[str, int], dict] = {}
+        wanted: dict[str, set[int]] = {}
+        for hit in hits:
+            metadata = hit.get('metadata') or {}
+            video_id, chunk_index = metadata.get('video_id'), metadata.get('chunk_index')
+            if video_id is None or not isinstance(chunk_index, int):
+                continue
+            by_key[(str(video_id), chunk_index)] = hit
+            neighbors = range(max(0, chunk_index - window), chunk_index + window + 1)
+            wanted.setdefault(str(video_id), set()).update(neighbors)
+
+        missing = {
+            video_id: sorted(index for index in indexes if (video_id, index) not in by_key)
+            for video_id, indexes in wanted.items()
+        }
+        if any(missing.values()):
+            for row in self.milvus_service.fetch_chunks_by_index(collection_name, missing):
+                metadata = row.get('metadata') or {}
+                by_key.setdefault((str(metadata.get('video_id')), int(metadata.get('chunk_index', -1))), row)
+
+        passages: list[dict] = []
+        for hit in hits:
+            metadata = hit.get('metadata') or {}
+            video_id, chunk_index = metadata.get('video_id'), metadata.get('chunk_index')
+            if video_id is None or not isinstance(chunk_index, int):
+                passages.append(hit)
+                continue
+            low, high = max(0, chunk_index - window), chunk_index + window
+            for passage in passages:
+                bounds = passage.get('_range')
+                if bounds and bounds[0] == str(video_id) and low <= bounds[2] + 1 and bounds[1] <= high + 1:
+                    passage['_range'] = (bounds[0], min(low, bounds[1]), max(high, bounds[2]))
+                    break
+            else:
+                passages.append({**hit, '_range': (str(video_id), low, high)})
+
+        expanded: list[dict] = []
+        for passage in passages:
+            bounds = passage.pop('_range', None)
+            if bounds is None:
+                expanded.append(passage)
+                continue
+            video_id, low, high = bounds
+            rows = [by_key[(video_id, index)] for index in range(low, high + 1) if (video_id, index) in by_key]
+            text = ''
+            previous: dict | None = None
+            for row in rows:
+                text = self._join_overlapping(text, str(row.get('text') or ''), self._overlap_floor(previous, row))
+                previous = row
+            metadata = dict(passage.get('metadata') or {})
+            first, last = rows[0]['metadata'], rows[-1]['metadata']
+            metadata['chunk_range'] = [int(first['chunk_index']), int(last['chunk_index'])]
+            if 'start_s' in first:
+                metadata['start_s'] = first['start_s']
+                metadata['end_s'] = last.get('end_s')
+            expanded.append({**passage, 'text': text, 'metadata': metadata})
+        return expanded
+
+    def _overlap_floor(self, previous: dict | None, row: dict) -> int | None:
+        """Shortest repeated prefix `row` can share with `previous`, or None when the two cannot overlap."""
+
+        if previous is None:
+            return None
+        left, right = previous.get('metadata') or {}, row.get('metadata') or {}
+        if int(right.get('chunk_index', -1)) != int(left.get('chunk_index', -1)) + 1:
+            return None
+        if left.get('end_s') is not None and right.get('start_s') is not None:
+            # Segment chunks overlap by whole carried segments, and only when their time ranges overlap.
+            return 1 if float(right['start_s']) < float(left['end_s']) else None
+        # The text splitter carries up to `chunk_overlap` characters; a much shorter match is a coincidence.
+        return max(1, self.chunk_overlap // 2)
+
+    def _join_overlapping(self, left: str, right: str, min_overlap: int | None) -> str:
+        # Drop the prefix of the right chunk that repeats the end of the left one. Matches must cover whole words,
+        # so "we used the" + "the optimizer" keeps both words; with no overlap expected the chunks are just joined.
+        if not left:
+            return right
+        if min_overlap is None:
+            return f'{left} {right}'
+        for size in range(min(len(left), len(right), self.chunk_overlap + 1), min_overlap - 1, -1):
+            if not left.endswith(right[:size]):
+                continue
+            starts_word = size == len(left) or left[-size - 1].isspace() or right[0].isspace()
+            ends_word = size == len(right) or right[size].isspace() or right[size - 1].isspace()
+            if starts_word and ends_word:
+                return left + right[size:]
+        return f'{left} {right}'
 
     def _query_variants(self, question: str) -> list[str]:
         normalized = question.strip()
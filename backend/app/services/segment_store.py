@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import bisect
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator
+
+Segment = tuple[float, float, str]
+
+# Layout (little-endian): header, float32 starts[n], float32 ends[n], uint32 byte offsets[n + 1], UTF-8 text.
+_MAGIC = b'VSEG'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHII')
+_UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+class SegmentStore:
+    """Array-backed transcript segments: float32 start/end times and offsets into one UTF-8 text blob."""
+
+    def __init__(self, starts: array, ends: array, offsets: array, text: bytes) -> None:
+        self.starts = starts
+        self.ends = ends
+        self.offsets = offsets
+        self.text = text
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Segment]) -> SegmentStore:
+        starts, ends, offsets = array('f'), array('f'), array(_UINT32, [0])
+        blob = bytearray()
+        for start, end, text in segments:
+            starts.append(start)
+            ends.append(end)
+            blob += text.encode('utf-8')
+            offsets.append(len(blob))
+        return cls(starts, ends, offsets, bytes(blob))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Segment:
+        return self.starts[index], self.ends[index], self.text_at(index)
+
+    def __iter__(self) -> Iterator[Segment]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def text_at(self, index: int) -> str:
+        return self.text[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+    def transcript(self) -> str:
+        return ' '.join(self.text_at(index) for index in range(len(self)))
+
+    def index_at(self, time_s: float) -> int:
+        """Index of the segment playing at `time_s` (or the last one that started before it)."""
+
+        return max(0, bisect.bisect_right(self.starts, time_s) - 1)
+
+    def save(self, path: Path) -> None:
+        tmp_path = path.with_name(f'{path.name}.tmp')
+        with tmp_path.open('wb') as handle:
+            handle.write(_HEADER.pack(_MAGIC, _VERSION, len(self), len(self.text)))
+            for values in (self.starts, self.ends, self.offsets):
+                _little_endian(values).tofile(handle)
+            handle.write(self.text)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> SegmentStore:
+        with path.open('rb') as handle:
+            magic, version, count, text_bytes = _HEADER.unpack(handle.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f'Unsupported segment store: {path}')
+            starts, ends, offsets = array('f'), array('f'), array(_UINT32)
+            starts.fromfile(handle, count)
+            ends.fromfile(handle, count)
+            offsets.fromfile(handle, count + 1)
+            text = handle.read(text_bytes)
+        return cls(_little_endian(starts), _little_endian(ends), _little_endian(offsets), text)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+
+def hit_key(hit: dict) -> tuple[str, str, str]:
+    # Same identity as retrieval's dedupe key; passages from neighbor expansion are told apart by their range.
+    metadata = hit.get('metadata') or {}
+    position = metadata.get('chunk_range') or metadata.get('chunk_index', hit.get('id', ''))
+    return str(metadata.get('video_id', '')), str(position), str(hit.get('text', ''))
+
+
+@dataclass
+class ChatSession:
+    """Recent turns and every chunk retrieved so far in one conversation, scoped to one collection.
+
+    `chunks` is the pool each turn ranks its context from, oldest evicted first. `turns` keeps every retained
+    exchange with the chunk texts that were sent along with its question, so later requests can replay it verbatim.
+    """
+
+    session_id: str
+    collection_name: str
+    max_turns: int
+    max_chunks: int
+    video_id: str | None = None
+    turns: deque = field(default_factory=deque)
+    chunks: OrderedDict = field(default_factory=OrderedDict)
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_hits(self, hits: list[dict]) -> int:
+        added = 0
+        for hit in hits:
+            key = hit_key(hit)
+            if key in self.chunks:
+                continue
+            self.chunks[key] = hit
+            added += 1
+        while len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return added
+
+    def record_turn(self, question: str, answer: str, context: list[str] | None = None) -> None:
+        with self.lock:
+            self.turns.append((question, answer, list(context or [])))
+            while len(self.turns) > self.max_turns:
+                self.turns.popleft()
+
+    def snapshot(self) -> dict:
+        return {
+            'session_id': self.session_id,
+            'collection_name': self.collection_name,
+            'video_id': self.video_id,
+            'turns': len(self.turns),
+            'chunks': len(self.chunks),
+            'age_s': round(time.monotonic() - self.created_at, 1),
+        }
+
+
+class SessionStore:
+    """Bounded in-memory chat sessions: least recently used evicted first, idle sessions expire after `ttl_s`."""
+
+    def __init__(self, max_sessions: int = 1000, ttl_s: float = 1800.0, max_turns: int = 6, max_chunks: int = 24):
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_s = ttl_s
+        self.max_turns = max(0, max_turns)
+        self.max_chunks = max(1, max_chunks)
+        self._sessions: OrderedDict[str, ChatSession] = OrderedDict()
+        self._lock = threading.Lock()
+        self._evicted = 0
+        self._expired = 0
+
+    def create(self, collection_name: str, video_id: str | None = None) -> ChatSession:
+        session = ChatSession(uuid.uuid4().hex, collection_name, self.max_turns, self.max_chunks, video_id)
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            self._sessions[session.session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._evicted += 1
+        return session
+
+    def get(self, session_id: str) -> ChatSession | None:
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'ttl_s': self.ttl_s,
+                'evicted': self._evicted,
+                'expired': self._expired,
+            }
+
+    def _purge_expired(self, now: float) -> None:
+        # Least recently used first, so expired sessions are always at the front.
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_used < self.ttl_s:
+                break
+            self._sessions.popitem(last=False)
+            self._expired += 1
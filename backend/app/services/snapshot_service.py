@@ -0,0 +1,262 @@
+"""Vector-store snapshots: export collections and their video manifests to one archive, import with bulk loads.
+
+Archive layout (tar, gzip level 1), read and written strictly in order so import can stream it:
+
+    snapshot.json                   version, embedding model, per-collection row counts and index params
+    collections/<name>.vec          repeated frames: <II (rows, payload bytes), float32[rows * dim], JSON payload
+    transcripts/<video_id>.*        manifest (.json), transcript (.txt) and segment store (.segments.bin)
+
+Run offline against the database file, e.g. before starting the API on a new node:
+
+    python -m app.services.snapshot_service export snapshot.tar.gz
+    python -m app.services.snapshot_service import snapshot.tar.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import logging
+import struct
+import sys
+import tarfile
+import tempfile
+import time
+from array import array
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+from app.services.milvus_service import MilvusService
+from app.services.summary_service import ManifestIndex
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+_FRAME = struct.Struct('<II')
+_TRANSCRIPT_SUFFIXES = ('.json', '.txt', '.segments.bin')
+
+
+def _float32_bytes(embeddings: list[list[float]]) -> bytes:
+    values = array('f')
+    for embedding in embeddings:
+        values.extend(embedding)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_exact(handle: IO[bytes], size: int) -> bytes:
+    data = handle.read(size)
+    if len(data) != size:
+        raise ValueError('Snapshot archive is truncated')
+    return data
+
+
+class SnapshotService:
+    def __init__(
+        self,
+        milvus_service: MilvusService,
+        transcript_dir: Path,
+        embedding_model: str,
+        batch_size: int = 2048,
+    ) -> None:
+        self.milvus_service = milvus_service
+        self.transcript_dir = transcript_dir
+        self.embedding_model = embedding_model
+        self.batch_size = max(1, batch_size)
+        self.manifest_index = ManifestIndex(transcript_dir)
+
+    def export(self, archive_path: Path, collections: list[str] | None = None) -> dict[str, Any]:
+        started = time.perf_counter()
+        names = collections or self.milvus_service.list_collections()
+        manifest: dict[str, Any] = {
+            'version': SNAPSHOT_VERSION,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'embedding_model': self.embedding_model,
+            'collections': [],
+            'files': [],
+        }
+        video_ids: set[str] = set()
+
+        with tempfile.TemporaryDirectory(prefix='snapshot-', dir=archive_path.parent) as tmp:
+            staging = Path(tmp)
+            for name in names:
+                member = f'collections/{self.milvus_service._sanitize_collection_name(name)}.vec'
+                entry = self._export_collection(name, staging / member, video_ids)
+                if entry['rows']:
+                    manifest['collections'].append({**entry, 'member': member})
+
+            for video_id in sorted(video_ids):
+                for suffix in _TRANSCRIPT_SUFFIXES:
+                    if (self.transcript_dir / f'{video_id}{suffix}').exists():
+                        manifest['files'].append(f'transcripts/{video_id}{suffix}')
+
+            # snapshot.json goes first so import can validate before reading any vectors.
+            tmp_archive = archive_path.with_name(f'{archive_path.name}.tmp')
+            with tarfile.open(tmp_archive, 'w:gz', compresslevel=1) as archive:
+                data = json.dumps(manifest, indent=2).encode('utf-8')
+                info = tarfile.TarInfo('snapshot.json')
+                info.size = len(data)
+                info.mtime = int(time.time())
+                archive.addfile(info, io.BytesIO(data))
+                for entry in manifest['collections']:
+                    archive.add(staging / entry['member'], arcname=entry['member'])
+                for member in manifest['files']:
+                    archive.add(self.transcript_dir / Path(member).name, arcname=member)
+            tmp_archive.replace(archive_path)
+
+        logger.info(
+            'Exported snapshot',
+            extra={
+                'path': str(archive_path),
+                'collections': len(manifest['collections']),
+                'rows': sum(entry['rows'] for entry in manifest['collections']),
+                'seconds': round(time.perf_counter() - started, 2),
+            },
+        )
+        return manifest
+
+    def _export_collection(self, name: str, path: Path, video_ids: set[str]) -> dict[str, Any]:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rows = 0
+        dimension = 0
+        with path.open('wb') as handle:
+            for batch in self.milvus_service.iter_rows(name, self.batch_size):
+                embeddings = [row['embedding'] for row in batch]
+                dimension = dimension or len(embeddings[0])
+                payload = json.dumps([[row['text'], row['metadata']] for row in batch]).encode('utf-8')
+                handle.write(_FRAME.pack(len(batch), len(payload)))
+                handle.write(_float32_bytes(embeddings))
+                handle.write(payload)
+                rows += len(batch)
+                video_ids.update(str(row['metadata']['video_id']) for row in batch if row['metadata'].get('video_id'))
+        return {
+            'name': name,
+            'rows': rows,
+            'dimension': dimension,
+            'index': self.milvus_service.index_params(name),
+        }
+
+    def import_(self, archive_path: Path, force: bool = False) -> dict[str, Any]:
+        started = time.perf_counter()
+        self.transcript_dir.mkdir(parents=True, exist_ok=True)
+        with tarfile.open(archive_path, 'r|gz') as archive:
+            members = iter(archive)
+            first = next(members, None)
+            if first is None or first.name != 'snapshot.json':
+                raise ValueError(f'{archive_path} is not a snapshot archive')
+            manifest = json.loads(archive.extractfile(first).read())
+            self._check_compatible(manifest, force)
+            collections = {entry['member']: entry for entry in manifest['collections']}
+
+            loaded = 0
+            for member in members:
+                handle = archive.extractfile(member)
+                if member.name in collections:
+                    entry = collections[member.name]
+                    inserted = self.milvus_service.bulk_load(
+                        entry['name'],
+                        entry['dimension'],
+                        self._read_frames(handle, entry['dimension']),
+                        entry.get('index'),
+                    )
+                    if inserted != entry['rows']:
+                        raise ValueError(
+                            f"Collection {entry['name']}: expected {entry['rows']} rows, loaded {inserted}"
+                        )
+                    loaded += inserted
+                elif member.name.startswith('transcripts/') and handle is not None:
+                    self._restore_transcript_file(Path(member.name).name, handle.read())
+
+        logger.info(
+            'Imported snapshot',
+            extra={
+                'path': str(archive_path),
+                'collections': len(collections),
+                'rows': loaded,
+                'seconds': round(time.perf_counter() - started, 2),
+            },
+        )
+        return manifest
+
+    def _check_compatible(self, manifest: dict[str, Any], force: bool) -> None:
+        if manifest.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {manifest.get('version')}; expected {SNAPSHOT_VERSION}")
+        dimensions = {entry['dimension'] for entry in manifest['collections']}
+        if dimensions - {self.milvus_service.dimension} and not force:
+            raise ValueError(f'Snapshot dimensions {sorted(dimensions)} do not match MILVUS_DIMENSION')
+        if manifest.get('embedding_model') != self.embedding_model and not force:
+            raise ValueError(
+                f"Snapshot was embedded with {manifest.get('embedding_model')}, this node uses {self.embedding_model}"
+            )
+
+    def _read_frames(self, handle: IO[bytes], dimension: int) -> Iterator[tuple[list, list, list]]:
+        while True:
+            header = handle.read(_FRAME.size)
+            if not header:
+                return
+            count, payload_size = _FRAME.unpack(header)
+            values = array('f')
+            values.frombytes(_read_exact(handle, count * dimension * 4))
+            if sys.byteorder == 'big':
+                values.byteswap()
+            rows = json.loads(_read_exact(handle, payload_size))
+            embeddings = [values[index * dimension:(index + 1) * dimension].tolist() for index in range(count)]
+            yield embeddings, [row[0] for row in rows], [row[1] for row in rows]
+
+    def _restore_transcript_file(self, name: str, data: bytes) -> None:
+        target = self.transcript_dir / name
+        if name.endswith('.json'):
+            # Manifests record where their transcript lives; point them at this node's transcript directory.
+            manifest = json.loads(data)
+            if manifest.get('transcript_path'):
+                manifest['transcript_path'] = str(self.transcript_dir / Path(manifest['transcript_path']).name)
+            data = json.dumps(manifest, indent=2).encode('utf-8')
+        tmp_path = target.with_name(f'{name}.tmp')
+        tmp_path.write_bytes(data)
+        tmp_path.replace(target)
+        if name.endswith('.json') and manifest.get('video_id'):
+            # The index backfills only once per node, so imported videos must be added to it here.
+            self.manifest_index.record(manifest)
+
+
+def main() -> None:
+    from app.core.config import get_settings
+    from app.core.logging import setup_logging
+    from app.utils.dependencies import _embedding_model_name
+
+    parser = argparse.ArgumentParser(description='Export or import a vector-store snapshot.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export')
+    export_parser.add_argument('archive', type=Path)
+    export_parser.add_argument('--collection', action='append', dest='collections', help='Repeatable; default all')
+    import_parser = subparsers.add_parser('import')
+    import_parser.add_argument('archive', type=Path)
+    import_parser.add_argument('--force', action='store_true', help='Skip embedding model and dimension checks')
+    args = parser.parse_args()
+
+    settings = get_settings()
+    setup_logging(settings.log_level)
+    # Opens the database directly: stop the API workers (or the Milvus owner) first when using Milvus Lite.
+    service = SnapshotService(
+        MilvusService(
+            uri=settings.milvus_uri,
+            default_collection=settings.milvus_default_collection,
+            dimension=settings.milvus_dimension,
+            top_k=settings.milvus_top_k,
+            create_collection_per_video=settings.milvus_create_collection_per_video,
+        ),
+        settings.transcript_dir,
+        _embedding_model_name(settings),
+    )
+    if args.command == 'export':
+        manifest = service.export(args.archive, args.collections)
+    else:
+        manifest = service.import_(args.archive, force=args.force)
+    summary = {entry['name']: entry['rows'] for entry in manifest['collections']}
+    print(json.dumps({'command': args.command, 'archive': str(args.archive), 'collections': summary}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
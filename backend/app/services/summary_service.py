@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Sequence
+
+from openai import OpenAI
+
+from app.core.executors import ExecutorPool
+from app.core.metrics import LLM_REQUEST_SECONDS, LLM_TOKENS
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+TimedText = tuple[str, float | None, float | None]
+
+_SECTION_PROMPT = (
+    'Summarize this part of a video transcript. Reply in exactly this form:\n'
+    'TITLE: <a short topic title>\n'
+    'SUMMARY: <two to four sentences covering the main points>\n\n'
+    'Transcript:\n{text}'
+)
+_MERGE_PROMPT = (
+    'These are consecutive section summaries of the video "{title}". '
+    'Write one summary of {length} that covers all of them, in order, without adding facts.\n\n{text}'
+)
+_BACKFILL_MARKER = '.backfilled'
+_FIELD_PATTERN = re.compile(r'^\s*(TITLE|SUMMARY)\s*:\s*(.*)$', re.IGNORECASE)
+
+
+def transcript_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+def format_timestamp(seconds: float | None) -> str:
+    if seconds is None:
+        return ''
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}:{minutes:02d}:{secs:02d}' if hours else f'{minutes}:{secs:02d}'
+
+
+class ManifestIndex:
+    """Ingest manifests grouped by collection, so chat can find a collection's videos without reading every manifest.
+
+    Each indexed video has `<transcript_dir>/collections/<collection>/<video_id>.json` holding its id, title and
+    summary. Reading a collection lists one directory, cached until that directory's mtime changes.
+    """
+
+    def __init__(self, transcript_dir: Path) -> None:
+        self.transcript_dir = transcript_dir
+        self.root = transcript_dir / 'collections'
+        self._cache: dict[str, tuple[int, dict[str, dict]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, manifest: dict[str, Any]) -> None:
+        video_id, collection_name = str(manifest['video_id']), str(manifest.get('collection', ''))
+        if not collection_name:
+            return
+        entry = {key: manifest[key] for key in ('video_id', 'title', 'collection', 'summary') if key in manifest}
+        directory = self.root / collection_name
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = directory / f'{video_id}.json.tmp'
+        tmp_path.write_text(json.dumps(entry), encoding='utf-8')
+        os.replace(tmp_path, directory / f'{video_id}.json')
+        # A video re-indexed into another collection no longer belongs to the old one.
+        for stale in self.root.glob(f'*/{video_id}.json'):
+            if stale.parent != directory:
+                stale.unlink(missing_ok=True)
+
+    def drop(self, collection_name: str) -> None:
+        """Forget every video of a dropped collection, so its summaries cannot answer for a new one of the same name."""
+
+        shutil.rmtree(self.root / collection_name, ignore_errors=True)
+        with self._lock:
+            self._cache.pop(collection_name, None)
+
+    def entries(self, collection_name: str) -> dict[str, dict]:
+        if not (self.root / _BACKFILL_MARKER).exists():
+            self._backfill()
+        directory = self.root / collection_name
+        try:
+            mtime = directory.stat().st_mtime_ns
+        except OSError:
+            return {}
+        with self._lock:
+            cached = self._cache.get(collection_name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        entries: dict[str, dict] = {}
+        for path in directory.glob('*.json'):
+            try:
+                entry = json.loads(path.read_text(encoding='utf-8'))
+            except (json.JSONDecodeError, OSError):
+                continue
+            entries[str(entry.get('video_id', path.stem))] = entry
+        with self._lock:
+            self._cache[collection_name] = (mtime, entries)
+        return entries
+
+    def _backfill(self) -> None:
+        # One-off for manifests written before the index existed; re-recording an indexed video is harmless.
+        for path in self.transcript_dir.glob('*.json'):
+            if path.name.endswith('.checkpoint.json'):
+                continue
+            try:
+                manifest = json.loads(path.read_text(encoding='utf-8'))
+            except (json.JSONDecodeError, OSError):
+                continue
+            if isinstance(manifest, dict) and manifest.get('video_id') and manifest.get('collection'):
+                self.record(manifest)
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / _BACKFILL_MARKER).touch()
+
+
+class SummaryService:
+    """Hierarchical map-reduce summaries of whole transcripts, computed at ingest and read back for chat.
+
+    The map step summarizes consecutive windows of about `section_chars` characters into an outline entry each;
+    reduce steps merge `fan_in` summaries at a time until one remains, so no prompt grows with video length.
+    """
+
+    def __init__(
+        self,
+        openai_client: OpenAI,
+        chat_model: str,
+        transcript_dir: Path,
+        section_chars: int = 6000,
+        fan_in: int = 8,
+        max_concurrency: int = 4,
+        executor: ExecutorPool | None = None,
+    ) -> None:
+        self.openai_client = openai_client
+        self.chat_model = chat_model
+        self.transcript_dir = transcript_dir
+        self.section_chars = max(1000, section_chars)
+        self.fan_in = max(2, fan_in)
+        # Its own limit rather than chat's LLM gate, so summarizing a long video cannot push chat requests to 429.
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self.executor = executor
+        self.index = ManifestIndex(transcript_dir)
+
+    def summarize(self, title: str, chunks: Sequence[TimedText]) -> dict[str, Any]:
+        sections = self._sections(chunks)
+        with tracer.span('summary.map', sections=len(sections)):
+            outline = self._map(lambda section: self._summarize_section(*section), sections)
+
+        summaries = [entry['summary'] for entry in outline]
+        level = 0
+        while len(summaries) > 1:
+            level += 1
+            groups = [summaries[start:start + self.fan_in] for start in range(0, len(summaries), self.fan_in)]
+            final = len(groups) == 1
+            with tracer.span('summary.reduce', level=level, groups=len(groups)):
+                summaries = self._map(lambda group: self._merge(title, group, final), groups)
+
+        return {
+            'summary': summaries[0] if summaries else '',
+            'outline': outline,
+            'model': self.chat_model,
+        }
+
+    def summaries_for(self, collection_name: str, video_id: str | None = None) -> list[dict[str, Any]]:
+        """Summarized manifests that can answer an overview question about `collection_name`.
+
+        With a `video_id`, only that video's. Without one, only when the collection holds a single video: in a
+        shared collection the question does not say which video it means, so the caller falls back to retrieval.
+        """
+
+        entries = self.index.entries(collection_name)
+        if video_id is not None:
+            selected = [entries[video_id]] if video_id in entries else []
+        elif len(entries) == 1:
+            selected = list(entries.values())
+        else:
+            selected = []
+        return [entry for entry in selected if (entry.get('summary') or {}).get('summary')]
+
+    @staticmethod
+    def render(manifest: dict[str, Any]) -> str:
+        summary = manifest['summary']
+        lines = [f"Video: {manifest.get('title', manifest.get('video_id', ''))}", f"Summary: {summary['summary']}"]
+        if summary.get('outline'):
+            lines.append('Outline:')
+            for entry in summary['outline']:
+                stamp = format_timestamp(entry.get('start_s'))
+                prefix = f'[{stamp}] ' if stamp else ''
+                lines.append(f"- {prefix}{entry['title']}: {entry['summary']}")
+        return '\n'.join(lines)
+
+    def _sections(self, chunks: Sequence[TimedText]) -> list[TimedText]:
+        sections: list[TimedText] = []
+        parts: list[str] = []
+        size = 0
+        start_s = end_s = None
+        for text, chunk_start, chunk_end in chunks:
+            if parts and size + len(text) > self.section_chars:
+                sections.append(('\n'.join(parts), start_s, end_s))
+                parts, size = [], 0
+            if not parts:
+                start_s = chunk_start
+            parts.append(text)
+            size += len(text) + 1
+            end_s = chunk_end
+        if parts:
+            sections.append(('\n'.join(parts), start_s, end_s))
+        return sections
+
+    def _map(self, fn, items: list) -> list:
+        if self.executor is None or len(items) < 2:
+            return [fn(item) for item in items]
+        futures = [self.executor.submit(fn, item) for item in items]
+        return [future.result() for future in futures]
+
+    def _summarize_section(self, text: str, start_s: float | None, end_s: float | None) -> dict[str, Any]:
+        reply = self._complete(_SECTION_PROMPT.format(text=text))
+        fields = {'TITLE': '', 'SUMMARY': ''}
+        current = None
+        for line in reply.splitlines():
+            match = _FIELD_PATTERN.match(line)
+            if match:
+                current = match.group(1).upper()
+                fields[current] = match.group(2).strip()
+            elif current and line.strip():
+                fields[current] = f'{fields[current]} {line.strip()}'.strip()
+        return {
+            'title': fields['TITLE'] or text[:60].strip(),
+            'summary': fields['SUMMARY'] or reply.strip(),
+            'start_s': round(start_s, 2) if start_s is not None else None,
+            'end_s': round(end_s, 2) if end_s is not None else None,
+        }
+
+    def _merge(self, title: str, summaries: list[str], final: bool) -> str:
+        length = 'one or two paragraphs' if final else 'four to six sentences'
+        text = '\n\n'.join(f'{index + 1}. {summary}' for index, summary in enumerate(summaries))
+        return self._complete(_MERGE_PROMPT.format(title=title, length=length, text=text)).strip()
+
+    def _complete(self, prompt: str) -> str:
+        with self._slots:
+            with tracer.span('summary.llm', model=self.chat_model), LLM_REQUEST_SECONDS.time(mode='summary'):
+                response = self.openai_client.chat.completions.create(
+                    model=self.chat_model,
+                    messages=[
+                        {'role': 'system', 'content': 'You summarize video transcripts faithfully and concisely.'},
+                        {'role': 'user', 'content': prompt},
+                    ],
+                    temperature=0.0,
+                )
+        if response.usage:
+            LLM_TOKENS.inc(int(response.usage.total_tokens), mode='summary')
+        return response.choices[0].message.content or ''
@@ -1,12 +1,69 @@
 from __future__ import annotations
 
 import logging
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from faster_whisper import WhisperModel
+from app.core.executors import ExecutorPool
+from app.services.checkpoint_service import SegmentLog
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
 
 logger = logging.getLogger(__name__)
 
+SAMPLE_RATE = 16000
+
+
+def decode_audio_from(path: str, offset_s: float, sampling_rate: int = SAMPLE_RATE) -> Any:
+    """Decode mono float32 audio from `offset_s` to the end, the way faster-whisper's `decode_audio` does.
+
+    The container is seeked to the offset first, so the audio before it is not decoded again.
+    """
+
+    import av
+    import numpy as np
+
+    resampler = av.audio.resampler.AudioResampler(format='s16', layout='mono', rate=sampling_rate)
+    parts: list[Any] = []
+    first_time: float | None = None
+    with av.open(path, mode='r', metadata_errors='ignore') as container:
+        stream = container.streams.audio[0]
+        try:
+            # Lands on the last seek point at or before the offset; the samples before it are trimmed below.
+            container.seek(int(offset_s / stream.time_base), stream=stream)
+        except (av.error.FFmpegError, TypeError, ZeroDivisionError):
+            container.seek(0)
+        frames = container.decode(stream)
+        while True:
+            try:
+                frame = next(frames)
+            except StopIteration:
+                break
+            except av.error.InvalidDataError:
+                continue
+            if first_time is None:
+                first_time = float(frame.time or 0.0)
+            parts.extend(resampled.to_ndarray().reshape(-1) for resampled in resampler.resample(frame))
+        parts.extend(resampled.to_ndarray().reshape(-1) for resampled in resampler.resample(None))
+
+    audio = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int16)
+    skip = max(0, int(round((offset_s - (first_time or 0.0)) * sampling_rate)))
+    return audio[skip:].astype(np.float32) / 32768.0
+
+
+@dataclass
+class TranscriptionResult:
+    text: str
+    duration_s: float
+    language: str | None
+    segment_count: int
+    resumed_from_s: float = 0.0
+    # (start_s, end_s, text) for every non-empty segment, including ones recovered from the segment log.
+    segments: list[tuple[float, float, str]] = field(default_factory=list)
+
 
 class TranscriptionService:
     def __init__(
@@ -16,36 +73,136 @@ class TranscriptionService:
         compute_type: str,
         beam_size: int = 1,
         vad_filter: bool = True,
+        batch_size: int = 0,
+        cpu_threads: int = 0,
+        num_workers: int = 1,
+        executor: ExecutorPool | None = None,
     ) -> None:
-        self.model = WhisperModel(model_name, device=device, compute_type=compute_type)
+        self.model_name = model_name
+        self.device = device
+        self.compute_type = compute_type
         self.beam_size = beam_size
         self.vad_filter = vad_filter
+        self.batch_size = batch_size
+        self.cpu_threads = cpu_threads
+        self.num_workers = max(1, num_workers)
+        self.executor = executor
+        self._model: WhisperModel | None = None
+        self._pipeline = None
+        self._model_lock = threading.Lock()
 
-    def transcribe_audio(self, audio_path: Path) -> str:
-        segments, info = self.model.transcribe(
-            str(audio_path),
+    @property
+    def model(self) -> WhisperModel:
+        # Loaded on first use; with a process pool the parent never loads whisper at all.
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from faster_whisper import WhisperModel
+
+                    self._model = WhisperModel(
+                        self.model_name,
+                        device=self.device,
+                        compute_type=self.compute_type,
+                        cpu_threads=self.cpu_threads,
+                        num_workers=self.num_workers,
+                    )
+        return self._model
+
+    def _run_model(self, audio: Any):
+        if self.batch_size <= 0:
+            return self.model.transcribe(audio, beam_size=self.beam_size, vad_filter=self.vad_filter)
+        if self._pipeline is None:
+            model = self.model
+            with self._model_lock:
+                if self._pipeline is None:
+                    from faster_whisper import BatchedInferencePipeline
+
+                    self._pipeline = BatchedInferencePipeline(model=model)
+        # Cuts the audio into ~30s speech windows (VAD) and decodes `batch_size` of them per encoder/decoder pass.
+        return self._pipeline.transcribe(
+            audio,
+            batch_size=self.batch_size,
             beam_size=self.beam_size,
             vad_filter=self.vad_filter,
         )
 
-        chunk_texts: list[str] = []
-        segment_count = 0
-        for segment in segments:
-            text = segment.text.strip()
-            if text:
-                chunk_texts.append(text)
-            segment_count += 1
-            if segment_count % 20 == 0:
-                logger.info(
-                    'Transcription progress',
-                    extra={
-                        'audio_path': str(audio_path),
-                        'segments_processed': segment_count,
-                        'last_time_s': round(float(segment.end), 2),
-                    },
-                )
-
-        text = ' '.join(chunk_texts)
+    def warmup(self) -> None:
+        if self.executor is not None:
+            # Workers warm their model in the pool initializer, before they take any task.
+            self.executor.wait_for_workers()
+            return
+
+        import numpy as np
+
+        # One second of silence with VAD off forces a full encoder/decoder pass.
+        segments, _ = self.model.transcribe(np.zeros(16000, dtype=np.float32), beam_size=1, vad_filter=False)
+        list(segments)
+
+    def transcribe_audio(self, audio_path: Path) -> str:
+        return self.transcribe(audio_path).text
+
+    def transcribe(self, audio_path: Path, segment_log: Path | None = None) -> TranscriptionResult:
+        if self.executor is not None:
+            from app.services import worker_tasks
+
+            return self.executor.call(
+                worker_tasks.transcribe,
+                str(audio_path),
+                str(segment_log) if segment_log else None,
+            )
+
+        log = SegmentLog(segment_log) if segment_log else None
+        previous = log.read() if log else []
+        if log and log.path.exists():
+            # Even with nothing readable, a torn first line must go, or the next append would extend it.
+            log.truncate_to(previous)
+        offset = float(previous[-1]['end']) if previous else 0.0
+
+        audio: Any = str(audio_path)
+        if offset > 0:
+            # Resume after the last durable segment; only the remaining audio is decoded and held in memory.
+            audio = decode_audio_from(audio, offset)
+            logger.info(
+                'Resuming transcription',
+                extra={'audio_path': str(audio_path), 'from_s': round(offset, 2), 'segments': len(previous)},
+            )
+
+        timed_segments = [
+            (float(segment['start']), float(segment['end']), segment['text'])
+            for segment in previous
+            if segment.get('text')
+        ]
+        segment_count = len(previous)
+        duration_s = offset
+        language = None
+        try:
+            # Under 0.1s of audio left means the log already covers the whole file.
+            if isinstance(audio, str) or len(audio) >= SAMPLE_RATE // 10:
+                segments, info = self._run_model(audio)
+                duration_s += float(getattr(info, 'duration', 0.0) or 0.0)
+                language = getattr(info, 'language', None)
+
+                for segment in segments:
+                    text = segment.text.strip()
+                    if text:
+                        timed_segments.append((offset + float(segment.start), offset + float(segment.end), text))
+                    if log:
+                        log.append(offset + float(segment.start), offset + float(segment.end), text)
+                    segment_count += 1
+                    if segment_count % 20 == 0:
+                        logger.info(
+                            'Transcription progress',
+                            extra={
+                                'audio_path': str(audio_path),
+                                'segments_processed': segment_count,
+                                'last_time_s': round(offset + float(segment.end), 2),
+                            },
+                        )
+        finally:
+            if log:
+                log.close()
+
+        text = ' '.join(segment[2] for segment in timed_segments)
 
         if not text:
             raise ValueError('Transcription returned empty text')
@@ -56,7 +213,14 @@ class TranscriptionService:
                 'audio_path': str(audio_path),
                 'chars': len(text),
                 'segments': segment_count,
-                'language': getattr(info, 'language', None),
+                'language': language,
             },
         )
-        return text
+        return TranscriptionResult(
+            text=text,
+            duration_s=duration_s,
+            language=language,
+            segment_count=segment_count,
+            resumed_from_s=offset,
+            segments=timed_segments,
+        )
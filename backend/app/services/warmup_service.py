@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupStep:
+    name: str
+    status: str = 'pending'
+    duration_s: float = 0.0
+    error: str | None = None
+    attempts: int = 0
+
+
+@dataclass
+class WarmupState:
+    steps: dict[str, WarmupStep] = field(default_factory=dict)
+    started: bool = False
+    finished: bool = False
+
+    @property
+    def ready(self) -> bool:
+        return self.finished and all(step.status == 'done' for step in self.steps.values())
+
+
+class WarmupService:
+    """Runs startup preloading and tracks readiness; `/ready` reports `state.ready`.
+
+    Failed steps are retried with exponential backoff until they succeed or `stop()` is called, so a dependency that
+    comes up after this worker (e.g. the Milvus owner process) does not leave it unready for good.
+    """
+
+    def __init__(
+        self,
+        steps: list[tuple[str, Callable[[], None]]],
+        retry_backoff_s: float = 1.0,
+        retry_max_backoff_s: float = 30.0,
+    ) -> None:
+        self._steps = steps
+        self.retry_backoff_s = max(0.1, retry_backoff_s)
+        self.retry_max_backoff_s = max(self.retry_backoff_s, retry_max_backoff_s)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.state = WarmupState(steps={name: WarmupStep(name) for name, _ in steps})
+
+    def mark_ready(self) -> None:
+        with self._lock:
+            self.state.started = True
+            self.state.finished = True
+            for step in self.state.steps.values():
+                step.status = 'done'
+
+    def run(self) -> bool:
+        with self._lock:
+            if self.state.started:
+                return self.state.ready
+            self.state.started = True
+
+        pending = list(self._steps)
+        backoff = self.retry_backoff_s
+        while True:
+            pending = [(name, action) for name, action in pending if not self._run_step(name, action)]
+            self.state.finished = True
+            if not pending or self._stopped.wait(backoff):
+                break
+            logger.warning(
+                'Retrying failed warmup steps',
+                extra={'steps': [name for name, _ in pending], 'backoff_s': backoff},
+            )
+            backoff = min(backoff * 2, self.retry_max_backoff_s)
+        return self.state.ready
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run_step(self, name: str, action: Callable[[], None]) -> bool:
+        step = self.state.steps[name]
+        step.status = 'running'
+        step.attempts += 1
+        started = time.perf_counter()
+        try:
+            action()
+            step.status = 'done'
+            step.error = None
+        except Exception as exc:  # noqa: BLE001
+            step.status = 'failed'
+            step.error = str(exc)
+            logger.exception('Warmup step failed: %s', name)
+        step.duration_s = round(time.perf_counter() - started, 3)
+        logger.info('Warmup step finished', extra={'step': name, 'status': step.status, 'duration_s': step.duration_s})
+        return step.status == 'done'
+
+    def snapshot(self) -> dict:
+        return {
+            'ready': self.state.ready,
+            'finished': self.state.finished,
+            'steps': {
+                name: {
+                    'status': step.status,
+                    'duration_s': step.duration_s,
+                    'error': step.error,
+                    'attempts': step.attempts,
+                }
+                for name, step in self.state.steps.items()
+            },
+        }
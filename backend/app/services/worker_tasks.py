@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+# Entry points executed inside process-pool workers. Each worker builds its own model once
+# in the pool initializer and reuses it for every task.
+
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+os.environ.setdefault('KMP_DUPLICATE_LIB_OK', 'TRUE')
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+from app.core.logging import setup_logging
+
+if TYPE_CHECKING:
+    from app.services.transcription_service import TranscriptionResult
+
+_transcription_service = None
+_embedding_service = None
+
+
+def init_transcription_worker(log_level: str, service_kwargs: dict) -> None:
+    global _transcription_service
+    from app.services.transcription_service import TranscriptionService
+
+    setup_logging(log_level)
+    _transcription_service = TranscriptionService(**service_kwargs)
+    # In the initializer rather than a task, so every worker (including one started after a crash) is warm before
+    # it takes any work; a warmup task could be picked up twice by one fast worker and never reach another.
+    _transcription_service.warmup()
+
+
+def transcribe(audio_path: str, segment_log: str | None = None) -> TranscriptionResult:
+    return _transcription_service.transcribe(Path(audio_path), Path(segment_log) if segment_log else None)
+
+
+def init_embedding_worker(log_level: str, service_kwargs: dict) -> None:
+    global _embedding_service
+    from app.services.embedding_service import EmbeddingService
+
+    setup_logging(log_level)
+    _embedding_service = EmbeddingService(**service_kwargs)
+    _embedding_service.warmup()
+
+
+def embed_batch(texts: list[str]) -> list[list[float]]:
+    return _embedding_service.embed_batch(texts)
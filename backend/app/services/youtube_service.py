@@ -5,9 +5,6 @@ from dataclasses import dataclass
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
-from yt_dlp import YoutubeDL
-from yt_dlp.utils import DownloadError
-
 logger = logging.getLogger(__name__)
 
 
@@ -40,7 +37,50 @@ class YouTubeService:
 
         return None
 
+    def expand_urls(self, url: str, limit: int | None = None) -> list[str]:
+        """Video URLs behind a playlist or channel URL; a single video URL is returned unchanged.
+
+        Expansion stops once `limit` videos are found, so an oversized channel costs no more extraction than needed.
+        """
+
+        if self.extract_video_id(url) and 'list=' not in url:
+            return [url]
+
+        urls: list[str] = []
+        seen = {url}
+        pending = [self._extract_flat(url)]
+        while pending and (limit is None or len(urls) < limit):
+            entry = pending.pop(0)
+            if not entry:
+                continue
+            if entry.get('entries') is not None:
+                # Depth first, so a tab is listed only once the videos before it fall short of `limit`.
+                pending[:0] = entry['entries']
+                continue
+            video_id = entry.get('id')
+            if entry.get('ie_key', 'Youtube') == 'Youtube' and video_id:
+                urls.append(f'https://www.youtube.com/watch?v={video_id}')
+            elif entry.get('_type') in ('url', 'playlist') and entry.get('url') and entry['url'] not in seen:
+                # Flat extraction leaves a channel's tabs (videos, shorts, ...) and nested playlists unresolved.
+                seen.add(entry['url'])
+                pending.insert(0, self._extract_flat(entry['url']))
+        if limit is not None:
+            urls = urls[:limit]
+        logger.info('Expanded URL', extra={'url': url, 'videos': len(urls)})
+        return urls
+
+    def _extract_flat(self, url: str) -> dict:
+        from yt_dlp import YoutubeDL
+
+        # Flat extraction lists entries without resolving formats for every video.
+        with YoutubeDL({'quiet': True, 'extract_flat': 'in_playlist', 'skip_download': True}) as ydl:
+            info = ydl.extract_info(url, download=False)
+        return info if info.get('entries') is not None else {'entries': [info]}
+
     def download_video(self, youtube_url: str) -> DownloadedVideo:
+        from yt_dlp import YoutubeDL
+        from yt_dlp.utils import DownloadError
+
         format_candidates = [
             # Prefer progressive streams first (no ffmpeg merge needed).
             'best[ext=mp4][acodec!=none][vcodec!=none]',
@@ -2,17 +2,30 @@ from __future__ import annotations
 
 from functools import lru_cache
 import logging
+from pathlib import Path
 
 from openai import OpenAI
 
+from app.core.admission import AdmissionController
 from app.core.config import Settings, get_settings
+from app.core.executors import ExecutorPool, ExecutorRegistry
+from app.core.profiling import ProcessSampler
 from app.services.audio_service import AudioService
+from app.services.batch_service import BatchIngestionService
+from app.services.dedup_service import DedupService
 from app.services.embedding_service import EmbeddingService
+from app.services.media_upload_service import MediaUploadService
+from app.services.prefetch_service import PrefetchCache
+from app.services.session_service import SessionStore
+from app.services.milvus_ipc import RemoteMilvusService
 from app.services.milvus_service import MilvusService
 from app.services.pipeline_service import PipelineService
 from app.services.rag_service import RagService
+from app.services.summary_service import SummaryService
 from app.services.transcription_service import TranscriptionService
+from app.services.warmup_service import WarmupService
 from app.services.youtube_service import YouTubeService
+from app.services import worker_tasks
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +43,11 @@ def get_openai_client() -> OpenAI:
 
 
 @lru_cache(maxsize=1)
-def get_embedding_service() -> EmbeddingService:
-    settings = get_settings()
+def get_admission_controller() -> AdmissionController:
+    return AdmissionController.from_settings(get_settings())
+
+
+def _embedding_model_name(settings: Settings) -> str:
     model_name = settings.embedding_model
     if model_name.startswith('text-embedding-'):
         logger.warning(
@@ -39,17 +55,83 @@ def get_embedding_service() -> EmbeddingService:
             model_name,
         )
         model_name = 'sentence-transformers/all-MiniLM-L6-v2'
-    return EmbeddingService(model_name, settings.embedding_device)
+    return model_name
+
+
+@lru_cache(maxsize=1)
+def get_executor_registry() -> ExecutorRegistry:
+    settings = get_settings()
+    registry = ExecutorRegistry()
+    registry.register(ExecutorPool.threads('io', max(1, settings.io_pool_threads)))
+    if settings.serves_chat and settings.query_embedding_threads > 0:
+        registry.register(ExecutorPool.threads('query_embedding', settings.query_embedding_threads))
+    if settings.serves_ingest and settings.transcription_process_workers > 0:
+        registry.register(
+            ExecutorPool.processes(
+                'transcription',
+                settings.transcription_process_workers,
+                initializer=worker_tasks.init_transcription_worker,
+                initargs=(settings.log_level, _transcription_kwargs(settings)),
+            )
+        )
+    if settings.serves_ingest and settings.ingest_embedding_process_workers > 0:
+        registry.register(
+            ExecutorPool.processes(
+                'ingest_embedding',
+                settings.ingest_embedding_process_workers,
+                initializer=worker_tasks.init_embedding_worker,
+                initargs=(settings.log_level, _embedding_kwargs(settings)),
+            )
+        )
+    if settings.serves_ingest and settings.summary_enabled:
+        registry.register(ExecutorPool.threads('summary', max(1, settings.summary_concurrency)))
+    if settings.serves_ingest:
+        for stage, size in _batch_stage_concurrency(settings).items():
+            registry.register(ExecutorPool.threads(f'batch_{stage}', max(1, size)))
+    return registry
+
+
+@lru_cache(maxsize=1)
+def get_process_sampler() -> ProcessSampler:
+    return ProcessSampler(get_settings().profiling_dir)
+
+
+def get_io_pool() -> ExecutorPool:
+    return get_executor_registry().pool('io')
+
+
+@lru_cache(maxsize=1)
+def get_embedding_service() -> EmbeddingService:
+    settings = get_settings()
+    executors = get_executor_registry()
+    return EmbeddingService(
+        **_embedding_kwargs(settings),
+        admission_gate=get_admission_controller().gate('embedding'),
+        query_executor=executors.pool('query_embedding'),
+        batch_executor=executors.pool('ingest_embedding'),
+    )
 
 
 @lru_cache(maxsize=1)
 def get_milvus_service() -> MilvusService:
     settings = get_settings()
+    if settings.milvus_owner_socket:
+        return RemoteMilvusService(
+            socket_path=Path(settings.milvus_owner_socket),
+            default_collection=settings.milvus_default_collection,
+            dimension=settings.milvus_dimension,
+            top_k=settings.milvus_top_k,
+            create_collection_per_video=settings.milvus_create_collection_per_video,
+            authkey=settings.milvus_owner_authkey.encode() or None,
+            timeout_s=settings.milvus_owner_timeout_s,
+            slow_timeout_s=settings.milvus_owner_slow_timeout_s or None,
+        )
     return MilvusService(
         uri=settings.milvus_uri,
         default_collection=settings.milvus_default_collection,
         dimension=settings.milvus_dimension,
         top_k=settings.milvus_top_k,
+        create_collection_per_video=settings.milvus_create_collection_per_video,
     )
 
 
@@ -64,6 +146,46 @@ def get_rag_service() -> RagService:
         chunk_size=settings.chunk_size,
         chunk_overlap=settings.chunk_overlap,
         max_context_chunks=settings.max_context_chunks,
+        llm_gate=get_admission_controller().gate('llm'),
+        neighbor_window=settings.context_neighbor_window,
+        summary_service=get_summary_service(),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_session_store() -> SessionStore:
+    settings = get_settings()
+    return SessionStore(
+        max_sessions=settings.chat_sessions_max,
+        ttl_s=settings.chat_session_ttl_s,
+        max_turns=settings.chat_session_max_turns,
+        max_chunks=settings.chat_session_max_chunks,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_prefetch_cache() -> PrefetchCache:
+    settings = get_settings()
+    return PrefetchCache(
+        debounce_s=settings.prefetch_debounce_s,
+        ttl_s=settings.prefetch_ttl_s,
+        min_similarity=settings.prefetch_min_similarity,
+        max_clients=settings.prefetch_max_clients,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_summary_service() -> SummaryService:
+    # Chat workers only read summaries from manifests; the pool exists only where ingestion computes them.
+    settings = get_settings()
+    return SummaryService(
+        openai_client=get_openai_client(),
+        chat_model=settings.chat_model,
+        transcript_dir=settings.transcript_dir,
+        section_chars=settings.summary_section_chars,
+        fan_in=settings.summary_fan_in,
+        max_concurrency=settings.summary_concurrency,
+        executor=get_executor_registry().pool('summary'),
     )
 
 
@@ -74,11 +196,8 @@ def get_pipeline_service() -> PipelineService:
         youtube_service=YouTubeService(settings.upload_dir),
         audio_service=AudioService(settings.audio_dir),
         transcription_service=TranscriptionService(
-            model_name=settings.whisper_model,
-            device=settings.whisper_device,
-            compute_type=settings.whisper_compute_type,
-            beam_size=settings.whisper_beam_size,
-            vad_filter=settings.whisper_vad_filter,
+            **_transcription_kwargs(settings),
+            executor=get_executor_registry().pool('transcription'),
         ),
         embedding_service=get_embedding_service(),
         milvus_service=get_milvus_service(),
@@ -86,8 +205,100 @@ def get_pipeline_service() -> PipelineService:
         transcript_dir=settings.transcript_dir,
         create_collection_per_video=settings.milvus_create_collection_per_video,
         default_collection=settings.milvus_default_collection,
+        checkpoints_enabled=settings.ingest_checkpoints_enabled,
+        insert_batch_size=settings.ingest_insert_batch_size,
+        summary_service=get_summary_service() if settings.summary_enabled else None,
+        dedup_service=get_dedup_service() if settings.chunk_dedup_enabled else None,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_media_upload_service() -> MediaUploadService:
+    settings = get_settings()
+    return MediaUploadService(
+        settings.upload_dir,
+        chunk_bytes=settings.media_upload_chunk_bytes,
+        max_bytes=settings.media_upload_max_bytes,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_dedup_service() -> DedupService:
+    settings = get_settings()
+    return DedupService(
+        threshold=settings.chunk_dedup_threshold,
+        num_perm=settings.chunk_dedup_num_perm,
+        shingle_words=settings.chunk_dedup_shingle_words,
     )
 
 
+@lru_cache(maxsize=1)
+def get_batch_ingestion_service() -> BatchIngestionService:
+    settings = get_settings()
+    registry = get_executor_registry()
+    return BatchIngestionService(
+        pipeline_service=get_pipeline_service(),
+        stage_pools={stage: registry.pool(f'batch_{stage}') for stage in _batch_stage_concurrency(settings)},
+        max_in_flight=settings.batch_max_in_flight,
+        max_items=settings.batch_max_items,
+        max_active=settings.batch_max_active,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_warmup_service() -> WarmupService:
+    settings = get_settings()
+
+    def _warm_milvus() -> None:
+        milvus_service = get_milvus_service()
+        for collection_name in settings.warmup_collection_list:
+            if not milvus_service.load_collection(collection_name):
+                logger.warning('Warmup collection not found: %s', collection_name)
+
+    steps = [('milvus', _warm_milvus)]
+    if settings.serves_chat:
+        steps.append(('query_embedding', lambda: get_embedding_service().warmup()))
+        steps.append(('rag', get_rag_service))
+    if settings.serves_ingest:
+        steps.append(('ingest_embedding', lambda: get_embedding_service().warmup(batch=True)))
+        steps.append(('transcription', lambda: get_pipeline_service().transcription_service.warmup()))
+    return WarmupService(steps, settings.warmup_retry_backoff_s, settings.warmup_retry_max_backoff_s)
+
+
+def _embedding_kwargs(settings: Settings) -> dict:
+    return {
+        'model_name': _embedding_model_name(settings),
+        'device': settings.embedding_device,
+        'backend': settings.embedding_backend,
+        'onnx_dir': settings.embedding_onnx_dir,
+        'onnx_threads': settings.embedding_onnx_threads,
+        'batch_tokens': settings.embedding_batch_tokens,
+    }
+
+
+def _transcription_kwargs(settings: Settings) -> dict:
+    return {
+        'model_name': settings.whisper_model,
+        'device': settings.whisper_device,
+        'compute_type': settings.whisper_compute_type,
+        'beam_size': settings.whisper_beam_size,
+        'vad_filter': settings.whisper_vad_filter,
+        'batch_size': settings.whisper_batch_size,
+        'cpu_threads': settings.whisper_cpu_threads,
+        'num_workers': settings.whisper_num_workers,
+    }
+
+
+def _batch_stage_concurrency(settings: Settings) -> dict[str, int]:
+    # Keys match PipelineService.stages().
+    return {
+        'download': settings.batch_download_concurrency,
+        'audio_extraction': settings.batch_audio_concurrency,
+        'transcription': settings.batch_transcription_concurrency,
+        'summarization': settings.batch_summarization_concurrency,
+        'indexing': settings.batch_indexing_concurrency,
+    }
+
+
 def get_app_settings() -> Settings:
     return get_settings()
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.fakes import synthetic_questions, synthetic_transcript
+from benchmarks.report import compare_reports, environment, latency_summary, write_report
+
+BACKENDS = ('onnx', 'torch')
+
+# Cold start in a fresh interpreter: import, model load and first encode, with torch's presence recorded.
+_COLD_PROBE = '''
+import json, sys, time
+from pathlib import Path
+started = time.perf_counter()
+from app.services.embedding_service import EmbeddingService
+service = EmbeddingService(sys.argv[1], 'cpu', backend=sys.argv[2], onnx_dir=Path(sys.argv[3]))
+service.embed_text('warmup')
+print(json.dumps({'cold_start_s': time.perf_counter() - started, 'imports_torch': 'torch' in sys.modules}))
+'''
+
+
+def _service(args: argparse.Namespace, backend: str):
+    from app.services.embedding_service import EmbeddingService
+
+    return EmbeddingService(
+        args.model,
+        'cpu',
+        backend=backend,
+        onnx_dir=args.onnx_dir,
+        onnx_threads=args.onnx_threads,
+    )
+
+
+def _cold_start(args: argparse.Namespace, backend: str) -> dict:
+    completed = subprocess.run(
+        [sys.executable, '-c', _COLD_PROBE, args.model, backend, str(args.onnx_dir)],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'HF_HUB_OFFLINE': '1'},
+        check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['cold_start_s'] = round(result['cold_start_s'], 3)
+    return result
+
+
+def bench_backend(args: argparse.Namespace, backend: str, chunks: list[str], questions: list[str]) -> dict:
+    service = _service(args, backend)
+    service.embed_text('warmup')
+
+    latencies: list[float] = []
+    for index in range(args.iterations):
+        started = time.perf_counter()
+        service.embed_text(questions[index % len(questions)])
+        latencies.append(time.perf_counter() - started)
+
+    batch_seconds: list[float] = []
+    for _ in range(max(1, args.iterations // 10)):
+        started = time.perf_counter()
+        service.embed_batch(chunks)
+        batch_seconds.append(time.perf_counter() - started)
+    best = min(batch_seconds)
+    return {
+        'embed_text': latency_summary(latencies),
+        'embed_batch': {
+            'chunks': len(chunks),
+            'best_s': round(best, 3),
+            'chunks_per_s': round(len(chunks) / best, 2),
+        },
+        'cold': _cold_start(args, backend),
+        'vectors': service.embed_batch(questions + chunks[: args.parity_chunks]),
+    }
+
+
+def bench_engine(args: argparse.Namespace, chunks: list[str]) -> dict:
+    """Unbucketed single `encode` versus the length-bucketed engine, inline and over a process pool."""
+
+    from app.core.executors import ExecutorPool
+    from app.services import worker_tasks
+    from app.services.embedding_service import EmbeddingService
+
+    kwargs = {
+        'model_name': args.model,
+        'device': 'cpu',
+        'backend': args.engine_backend,
+        'onnx_dir': args.onnx_dir,
+        'onnx_threads': args.onnx_threads,
+        'batch_tokens': args.batch_tokens,
+    }
+    inline = EmbeddingService(**kwargs)
+    inline.embed_text('warmup')
+    started = time.perf_counter()
+    naive = inline.model.encode(chunks, normalize_embeddings=True)
+    naive_s = time.perf_counter() - started
+    results: dict = {'unbucketed': {'best_s': round(naive_s, 3), 'chunks_per_s': round(len(chunks) / naive_s, 2)}}
+
+    for workers in args.process_workers:
+        pool = None
+        service = inline
+        if workers > 0:
+            pool = ExecutorPool.processes(
+                'ingest_embedding',
+                workers,
+                initializer=worker_tasks.init_embedding_worker,
+                initargs=('WARNING', kwargs),
+            )
+            service = EmbeddingService(**kwargs, batch_executor=pool)
+            service.warmup(batch=True)
+        try:
+            started = time.perf_counter()
+            vectors = service.embed_batch(chunks)
+            elapsed = time.perf_counter() - started
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        # Same texts, same model: the reordering must not change which vector belongs to which chunk.
+        drift = max(1.0 - sum(a * b for a, b in zip(left, right)) for left, right in zip(vectors, naive.tolist()))
+        results[f'bucketed/workers{workers}'] = {
+            'best_s': round(elapsed, 3),
+            'chunks_per_s': round(len(chunks) / elapsed, 2),
+            'order_cosine_drift': round(drift, 6),
+        }
+    return results
+
+
+def parity(torch_vectors: list[list[float]], onnx_vectors: list[list[float]]) -> dict:
+    # Both backends return unit vectors, so the dot product is the cosine similarity.
+    cosines = [sum(a * b for a, b in zip(left, right)) for left, right in zip(torch_vectors, onnx_vectors)]
+    norms = [sum(value * value for value in vector) ** 0.5 for vector in onnx_vectors]
+    return {
+        'texts': len(cosines),
+        'cosine_min': round(min(cosines), 5),
+        'cosine_mean': round(sum(cosines) / len(cosines), 5),
+        'onnx_norm_max_error': round(max(abs(norm - 1.0) for norm in norms), 6),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Compare torch and int8 ONNX embedding backends.')
+    parser.add_argument('--model', default='sentence-transformers/all-MiniLM-L6-v2')
+    parser.add_argument('--onnx-dir', type=Path, default=Path('./data/models/onnx'))
+    parser.add_argument('--onnx-threads', type=int, default=0)
+    parser.add_argument('--export', action='store_true', help='Export the ONNX model first if it is missing')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--transcript-words', type=int, default=20000)
+    parser.add_argument('--chunk-chars', type=int, default=1200)
+    parser.add_argument('--parity-chunks', type=int, default=64)
+    parser.add_argument('--min-cosine', type=float, default=0.98, help='Fail when any text falls below this')
+    parser.add_argument('--engine-backend', choices=BACKENDS, default='torch')
+    parser.add_argument('--process-workers', nargs='+', type=int, default=[0, 2], help='0 = bucketed, inline')
+    parser.add_argument('--batch-tokens', type=int, default=8192)
+    parser.add_argument('--output', type=Path, default=None)
+    parser.add_argument('--baseline', type=Path, default=None)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+
+    if args.export and not (args.onnx_dir / 'model.onnx').exists():
+        from app.services.onnx_embedding import export_model
+
+        export_model(args.model, args.onnx_dir)
+
+    transcript = synthetic_transcript(args.transcript_words)
+    chunks = [transcript[start:start + args.chunk_chars] for start in range(0, len(transcript), args.chunk_chars)]
+    questions = synthetic_questions(32)
+    # Segment-aligned chunking leaves chunks of uneven length; that spread is what bucketing is for.
+    rng = random.Random(5)
+    mixed = [chunk[: rng.randint(max(1, len(chunk) // 8), len(chunk))] for chunk in chunks]
+
+    report: dict = {
+        'benchmark': 'embedding',
+        'environment': environment(),
+        'config': {key: str(value) for key, value in vars(args).items() if key not in {'output', 'baseline'}},
+        'cases': {},
+    }
+    vectors: dict[str, list] = {}
+    for backend in BACKENDS:
+        try:
+            result = bench_backend(args, backend, chunks, questions)
+            vectors[backend] = result.pop('vectors')
+            result['status'] = 'ok'
+        except ImportError as exc:
+            result = {'status': 'skipped', 'reason': f'missing dependency: {exc.name or exc}'}
+        except (FileNotFoundError, subprocess.CalledProcessError) as exc:
+            result = {'status': 'skipped', 'reason': f'{type(exc).__name__}: {exc}'}
+        report['cases'][backend] = result
+        print(f'{backend}: {result["status"]}', file=sys.stderr)
+
+    try:
+        report['cases']['engine'] = {'status': 'ok', 'chunks': len(mixed), **bench_engine(args, mixed)}
+    except ImportError as exc:
+        report['cases']['engine'] = {'status': 'skipped', 'reason': f'missing dependency: {exc.name or exc}'}
+    except FileNotFoundError as exc:
+        report['cases']['engine'] = {'status': 'skipped', 'reason': f'{type(exc).__name__}: {exc}'}
+    print(f"engine: {report['cases']['engine']['status']}", file=sys.stderr)
+
+    failed = False
+    if len(vectors) == len(BACKENDS):
+        report['cases']['parity'] = parity(vectors['torch'], vectors['onnx'])
+        failed = report['cases']['parity']['cosine_min'] < args.min_cosine
+        if failed:
+            print(f'PARITY cosine_min below {args.min_cosine}', file=sys.stderr)
+
+    write_report(report, args.output)
+    if args.baseline:
+        failures = compare_reports(report, json.loads(args.baseline.read_text(encoding='utf-8')), args.tolerance)
+        for failure in failures:
+            print(f'REGRESSION {failure}', file=sys.stderr)
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
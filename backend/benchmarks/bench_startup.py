@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+ROLES = ('chat', 'ingest', 'all')
+
+# Modules a role must never import at startup. A hit here is a regression regardless of timing.
+FORBIDDEN_MODULES = {
+    'chat': ['yt_dlp', 'moviepy', 'faster_whisper', 'langchain_text_splitters'],
+    'ingest': [],
+    'all': [],
+}
+WATCHED_MODULES = ['yt_dlp', 'moviepy', 'faster_whisper', 'langchain_text_splitters', 'pymilvus', 'torch', 'openai']
+
+_PROBE = '''
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def _startup():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        warmup = app.main.get_warmup_service()
+        while not warmup.state.finished:
+            await asyncio.sleep(0.01)
+
+asyncio.run(_startup())
+ready = time.perf_counter()
+try:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+except ImportError:
+    rss_kb = 0
+print(json.dumps({
+    'import_s': imported - started,
+    'startup_s': ready - imported,
+    'warmup': app.main.get_warmup_service().snapshot(),
+    'max_rss_kb': rss_kb,
+    'loaded': sorted(name for name in %(watched)r if name in sys.modules),
+}))
+'''
+
+
+def _parse_importtime(stderr: str) -> dict[str, int]:
+    # `-X importtime` lines: "import time: self [us] | cumulative | imported package"
+    cumulative: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        # Top-level imports have a single leading space; nested ones are indented further.
+        raw_name = parts[2]
+        if raw_name.startswith('  '):
+            continue
+        name = raw_name.strip()
+        cumulative[name] = max(cumulative.get(name, 0), int(parts[1]))
+    return cumulative
+
+
+def measure_role(role: str, repeats: int, warmup: bool) -> dict:
+    env = dict(os.environ)
+    env['WORKER_ROLE'] = role
+    env['WARMUP_ON_STARTUP'] = 'true' if warmup else 'false'
+
+    samples: list[dict] = []
+    top_imports: dict[str, int] = {}
+    for _ in range(repeats):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _PROBE % {'watched': WATCHED_MODULES}],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        wall_s = time.perf_counter() - started
+        if proc.returncode != 0:
+            raise RuntimeError(f'role={role} failed to start:\n{proc.stderr[-4000:]}')
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result['process_wall_s'] = wall_s
+        samples.append(result)
+        top_imports = _parse_importtime(proc.stderr)
+
+    best = min(samples, key=lambda item: item['process_wall_s'])
+    heaviest = sorted(top_imports.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        'role': role,
+        'repeats': repeats,
+        'import_s': round(min(item['import_s'] for item in samples), 4),
+        'startup_s': round(min(item['startup_s'] for item in samples), 4),
+        'process_wall_s': round(best['process_wall_s'], 4),
+        'max_rss_kb': best['max_rss_kb'],
+        'warmup_steps': best['warmup']['steps'] if warmup else {},
+        'loaded_modules': best['loaded'],
+        'forbidden_loaded': [name for name in FORBIDDEN_MODULES[role] if name in best['loaded']],
+        'heaviest_imports_us': dict(heaviest),
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    failures: list[str] = []
+    for role, current in report['roles'].items():
+        if current['forbidden_loaded']:
+            failures.append(f'{role}: imports forbidden modules {current["forbidden_loaded"]}')
+        previous = baseline.get('roles', {}).get(role)
+        if not previous:
+            continue
+        for metric in ('import_s', 'startup_s'):
+            limit = previous[metric] * (1 + tolerance)
+            if current[metric] > limit and current[metric] - previous[metric] > 0.05:
+                failures.append(f'{role}: {metric} {current[metric]:.3f}s > baseline {previous[metric]:.3f}s (+{tolerance:.0%})')
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Measure import time and startup per worker role.')
+    parser.add_argument('--roles', nargs='+', default=list(ROLES), choices=ROLES)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--warmup', action='store_true', help='Include model warmup in startup_s (time to /ready)')
+    parser.add_argument('--output', type=Path, default=None, help='Write the JSON report here')
+    parser.add_argument('--baseline', type=Path, default=None, help='Fail if slower than this report')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown vs baseline')
+    args = parser.parse_args()
+
+    report = {
+        'benchmark': 'startup',
+        'python': sys.version.split()[0],
+        'warmup': args.warmup,
+        'roles': {role: measure_role(role, args.repeats, args.warmup) for role in args.roles},
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text, encoding='utf-8')
+
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8')) if args.baseline else {}
+    failures = compare(report, baseline, args.tolerance)
+    for failure in failures:
+        print(f'REGRESSION {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.report import compare_reports, environment, write_report
+
+AUDIO_SUFFIXES = ('.wav', '.mp3', '.m4a', '.flac', '.ogg')
+
+
+def normalize_words(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def word_errors(reference: str, hypothesis: str) -> tuple[int, int]:
+    """(substitutions + deletions + insertions, reference word count) by word-level edit distance."""
+
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for row, ref_word in enumerate(ref, start=1):
+        current = [row]
+        for column, hyp_word in enumerate(hyp, start=1):
+            current.append(
+                min(
+                    previous[column] + 1,
+                    current[column - 1] + 1,
+                    previous[column - 1] + (ref_word != hyp_word),
+                )
+            )
+        previous = current
+    return previous[-1], len(ref)
+
+
+def load_clips(clips_dir: Path) -> list[dict]:
+    """Audio files with a `<name>.txt` reference next to each.
+
+    Real speech is required: VAD drops almost all of synthetic audio, so batching and VAD settings would be compared
+    on near-silence, with no WER at all.
+    """
+
+    clips = []
+    for path in sorted(clips_dir.iterdir()):
+        if path.suffix.lower() not in AUDIO_SUFFIXES:
+            continue
+        reference = path.with_suffix('.txt')
+        clips.append(
+            {
+                'path': str(path),
+                'reference': reference.read_text(encoding='utf-8') if reference.exists() else None,
+            }
+        )
+    if not clips:
+        raise SystemExit(f'No audio clips in {clips_dir}')
+    if all(clip['reference'] is None for clip in clips):
+        raise SystemExit(f'No clip in {clips_dir} has a <name>.txt reference transcript')
+    return clips
+
+
+def run_combo(config: dict) -> dict:
+    """Runs inside a fresh interpreter so peak RSS and CPU time belong to this combination alone."""
+
+    import resource
+
+    from faster_whisper import decode_audio
+
+    from app.services.transcription_service import SAMPLE_RATE, TranscriptionService
+
+    service = TranscriptionService(
+        config['model'],
+        'cpu',
+        config['compute_type'],
+        beam_size=config['beam_size'],
+        vad_filter=True,
+        batch_size=config['batch_size'],
+        cpu_threads=config['cpu_threads'],
+    )
+    started = time.perf_counter()
+    service.warmup()
+    load_s = time.perf_counter() - started
+
+    audio_s = wall_s = cpu_s = 0.0
+    errors = reference_words = 0
+    for clip in config['clips']:
+        audio_s += len(decode_audio(clip['path'], sampling_rate=SAMPLE_RATE)) / SAMPLE_RATE
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        try:
+            text = service.transcribe(Path(clip['path'])).text
+        except ValueError:
+            # Nothing recognized; scored as deleting every reference word.
+            text = ''
+        wall_s += time.perf_counter() - wall_started
+        cpu_s += time.process_time() - cpu_started
+        if clip['reference'] is not None:
+            clip_errors, clip_words = word_errors(clip['reference'], text)
+            errors += clip_errors
+            reference_words += clip_words
+
+    return {
+        'load_s': round(load_s, 3),
+        'audio_s': round(audio_s, 2),
+        'wall_s': round(wall_s, 3),
+        'cpu_s': round(cpu_s, 3),
+        'realtime_factor': round(audio_s / wall_s, 2) if wall_s else 0.0,
+        # Audio seconds per CPU-second: the number that decides how many videos a core can keep up with.
+        'cpu_realtime_factor': round(audio_s / cpu_s, 3) if cpu_s else 0.0,
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'wer': round(errors / reference_words, 4) if reference_words else None,
+    }
+
+
+def _spawn(config: dict, timeout_s: float) -> dict:
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_transcription', '--worker'],
+        cwd=BACKEND_DIR,
+        input=json.dumps(config),
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'HF_HUB_OFFLINE': os.environ.get('HF_HUB_OFFLINE', '1')},
+        timeout=timeout_s,
+    )
+    if completed.returncode != 0:
+        lines = (completed.stderr or completed.stdout).strip().splitlines()
+        return {'status': 'error', 'reason': lines[-1] if lines else f'exit code {completed.returncode}'}
+    return {'status': 'ok', **json.loads(completed.stdout.strip().splitlines()[-1])}
+
+
+def main() -> int:
+    if '--worker' in sys.argv:
+        print(json.dumps(run_combo(json.loads(sys.stdin.read()))))
+        return 0
+
+    parser = argparse.ArgumentParser(description='Speed/accuracy grid for faster-whisper settings.')
+    parser.add_argument('--clips', type=Path, required=True, help='Speech clips with <name>.txt references')
+    parser.add_argument('--models', nargs='+', default=['tiny', 'base', 'small'])
+    parser.add_argument('--compute-types', nargs='+', default=['int8', 'float32'])
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[0, 8], help='0 = sequential decoding')
+    parser.add_argument('--cpu-threads', nargs='+', type=int, default=[0])
+    parser.add_argument('--beam-size', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=3600.0, help='Per combination, in seconds')
+    parser.add_argument('--output', type=Path, default=None)
+    parser.add_argument('--baseline', type=Path, default=None)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    report: dict = {
+        'benchmark': 'transcription',
+        'environment': environment(),
+        'config': {key: str(value) for key, value in vars(args).items() if key not in {'output', 'baseline'}},
+        'cases': {},
+    }
+    clips = load_clips(args.clips)
+    report['clips'] = len(clips)
+    grid = itertools.product(args.models, args.compute_types, args.batch_sizes, args.cpu_threads)
+    for model, compute_type, batch_size, cpu_threads in grid:
+        name = f'{model}/{compute_type}/batch{batch_size}/threads{cpu_threads}'
+        config = {
+            'model': model,
+            'compute_type': compute_type,
+            'batch_size': batch_size,
+            'cpu_threads': cpu_threads,
+            'beam_size': args.beam_size,
+            'clips': clips,
+        }
+        try:
+            result = _spawn(config, args.timeout)
+        except subprocess.TimeoutExpired:
+            result = {'status': 'error', 'reason': f'timed out after {args.timeout:g}s'}
+        report['cases'][name] = result
+        print(f'{name}: {result["status"]} {result.get("cpu_realtime_factor", "")}', file=sys.stderr)
+
+    ranked = [(name, case) for name, case in report['cases'].items() if case['status'] == 'ok']
+    ranked.sort(key=lambda item: item[1]['cpu_realtime_factor'], reverse=True)
+    report['ranking'] = [
+        {'case': name, 'cpu_realtime_factor': case['cpu_realtime_factor'], 'wer': case['wer']} for name, case in ranked
+    ]
+    write_report(report, args.output)
+    if not any(case['wer'] is not None for _, case in ranked):
+        # Speed without accuracy cannot rank settings: a configuration that drops speech would win.
+        print('No combination produced a WER; check the clips and their references', file=sys.stderr)
+        return 1
+    if not args.baseline:
+        return 0
+
+    failures = compare_reports(report, json.loads(args.baseline.read_text(encoding='utf-8')), args.tolerance)
+    for failure in failures:
+        print(f'REGRESSION {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
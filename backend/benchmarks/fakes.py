@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+_WORDS = (
+    'model data training network artificial intelligence narrow general super learning vector index search query '
+    'embedding transcript video audio chunk context answer question system latency throughput memory cache token '
+    'pipeline stage batch worker process thread request response stream milvus whisper prompt retrieval ranking'
+).split()
+
+
+def synthetic_transcript(words: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    sentences: list[str] = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 24))
+        sentence = ' '.join(rng.choice(_WORDS) for _ in range(length))
+        sentences.append(sentence.capitalize() + '.')
+        remaining -= length
+    return ' '.join(sentences)
+
+
+def synthetic_questions(count: int, seed: int = 11) -> list[str]:
+    rng = random.Random(seed)
+    templates = [
+        'What does the video say about {a} and {b}?',
+        'How is {a} related to {b}?',
+        'List the types of {a} mentioned',
+        'Explain {a} in simple terms',
+        'Why does {a} matter for {b}?',
+    ]
+    return [rng.choice(templates).format(a=rng.choice(_WORDS), b=rng.choice(_WORDS)) for _ in range(count)]
+
+
+def synthetic_wav(path: Path, seconds: float, sample_rate: int = 16000, seed: int = 3) -> Path:
+    """Speech-band tone bursts with pauses: exercises decode/VAD/encoder paths, not recognition accuracy."""
+
+    rng = random.Random(seed)
+    frames = bytearray()
+    total = int(seconds * sample_rate)
+    position = 0
+    while position < total:
+        burst = int(rng.uniform(0.2, 0.8) * sample_rate)
+        pause = int(rng.uniform(0.05, 0.3) * sample_rate)
+        freq = rng.uniform(120, 900)
+        for index in range(min(burst, total - position)):
+            sample = 0.3 * math.sin(2 * math.pi * freq * index / sample_rate)
+            frames += struct.pack('<h', int(sample * 32767))
+        position += burst
+        silent = max(0, min(pause, total - position))
+        frames += b'\x00\x00' * silent
+        position += silent
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(path), 'wb') as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(sample_rate)
+        handle.writeframes(bytes(frames))
+    return path
+
+
+class HashingEmbeddingService:
+    """Deterministic stand-in for EmbeddingService: hashed bag-of-words, L2-normalized, same public interface."""
+
+    def __init__(self, dimension: int = 384) -> None:
+        self.dimension = dimension
+
+    def embed_text(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimension
+        for token in re.findall(r'[a-z0-9]+', text.lower()):
+            digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], 'little') % self.dimension
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_text(text) for text in texts]
+
+    def warmup(self, batch: bool = False) -> None:
+        self.embed_text('warmup')
+
+
+class StubOpenAIServer:
+    """Local OpenAI-compatible `/v1/chat/completions` server with configurable latency, streaming included."""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        first_token_delay_s: float = 0.0,
+        token_delay_s: float = 0.0,
+        completion_tokens: int = 32,
+    ) -> None:
+        self.first_token_delay_s = first_token_delay_s
+        self.token_delay_s = token_delay_s
+        self.completion_tokens = completion_tokens
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stub-openai', daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def start(self) -> 'StubOpenAIServer':
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'StubOpenAIServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args) -> None:  # noqa: A002
+                pass
+
+            def do_POST(self) -> None:  # noqa: N802
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                stub.requests += 1
+                prompt_chars = sum(len(str(message.get('content', ''))) for message in body.get('messages', []))
+                prompt_tokens = max(1, prompt_chars // 4)
+                tokens = [f'tok{index} ' for index in range(stub.completion_tokens)]
+                model = body.get('model', 'stub')
+
+                if body.get('stream'):
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/event-stream')
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    self.end_headers()
+                    time.sleep(stub.first_token_delay_s)
+                    for index, token in enumerate(tokens):
+                        if index:
+                            time.sleep(stub.token_delay_s)
+                        chunk = {
+                            'id': 'chatcmpl-stub',
+                            'object': 'chat.completion.chunk',
+                            'created': int(time.time()),
+                            'model': model,
+                            'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}],
+                        }
+                        self._write_chunk(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+                    self._write_chunk(b'data: [DONE]\n\n')
+                    self._write_chunk(b'')
+                    return
+
+                time.sleep(stub.first_token_delay_s + stub.token_delay_s * max(0, len(tokens) - 1))
+                payload = json.dumps(
+                    {
+                        'id': 'chatcmpl-stub',
+                        'object': 'chat.completion',
+                        'created': int(time.time()),
+                        'model': model,
+                        'choices': [
+                            {
+                                'index': 0,
+                                'message': {'role': 'assistant', 'content': ''.join(tokens).strip()},
+                                'finish_reason': 'stop',
+                            }
+                        ],
+                        'usage': {
+                            'prompt_tokens': prompt_tokens,
+                            'completion_tokens': len(tokens),
+                            'total_tokens': prompt_tokens + len(tokens),
+                        },
+                    }
+                ).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _write_chunk(self, data: bytes) -> None:
+                self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+                self.wfile.flush()
+
+        return Handler
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the stub OpenAI-compatible server in the foreground.')
+    parser.add_argument('--port', type=int, default=8088)
+    parser.add_argument('--first-token-delay-ms', type=float, default=200.0)
+    parser.add_argument('--token-delay-ms', type=float, default=20.0)
+    parser.add_argument('--completion-tokens', type=int, default=64)
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(
+        port=args.port,
+        first_token_delay_s=args.first_token_delay_ms / 1000.0,
+        token_delay_s=args.token_delay_ms / 1000.0,
+        completion_tokens=args.completion_tokens,
+    )
+    print(f'Stub OpenAI server on {server.base_url}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import urlsplit
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.fakes import HashingEmbeddingService, StubOpenAIServer, synthetic_questions, synthetic_transcript
+from benchmarks.report import compare_reports, environment, latency_summary, write_report
+
+ENDPOINTS = {'chat': '/api/v1/chat', 'chat_stream': '/api/v1/chat/stream'}
+SEED_COLLECTION = 'loadtest'
+SSE_DELIMITER = b'\n\n'
+TOKEN_EVENT = b'"type": "token"'
+
+
+@dataclass
+class Sample:
+    started: float
+    latency_s: float
+    status: int
+    ttft_s: float | None = None
+    tokens: int = 0
+    error: str = ''
+
+
+class _Client(threading.local):
+    """One keep-alive connection per worker thread, reopened after errors."""
+
+    def __init__(self, host: str, port: int, timeout_s: float) -> None:
+        self.host = host
+        self.port = port
+        self.timeout_s = timeout_s
+        self.connection: http.client.HTTPConnection | None = None
+
+    def post(self, path: str, body: bytes, stream: bool) -> Sample:
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout_s)
+        started = time.perf_counter()
+        try:
+            self.connection.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+            response = self.connection.getresponse()
+            ttft = None
+            tokens = 0
+            if stream and response.status == 200:
+                # Counts SSE token events as they arrive; the first one marks time-to-first-token. Reads can end
+                # mid-event, so only complete events (up to the blank-line delimiter) are counted and the rest carried.
+                buffer = b''
+                while True:
+                    data = response.read1(65536)
+                    if not data:
+                        break
+                    *events, buffer = (buffer + data).split(SSE_DELIMITER)
+                    count = sum(1 for event in events if TOKEN_EVENT in event)
+                    if count and ttft is None:
+                        ttft = time.perf_counter() - started
+                    tokens += count
+            else:
+                response.read()
+            return Sample(started, time.perf_counter() - started, response.status, ttft, tokens)
+        except (OSError, http.client.HTTPException) as exc:
+            self.connection.close()
+            self.connection = None
+            return Sample(started, time.perf_counter() - started, 0, error=type(exc).__name__)
+
+
+def _closed_loop(
+    client: _Client,
+    path: str,
+    stream: bool,
+    bodies: list[bytes],
+    concurrency: int,
+    duration_s: float,
+) -> list[Sample]:
+    samples: list[Sample] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration_s
+
+    def _user(index: int) -> None:
+        rng = random.Random(index)
+        while time.perf_counter() < deadline:
+            sample = client.post(path, rng.choice(bodies), stream)
+            with lock:
+                samples.append(sample)
+
+    threads = [threading.Thread(target=_user, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def _open_loop(
+    client: _Client,
+    path: str,
+    stream: bool,
+    bodies: list[bytes],
+    rate: float,
+    duration_s: float,
+    max_in_flight: int,
+) -> list[Sample]:
+    # Poisson arrivals independent of response times, so queueing inside the server shows up as latency.
+    rng = random.Random(0)
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='load') as pool:
+        started = time.perf_counter()
+        next_at = started
+        while next_at < started + duration_s:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(client.post, path, rng.choice(bodies), stream))
+            next_at += rng.expovariate(rate)
+    return [future.result() for future in futures]
+
+
+def summarize(samples: list[Sample], wall_s: float) -> dict:
+    ok = [sample for sample in samples if sample.status == 200]
+    statuses: dict[str, int] = {}
+    for sample in samples:
+        key = str(sample.status) if sample.status else sample.error
+        statuses[key] = statuses.get(key, 0) + 1
+    result = {
+        'requests': len(samples),
+        'latency': latency_summary([sample.latency_s for sample in ok]),
+        'requests_per_s': round(len(ok) / wall_s, 2) if wall_s else 0.0,
+        'error_rate': round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        'statuses': statuses,
+    }
+    ttfts = [sample.ttft_s for sample in ok if sample.ttft_s is not None]
+    if ttfts:
+        result['ttft'] = latency_summary(ttfts)
+        result['tokens_per_s'] = round(sum(sample.tokens for sample in ok) / wall_s, 2)
+    return result
+
+
+def _get_json(host: str, port: int, path: str) -> dict | None:
+    connection = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        body = response.read()
+        return json.loads(body) if response.status == 200 else None
+    except (OSError, http.client.HTTPException, ValueError):
+        return None
+    finally:
+        connection.close()
+
+
+def _seed_collection(milvus_uri: str, dimension: int) -> None:
+    from app.services.milvus_service import MilvusService
+
+    chunks = [chunk for chunk in synthetic_transcript(6000).split('. ') if chunk]
+    embedder = HashingEmbeddingService(dimension)
+    metadata = [{'video_id': SEED_COLLECTION, 'title': SEED_COLLECTION, 'chunk_index': idx} for idx in range(len(chunks))]
+    service = MilvusService(uri=milvus_uri, default_collection=SEED_COLLECTION, dimension=dimension, top_k=5)
+    service.upsert_chunks(SEED_COLLECTION, embedder.embed_batch(chunks), chunks, metadata)
+    from pymilvus import connections
+
+    # Milvus Lite holds a file lock per process; release it before the server opens the same file.
+    connections.disconnect('default')
+
+
+@contextmanager
+def spawned_server(args: argparse.Namespace, stub: StubOpenAIServer, workdir: Path) -> Iterator[str]:
+    milvus_uri = str(workdir / 'loadtest_milvus.db')
+    _seed_collection(milvus_uri, args.dimension)
+    env = dict(os.environ)
+    env.update(
+        {
+            'OPENAI_BASE_URL': stub.base_url,
+            'OPENAI_API_KEY': 'loadtest',
+            'APP_MILVUS_URI': milvus_uri,
+            'UPLOAD_DIR': str(workdir / 'uploads'),
+            'AUDIO_DIR': str(workdir / 'audio'),
+            'TRANSCRIPT_DIR': str(workdir / 'transcripts'),
+            'WORKER_ROLE': 'chat',
+            'LOG_LEVEL': 'WARNING',
+        }
+    )
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1', '--port', str(args.port)],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        deadline = time.monotonic() + args.startup_timeout
+        while _get_json('127.0.0.1', args.port, '/ready') is None:
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError('Server did not become ready')
+            time.sleep(0.25)
+        yield f'http://127.0.0.1:{args.port}'
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Concurrent load test for /chat and /chat/stream.')
+    parser.add_argument('--base-url', default=None, help='Target a running server instead of spawning one')
+    parser.add_argument('--collection', default=None, help='Collection to query (defaults to the seeded one)')
+    parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 8, 32], help='Closed-loop virtual users')
+    parser.add_argument('--rate', nargs='+', type=float, default=[], help='Open-loop arrivals per second')
+    parser.add_argument('--max-in-flight', type=int, default=256)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--startup-timeout', type=float, default=120.0)
+    parser.add_argument('--dimension', type=int, default=384)
+    parser.add_argument('--llm-first-token-ms', type=float, default=300.0)
+    parser.add_argument('--llm-token-ms', type=float, default=20.0)
+    parser.add_argument('--llm-tokens', type=int, default=64)
+    parser.add_argument('--output', type=Path, default=None)
+    parser.add_argument('--baseline', type=Path, default=None)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    report: dict = {
+        'benchmark': 'load',
+        'environment': environment(),
+        'config': {key: str(value) for key, value in vars(args).items() if key not in {'output', 'baseline'}},
+        'cases': {},
+    }
+    with ExitStack() as stack:
+        base_url = args.base_url
+        if base_url is None:
+            stub = stack.enter_context(
+                StubOpenAIServer(
+                    first_token_delay_s=args.llm_first_token_ms / 1000.0,
+                    token_delay_s=args.llm_token_ms / 1000.0,
+                    completion_tokens=args.llm_tokens,
+                )
+            )
+            workdir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix='loadtest-')))
+            base_url = stack.enter_context(spawned_server(args, stub, workdir))
+
+        target = urlsplit(base_url)
+        host, port = target.hostname or '127.0.0.1', target.port or 80
+        collection = args.collection or SEED_COLLECTION
+        bodies = [
+            json.dumps({'question': question, 'collection_name': collection}).encode('utf-8')
+            for question in synthetic_questions(64)
+        ]
+        client = _Client(host, port, args.timeout)
+
+        plans = [(f'c{value}', value, None) for value in args.concurrency]
+        plans += [(f'r{value:g}', None, value) for value in args.rate]
+        for endpoint in args.endpoints:
+            path = ENDPOINTS[endpoint]
+            stream = endpoint == 'chat_stream'
+            for label, concurrency, rate in plans:
+                started = time.perf_counter()
+                if rate is None:
+                    samples = _closed_loop(client, path, stream, bodies, concurrency, args.duration)
+                else:
+                    samples = _open_loop(client, path, stream, bodies, rate, args.duration, args.max_in_flight)
+                name = f'{endpoint}@{label}'
+                report['cases'][name] = summarize(samples, time.perf_counter() - started)
+                print(f'{name}: {json.dumps(report["cases"][name]["latency"])}', file=sys.stderr)
+
+        # Server-side pool and admission state at the end of the run, to locate the bottleneck.
+        report['server'] = {
+            'executors': _get_json(host, port, '/api/v1/admin/executors'),
+            'admission': _get_json(host, port, '/api/v1/admin/admission'),
+        }
+
+    write_report(report, args.output)
+    if not args.baseline:
+        return 0
+
+    failures = compare_reports(report, json.loads(args.baseline.read_text(encoding='utf-8')), args.tolerance)
+    for failure in failures:
+        print(f'REGRESSION {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(latencies_s: list[float]) -> dict:
+    if not latencies_s:
+        return {'count': 0}
+    return {
+        'count': len(latencies_s),
+        'mean_ms': round(1000 * sum(latencies_s) / len(latencies_s), 3),
+        'p50_ms': round(1000 * percentile(latencies_s, 50), 3),
+        'p95_ms': round(1000 * percentile(latencies_s, 95), 3),
+        'p99_ms': round(1000 * percentile(latencies_s, 99), 3),
+        'max_ms': round(1000 * max(latencies_s), 3),
+    }
+
+
+def environment() -> dict:
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def write_report(report: dict, output: Path | None) -> None:
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(text, encoding='utf-8')
+
+
+# Metrics where larger is better; error rates, word error rates and everything ending in _ms/_s are lower-is-better.
+HIGHER_IS_BETTER = ('per_s', 'throughput', 'realtime_factor', 'hit_rate')
+
+
+def compare_reports(current: dict, baseline: dict, tolerance: float, zero_tolerance: float = 0.01) -> list[str]:
+    """Flag every numeric metric that moved in the bad direction by more than `tolerance` (relative).
+
+    A relative change from a zero baseline is undefined, so lower-is-better metrics at zero (typically `error_rate`
+    and `wer`) are flagged once they exceed `zero_tolerance` in absolute terms.
+    """
+
+    failures: list[str] = []
+    baseline_cases = baseline.get('cases', {})
+    for case_name, metrics in current.get('cases', {}).items():
+        previous = baseline_cases.get(case_name)
+        if not isinstance(previous, dict):
+            continue
+        for key, value in _flatten(metrics).items():
+            old = _flatten(previous).get(key)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+                continue
+            higher_better = any(token in key for token in HIGHER_IS_BETTER)
+            lower_better = key.endswith(('_ms', '_s', 'error_rate', 'wer')) and not higher_better
+            if old == 0:
+                if lower_better and value > zero_tolerance:
+                    failures.append(f'{case_name}.{key}: {value:g} vs baseline 0 (> {zero_tolerance:g})')
+                continue
+            change = (value - old) / abs(old)
+            if higher_better and change < -tolerance:
+                failures.append(f'{case_name}.{key}: {value:g} vs baseline {old:g} ({change:+.0%})')
+            elif lower_better and change > tolerance:
+                failures.append(f'{case_name}.{key}: {value:g} vs baseline {old:g} ({change:+.0%})')
+    return failures
+
+
+def _flatten(data: dict, prefix: str = '') -> dict:
+    flat: dict = {}
+    for key, value in data.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f'{name}.'))
+        else:
+            flat[name] = value
+    return flat
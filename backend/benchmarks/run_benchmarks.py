@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.fakes import (
+    HashingEmbeddingService,
+    StubOpenAIServer,
+    synthetic_questions,
+    synthetic_transcript,
+    synthetic_wav,
+)
+from benchmarks.report import compare_reports, environment, latency_summary, write_report
+
+
+class BenchContext:
+    def __init__(self, args: argparse.Namespace, workdir: Path, stub: StubOpenAIServer) -> None:
+        self.args = args
+        self.workdir = workdir
+        self.stub = stub
+        self.transcript = synthetic_transcript(args.transcript_words)
+        self.questions = synthetic_questions(max(args.iterations, 8))
+        self.collection = 'bench_chunks'
+        self._embedding = None
+        self._milvus = None
+        self._rag = None
+        self._chunks: list[str] | None = None
+
+    @property
+    def embedding(self):
+        if self._embedding is None:
+            if self.args.embedding == 'fake':
+                self._embedding = HashingEmbeddingService(self.args.dimension)
+            else:
+                # A locally cached sentence-transformers model; never reaches the network.
+                os.environ.setdefault('HF_HUB_OFFLINE', '1')
+                from app.services.embedding_service import EmbeddingService
+
+                self._embedding = EmbeddingService(self.args.embedding_model, 'cpu')
+        return self._embedding
+
+    @property
+    def milvus(self):
+        if self._milvus is None:
+            from app.services.milvus_service import MilvusService
+
+            self._milvus = MilvusService(
+                uri=str(self.workdir / 'bench_milvus.db'),
+                default_collection=self.collection,
+                dimension=self.args.dimension,
+                top_k=5,
+            )
+        return self._milvus
+
+    @property
+    def rag(self):
+        if self._rag is None:
+            from openai import OpenAI
+
+            from app.services.rag_service import RagService
+
+            self._rag = RagService(
+                embedding_service=self.embedding,
+                milvus_service=self.milvus,
+                openai_client=OpenAI(api_key='bench', base_url=self.stub.base_url),
+                chat_model='stub',
+                chunk_size=self.args.chunk_size,
+                chunk_overlap=self.args.chunk_overlap,
+                max_context_chunks=6,
+            )
+        return self._rag
+
+    @property
+    def chunks(self) -> list[str]:
+        if self._chunks is None:
+            self._chunks = self.rag.chunk_text(self.transcript)
+        return self._chunks
+
+    def ensure_indexed(self) -> None:
+        if self.milvus.collection_size(self.collection) > 0:
+            return
+        embeddings = self.embedding.embed_batch(self.chunks)
+        metadata = [{'video_id': 'bench', 'title': 'bench', 'chunk_index': idx} for idx in range(len(self.chunks))]
+        self.milvus.upsert_chunks(self.collection, embeddings, self.chunks, metadata)
+
+
+def _timed(fn: Callable[[], Any], iterations: int, warmup: int = 1) -> list[float]:
+    for _ in range(warmup):
+        fn()
+    latencies: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def case_transcribe(ctx: BenchContext) -> dict:
+    # Needs a locally cached faster-whisper model; synthetic audio measures speed, not accuracy.
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    from app.services.transcription_service import TranscriptionService
+
+    audio = synthetic_wav(ctx.workdir / 'bench.wav', ctx.args.audio_seconds)
+    service = TranscriptionService(ctx.args.whisper_model, 'cpu', 'int8', beam_size=1, vad_filter=True)
+    latencies = _timed(lambda: service.transcribe(audio), max(1, ctx.args.iterations // 10))
+    mean = sum(latencies) / len(latencies)
+    return {
+        'latency': latency_summary(latencies),
+        'audio_s': ctx.args.audio_seconds,
+        'realtime_factor': round(ctx.args.audio_seconds / mean, 2),
+    }
+
+
+def case_chunk_text(ctx: BenchContext) -> dict:
+    latencies = _timed(lambda: ctx.rag.chunk_text(ctx.transcript), ctx.args.iterations)
+    chars = len(ctx.transcript)
+    return {
+        'latency': latency_summary(latencies),
+        'chars': chars,
+        'chunks': len(ctx.chunks),
+        'mb_per_s': round(chars / 1e6 / (sum(latencies) / len(latencies)), 3),
+    }
+
+
+def case_embed_batch(ctx: BenchContext) -> dict:
+    chunks = ctx.chunks
+    latencies = _timed(lambda: ctx.embedding.embed_batch(chunks), max(1, ctx.args.iterations // 4))
+    return {
+        'latency': latency_summary(latencies),
+        'chunks': len(chunks),
+        'chunks_per_s': round(len(chunks) / (sum(latencies) / len(latencies)), 2),
+    }
+
+
+def case_embed_text(ctx: BenchContext) -> dict:
+    questions = iter(ctx.questions * 4)
+    latencies = _timed(lambda: ctx.embedding.embed_text(next(questions)), ctx.args.iterations)
+    return {'latency': latency_summary(latencies), 'queries_per_s': round(len(latencies) / sum(latencies), 2)}
+
+
+def case_milvus_upsert(ctx: BenchContext) -> dict:
+    embeddings = ctx.embedding.embed_batch(ctx.chunks)
+    metadata = [{'video_id': 'bench_upsert', 'chunk_index': idx} for idx in range(len(ctx.chunks))]
+    latencies: list[float] = []
+    for round_index in range(max(1, ctx.args.iterations // 8)):
+        name = f'bench_upsert_{round_index}'
+        ctx.milvus.drop_collection(name)
+        started = time.perf_counter()
+        ctx.milvus.upsert_chunks(name, embeddings, ctx.chunks, metadata)
+        latencies.append(time.perf_counter() - started)
+        ctx.milvus.drop_collection(name)
+    return {
+        'latency': latency_summary(latencies),
+        'chunks': len(ctx.chunks),
+        'chunks_per_s': round(len(ctx.chunks) / (sum(latencies) / len(latencies)), 2),
+    }
+
+
+def case_milvus_search(ctx: BenchContext) -> dict:
+    ctx.ensure_indexed()
+    vectors = [ctx.embedding.embed_text(question) for question in ctx.questions]
+    cursor = iter(vectors * 4)
+    latencies = _timed(lambda: ctx.milvus.search(ctx.collection, next(cursor), top_k=8), ctx.args.iterations)
+    return {'latency': latency_summary(latencies), 'searches_per_s': round(len(latencies) / sum(latencies), 2)}
+
+
+def case_retrieve_context_hits(ctx: BenchContext) -> dict:
+    ctx.ensure_indexed()
+    results: dict = {}
+    for label, questions in (
+        ('default', ctx.questions),
+        # The list-intent path fans out to six query variants.
+        ('list_intent', ['What are the three types of AI?', 'List the kinds of artificial intelligence']),
+    ):
+        cursor = iter(questions * ctx.args.iterations)
+        latencies = _timed(
+            lambda: ctx.rag._retrieve_context_hits(next(cursor), ctx.collection, None),
+            ctx.args.iterations,
+        )
+        results[label] = {'latency': latency_summary(latencies)}
+    return results
+
+
+def case_chat_endpoints(ctx: BenchContext) -> dict:
+    from fastapi.testclient import TestClient
+
+    ctx.ensure_indexed()
+    os.environ['WARMUP_ON_STARTUP'] = 'false'
+    from app.main import app
+    from app.utils.dependencies import get_milvus_service, get_rag_service
+
+    app.dependency_overrides[get_rag_service] = lambda: ctx.rag
+    app.dependency_overrides[get_milvus_service] = lambda: ctx.milvus
+    results: dict = {}
+    try:
+        with TestClient(app) as client:
+            for label, path in (('chat', '/api/v1/chat'), ('chat_stream', '/api/v1/chat/stream')):
+                cursor = iter(ctx.questions * 4)
+
+                def _call() -> None:
+                    response = client.post(path, json={'question': next(cursor), 'collection_name': ctx.collection})
+                    response.raise_for_status()
+                    response.read()
+
+                latencies = _timed(_call, ctx.args.iterations)
+                results[label] = {
+                    'latency': latency_summary(latencies),
+                    'requests_per_s': round(len(latencies) / sum(latencies), 2),
+                }
+    finally:
+        app.dependency_overrides.clear()
+    return results
+
+
+CASES: dict[str, Callable[[BenchContext], dict]] = {
+    'transcribe': case_transcribe,
+    'chunk_text': case_chunk_text,
+    'embed_text': case_embed_text,
+    'embed_batch': case_embed_batch,
+    'milvus_upsert': case_milvus_upsert,
+    'milvus_search': case_milvus_search,
+    'retrieve_context_hits': case_retrieve_context_hits,
+    'chat_endpoints': case_chat_endpoints,
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Offline benchmarks for every pipeline stage (no network).')
+    parser.add_argument('--cases', nargs='+', default=[name for name in CASES if name != 'transcribe'], choices=list(CASES))
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--transcript-words', type=int, default=20000)
+    parser.add_argument('--chunk-size', type=int, default=1200)
+    parser.add_argument('--chunk-overlap', type=int, default=200)
+    parser.add_argument('--dimension', type=int, default=384)
+    parser.add_argument('--embedding', choices=['fake', 'local'], default='fake')
+    parser.add_argument('--embedding-model', default='sentence-transformers/all-MiniLM-L6-v2')
+    parser.add_argument('--whisper-model', default='tiny')
+    parser.add_argument('--audio-seconds', type=float, default=30.0)
+    parser.add_argument('--llm-first-token-ms', type=float, default=0.0)
+    parser.add_argument('--llm-token-ms', type=float, default=0.0)
+    parser.add_argument('--output', type=Path, default=None)
+    parser.add_argument('--baseline', type=Path, default=None)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    report: dict = {
+        'benchmark': 'pipeline',
+        'environment': environment(),
+        'config': {key: str(value) for key, value in vars(args).items() if key not in {'output', 'baseline'}},
+        'cases': {},
+    }
+    with tempfile.TemporaryDirectory(prefix='bench-') as tmp, StubOpenAIServer(
+        first_token_delay_s=args.llm_first_token_ms / 1000.0,
+        token_delay_s=args.llm_token_ms / 1000.0,
+    ) as stub:
+        # Keep every path the app touches inside the temp dir and point the client at the stub.
+        os.environ.update(
+            {
+                'OPENAI_BASE_URL': stub.base_url,
+                'OPENAI_API_KEY': 'bench',
+                'APP_MILVUS_URI': str(Path(tmp) / 'bench_milvus.db'),
+                'UPLOAD_DIR': str(Path(tmp) / 'uploads'),
+                'AUDIO_DIR': str(Path(tmp) / 'audio'),
+                'TRANSCRIPT_DIR': str(Path(tmp) / 'transcripts'),
+                'WORKER_ROLE': 'chat',
+                'LOG_LEVEL': 'WARNING',
+            }
+        )
+        ctx = BenchContext(args, Path(tmp), stub)
+        for name in args.cases:
+            started = time.perf_counter()
+            try:
+                result = CASES[name](ctx)
+                result['status'] = 'ok'
+            except ImportError as exc:
+                result = {'status': 'skipped', 'reason': f'missing dependency: {exc.name or exc}'}
+            except Exception as exc:  # noqa: BLE001
+                result = {'status': 'error', 'reason': f'{type(exc).__name__}: {exc}'}
+            result['case_wall_s'] = round(time.perf_counter() - started, 3)
+            report['cases'][name] = result
+            print(f'{name}: {result["status"]} ({result["case_wall_s"]}s)', file=sys.stderr)
+
+    write_report(report, args.output)
+    if not args.baseline:
+        return 0
+
+    import json
+
+    failures = compare_reports(report, json.loads(args.baseline.read_text(encoding='utf-8')), args.tolerance)
+    for failure in failures:
+        print(f'REGRESSION {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+
+def initialize(marker_dir: str) -> None:
+    # Importable by spawned workers; stands in for loading a model.
+    time.sleep(0.3)
+    (Path(marker_dir) / str(os.getpid())).touch()
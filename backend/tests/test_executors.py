@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import os
+
+from app.core.executors import ExecutorPool
+from tests import slow_init
+
+
+def test_wait_for_workers_reaches_every_process(tmp_path):
+    pool = ExecutorPool.processes('probe', 3, initializer=slow_init.initialize, initargs=(str(tmp_path),))
+    try:
+        pids = pool.wait_for_workers()
+    finally:
+        pool.executor.shutdown()
+
+    assert len(pids) == 3
+    # Every worker's initializer had finished by the time it answered.
+    assert {int(name) for name in os.listdir(tmp_path)} == pids
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from app.services.milvus_ipc import MilvusOwnerServer, RemoteMilvusService
+
+
+class SlowService:
+    uri = 'memory'
+
+    def __init__(self, delay_s: float) -> None:
+        self.delay_s = delay_s
+        self.upserted = 0
+
+    def upsert_chunks(self, collection_name, embeddings, chunks, metadatas) -> int:
+        time.sleep(self.delay_s)
+        self.upserted += len(chunks)
+        return len(chunks)
+
+    def collection_size(self, collection_name) -> int:
+        time.sleep(self.delay_s)
+        return self.upserted
+
+
+@pytest.fixture
+def remote(tmp_path):
+    service = SlowService(delay_s=0.3)
+    server = MilvusOwnerServer(service, tmp_path / 'owner.sock')
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    while not (tmp_path / 'owner.sock').exists():
+        time.sleep(0.01)
+    yield RemoteMilvusService(tmp_path / 'owner.sock', 'chunks', 2, 5, timeout_s=0.1), service
+    server.close()
+
+
+def test_writes_outlive_the_read_timeout(remote):
+    client, service = remote
+
+    assert client.upsert_chunks('chunks', [[0.0, 1.0]], ['text'], [{}]) == 1
+    assert service.upserted == 1
+
+
+def test_short_reads_time_out(remote):
+    client, _ = remote
+
+    with pytest.raises(TimeoutError):
+        client.collection_size('chunks')
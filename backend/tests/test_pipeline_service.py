@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.checkpoint_service import IngestCheckpoint
+from app.services.dedup_service import DedupService
+from app.services.pipeline_service import PipelineService
+
+SPONSOR = 'this video is sponsored by a company that makes very good products you should buy today'
+TEXTS = [
+    SPONSOR,
+    SPONSOR,
+    'backpropagation computes gradients layer by layer from the loss back to the inputs',
+    'the chain rule multiplies local derivatives along every path through the network graph',
+    'learning rates that are too large make the loss diverge instead of slowly converging',
+    'momentum keeps a running average of gradients so updates move steadily in one direction',
+]
+
+
+class FakeMilvus:
+    """Rows keyed by chunk_index, enough to check which rows survive a resumed insert."""
+
+    def __init__(self) -> None:
+        self.rows: dict[int, str] = {}
+
+    def delete_video_chunks(self, collection_name: str, video_id: str, from_chunk_index: int = 0) -> None:
+        self.rows = {index: text for index, text in self.rows.items() if index < from_chunk_index}
+
+    def upsert_chunks(self, collection_name, embeddings, chunks, metadatas) -> int:
+        for chunk, item in zip(chunks, metadatas):
+            self.rows[item['chunk_index']] = chunk
+        return len(chunks)
+
+
+class CrashingEmbedder:
+    def __init__(self, fail_on_call: int | None) -> None:
+        self.fail_on_call = fail_on_call
+        self.calls = 0
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError('worker crashed')
+        return [[0.0] for _ in texts]
+
+
+def _pipeline(tmp_path, milvus: FakeMilvus, embedder: CrashingEmbedder) -> PipelineService:
+    return PipelineService(
+        youtube_service=None,
+        audio_service=None,
+        transcription_service=None,
+        embedding_service=embedder,
+        milvus_service=milvus,
+        rag_service=SimpleNamespace(chunk_size=1000, chunk_overlap=100),
+        transcript_dir=tmp_path,
+        create_collection_per_video=True,
+        default_collection='video_chunks',
+        insert_batch_size=2,
+        dedup_service=DedupService(),
+    )
+
+
+def test_resume_after_dedup_keeps_rows_already_inserted(tmp_path):
+    metadata = [{'video_id': 'vid', 'chunk_index': index} for index in range(len(TEXTS))]
+    chunks, metadata, collapsed = DedupService().collapse(list(TEXTS), metadata)
+    assert collapsed == 1
+    assert [item['chunk_index'] for item in metadata] == [0, 2, 3, 4, 5]
+
+    milvus = FakeMilvus()
+    with pytest.raises(RuntimeError):
+        _pipeline(tmp_path, milvus, CrashingEmbedder(fail_on_call=2))._insert_chunks(
+            IngestCheckpoint.for_video(tmp_path, 'vid'), 'video_vid', 'vid', chunks, metadata
+        )
+    checkpoint = IngestCheckpoint.for_video(tmp_path, 'vid')
+    assert checkpoint.inserted_chunks == 2
+    assert sorted(milvus.rows) == [0, 2]
+
+    inserted = _pipeline(tmp_path, milvus, CrashingEmbedder(fail_on_call=None))._insert_chunks(
+        checkpoint, 'video_vid', 'vid', chunks, metadata
+    )
+
+    assert inserted == len(chunks)
+    assert sorted(milvus.rows) == [0, 2, 3, 4, 5]
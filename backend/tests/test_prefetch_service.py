@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.services.prefetch_service import PrefetchCache
+from app.services.rag_service import RagService
+
+
+class Summaries:
+    def __init__(self, manifests: list[dict]) -> None:
+        self.manifests = manifests
+
+    def summaries_for(self, collection_name: str, video_id: str | None = None) -> list[dict]:
+        return self.manifests
+
+
+def _rag(summary_service=None) -> RagService:
+    return RagService(None, None, None, 'model', 1000, 100, 4, summary_service=summary_service)
+
+
+async def _prefetch_then_claim(cache: PrefetchCache, hits: list[dict], usable) -> list[dict] | None:
+    async def retrieve() -> list[dict]:
+        return hits
+
+    await cache.prefetch('client', 'what is gradient descent', 'video_abc', None, retrieve)
+    return await cache.claim('client', 'What is gradient descent?', 'video_abc', None, usable)
+
+
+def test_declined_and_empty_prefetches_count_as_misses():
+    cache = PrefetchCache(debounce_s=0)
+    hit = {'id': 1, 'text': 'Gradient descent follows the slope.', 'metadata': {}}
+
+    async def decline(hits: list[dict]) -> bool:
+        return False
+
+    async def accept(hits: list[dict]) -> bool:
+        return True
+
+    assert asyncio.run(_prefetch_then_claim(cache, [hit], decline)) is None
+    assert asyncio.run(_prefetch_then_claim(cache, [], accept)) is None
+    assert asyncio.run(_prefetch_then_claim(cache, [hit], accept)) == [hit]
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 2, 0.3333)
+
+
+def test_retrieved_prefetch_serves_an_overview_question_without_summaries():
+    chunks = [{'id': 1, 'text': 'Welcome to the course.', 'metadata': {}}]
+    summary = [{'id': 'abc', 'text': 'A course on optimization.', 'metadata': {'source': 'summary'}}]
+    question = 'What is this video about?'
+    assert RagService.is_overview_question(question)
+
+    assert _rag().prefetch_usable(question, 'video_abc', chunks)
+    assert _rag(Summaries([])).prefetch_usable(question, 'video_abc', chunks)
+    assert not _rag(Summaries([{'video_id': 'abc'}])).prefetch_usable(question, 'video_abc', chunks)
+    assert _rag(Summaries([{'video_id': 'abc'}])).prefetch_usable(question, 'video_abc', summary)
+    assert not _rag().prefetch_usable('What is gradient descent?', 'video_abc', summary)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from app.services.rag_service import RagService
+from app.services.session_service import ChatSession
+
+
+def _hit(index: int, text: str, score: float) -> dict:
+    return {'id': index, 'text': text, 'score': score, 'metadata': {'video_id': 'abc', 'chunk_index': index}}
+
+
+def _service() -> RagService:
+    return RagService(
+        embedding_service=None,
+        milvus_service=None,
+        openai_client=None,
+        chat_model='model',
+        chunk_size=1000,
+        chunk_overlap=100,
+        max_context_chunks=2,
+    )
+
+
+def test_each_session_prompt_extends_the_previous_one():
+    rag = _service()
+    session = ChatSession('session', 'video_abc', max_turns=6, max_chunks=24)
+
+    first_hits = [_hit(0, 'Gradient descent follows the slope.', 0.9), _hit(1, 'Learning rates set the step.', 0.8)]
+    _, first, first_context = rag._prepare('What is gradient descent?', 'video_abc', None, session, first_hits)
+    session.record_turn('What is gradient descent?', 'It walks downhill.', first_context)
+
+    # The second turn ranks a new chunk above both earlier ones, which reorders the selection.
+    second_hits = [_hit(2, 'Backpropagation computes the gradient.', 2.0)]
+    _, second, second_context = rag._prepare('How is backpropagation used?', 'video_abc', None, session, second_hits)
+
+    assert second[: len(first)] == first
+    assert second[len(first)] == {'role': 'assistant', 'content': 'It walks downhill.'}
+    assert second_context == ['Backpropagation computes the gradient.']
+    assert 'Backpropagation computes the gradient.' in second[-1]['content']
+
+
+def test_evicted_turns_leave_with_their_chunks():
+    rag = _service()
+    session = ChatSession('session', 'video_abc', max_turns=1, max_chunks=24)
+
+    for index, question in enumerate(['What is gradient descent?', 'What is momentum?']):
+        hits = [_hit(index, f'Chunk about {question}', 0.9)]
+        _, _, context = rag._prepare(question, 'video_abc', None, session, hits)
+        session.record_turn(question, f'Answer {index}', context)
+
+    assert [turn[0] for turn in session.turns] == ['What is momentum?']
+    _, messages, _ = rag._prepare('And gradient descent?', 'video_abc', None, session, [_hit(0, 'x', 0.1)])
+    assert 'Chunk about What is gradient descent?' not in messages[1]['content']
+    assert 'Chunk about What is momentum?' in messages[1]['content']
+    # No retained turn carries the evicted chunk any more, so it is sent again with the new question.
+    assert 'Chunk about What is gradient descent?' in messages[-1]['content']
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+
+from app.services.snapshot_service import SNAPSHOT_VERSION, SnapshotService
+from app.services.summary_service import ManifestIndex, SummaryService
+
+
+class NoCollections:
+    dimension = 384
+
+
+def _archive(path, manifest: dict) -> None:
+    members = {
+        'snapshot.json': {'version': SNAPSHOT_VERSION, 'embedding_model': 'model', 'collections': [], 'files': []},
+        f"transcripts/{manifest['video_id']}.json": manifest,
+    }
+    with tarfile.open(path, 'w:gz') as archive:
+        for name, content in members.items():
+            data = json.dumps(content).encode('utf-8')
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+def test_imported_summaries_are_indexed_after_backfill(tmp_path):
+    transcript_dir = tmp_path / 'transcripts'
+    summaries = SummaryService(None, 'model', transcript_dir)
+    # A node whose API already ran: the one-off backfill is done and will not pick up new manifests.
+    assert summaries.summaries_for('video_abc') == []
+    assert (ManifestIndex(transcript_dir).root / '.backfilled').exists()
+
+    _archive(
+        tmp_path / 'snapshot.tar.gz',
+        {
+            'video_id': 'abc',
+            'title': 'Imported',
+            'collection': 'video_abc',
+            'transcript_path': '/elsewhere/abc.txt',
+            'summary': {'summary': 'An imported talk.', 'outline': []},
+        },
+    )
+    SnapshotService(NoCollections(), transcript_dir, 'model').import_(tmp_path / 'snapshot.tar.gz')
+
+    assert [entry['video_id'] for entry in summaries.summaries_for('video_abc')] == ['abc']
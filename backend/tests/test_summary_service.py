@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from app.services.summary_service import ManifestIndex, SummaryService
+
+
+def _manifest(video_id: str, collection: str) -> dict:
+    return {
+        'video_id': video_id,
+        'title': video_id,
+        'collection': collection,
+        'summary': {'summary': f'about {video_id}', 'outline': []},
+    }
+
+
+def test_summaries_are_scoped_to_one_video(tmp_path):
+    service = SummaryService(None, 'model', tmp_path)
+    for video_id in ('a', 'b'):
+        service.index.record(_manifest(video_id, 'shared'))
+    service.index.record(_manifest('c', 'video_c'))
+
+    assert service.summaries_for('shared') == []
+    assert [entry['video_id'] for entry in service.summaries_for('shared', 'b')] == ['b']
+    assert [entry['video_id'] for entry in service.summaries_for('video_c')] == ['c']
+
+
+def test_dropped_collection_has_no_summaries(tmp_path):
+    service = SummaryService(None, 'model', tmp_path)
+    service.index.record(_manifest('a', 'video_a'))
+    assert service.summaries_for('video_a')
+
+    ManifestIndex(tmp_path).drop('video_a')
+
+    assert service.summaries_for('video_a') == []
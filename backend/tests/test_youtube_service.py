@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from app.services.youtube_service import YouTubeService
+
+CHANNEL_URL = 'https://www.youtube.com/@example'
+
+
+def _video(video_id: str) -> dict:
+    return {'_type': 'url', 'ie_key': 'Youtube', 'id': video_id, 'url': f'https://www.youtube.com/watch?v={video_id}'}
+
+
+def _tab(name: str) -> dict:
+    return {'_type': 'url', 'ie_key': 'YoutubeTab', 'id': f'UCexample-{name}', 'url': f'{CHANNEL_URL}/{name}'}
+
+
+# What flat extraction returns: the channel lists its tabs unresolved, each tab lists its videos.
+INFO = {
+    CHANNEL_URL: {'_type': 'playlist', 'id': 'UCexample', 'entries': [_tab('videos'), _tab('shorts')]},
+    f'{CHANNEL_URL}/videos': {'_type': 'playlist', 'entries': [_video('a1'), _video('a2'), _video('a3')]},
+    f'{CHANNEL_URL}/shorts': {'_type': 'playlist', 'entries': [_video('s1'), _video('a1')]},
+}
+
+
+def _service(monkeypatch, calls: list[str]) -> YouTubeService:
+    service = YouTubeService(Path('.'))
+
+    def _extract_flat(url: str) -> dict:
+        calls.append(url)
+        return INFO[url]
+
+    monkeypatch.setattr(service, '_extract_flat', _extract_flat)
+    return service
+
+
+def test_channel_tabs_expand_to_videos(monkeypatch):
+    calls: list[str] = []
+    urls = _service(monkeypatch, calls).expand_urls(CHANNEL_URL)
+
+    assert urls == [f'https://www.youtube.com/watch?v={video_id}' for video_id in ('a1', 'a2', 'a3', 's1', 'a1')]
+    assert calls == [CHANNEL_URL, f'{CHANNEL_URL}/videos', f'{CHANNEL_URL}/shorts']
+
+
+def test_expansion_stops_at_limit(monkeypatch):
+    calls: list[str] = []
+    urls = _service(monkeypatch, calls).expand_urls(CHANNEL_URL, limit=2)
+
+    assert urls == ['https://www.youtube.com/watch?v=a1', 'https://www.youtube.com/watch?v=a2']
+    assert f'{CHANNEL_URL}/shorts' not in calls
+
+
+def test_single_video_is_not_extracted(monkeypatch):
+    calls: list[str] = []
+    url = 'https://www.youtube.com/watch?v=abc'
+
+    assert _service(monkeypatch, calls).expand_urls(url) == [url]
+    assert calls == []